@@ -0,0 +1,120 @@
+"""Compare the explain-tree and serialized-plan extractor backends.
+
+Reports best-of wall time and the tracemalloc peak of one run per backend. Each
+timed run extracts a freshly built frame with the lineage and expression caches
+cleared, so the numbers are backend cost; the ``cached`` rows repeat one warmed
+frame instead. Sources are Parquet scans: the serialized backend leaves plans
+over in-memory frames to the tree backend. tracemalloc only sees Python
+allocations, so memory Polars allocates in Rust while rendering the plan is not
+included.
+
+Run with ``uv run python benchmarks/bench_backends.py``.
+"""
+
+from __future__ import annotations
+
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import polars as pl
+from plans import SINGLE_SOURCE_MAPPING
+
+from polars_lineage.cache import clear_lineage_cache
+from polars_lineage.extractor.expr_parser import clear_expression_cache
+from polars_lineage.pipeline import ExtractorBackend, extract_lineage_ir_from_lazyframe
+
+REPEATS = 3
+BACKENDS: tuple[ExtractorBackend, ...] = ("tree", "serialized")
+_SOURCE_COLUMNS = ("a", "b", "c", "d")
+
+
+def _source(path: Path) -> pl.LazyFrame:
+    return pl.scan_parquet(path)
+
+
+def wide_select_frame(path: Path, width: int) -> pl.LazyFrame:
+    return _source(path).select(
+        [
+            (pl.col(_SOURCE_COLUMNS[index % 4]) + pl.col(_SOURCE_COLUMNS[(index + 1) % 4])).alias(
+                f"out_{index}"
+            )
+            for index in range(width)
+        ]
+    )
+
+
+def deep_with_columns_frame(path: Path, depth: int) -> pl.LazyFrame:
+    lazyframe = _source(path)
+    for level in range(depth):
+        previous = "a" if level == 0 else f"d{level - 1}"
+        lazyframe = lazyframe.with_columns((pl.col(previous) + pl.col("b")).alias(f"d{level}"))
+    return lazyframe
+
+
+def _best_of(repeats: int, build: Callable[[], pl.LazyFrame], backend: ExtractorBackend) -> float:
+    timings: list[float] = []
+    for _ in range(repeats):
+        lazyframe = build()
+        clear_lineage_cache()
+        clear_expression_cache()
+        started = time.perf_counter()
+        extract_lineage_ir_from_lazyframe(lazyframe, SINGLE_SOURCE_MAPPING, backend=backend)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def _best_cached(repeats: int, lazyframe: pl.LazyFrame, backend: ExtractorBackend) -> float:
+    extract_lineage_ir_from_lazyframe(lazyframe, SINGLE_SOURCE_MAPPING, backend=backend)
+    timings: list[float] = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        extract_lineage_ir_from_lazyframe(lazyframe, SINGLE_SOURCE_MAPPING, backend=backend)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def _peak_bytes(lazyframe: pl.LazyFrame, backend: ExtractorBackend) -> int:
+    clear_lineage_cache()
+    clear_expression_cache()
+    tracemalloc.start()
+    try:
+        extract_lineage_ir_from_lazyframe(lazyframe, SINGLE_SOURCE_MAPPING, backend=backend)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    with TemporaryDirectory() as directory:
+        path = Path(directory) / "source.parquet"
+        pl.DataFrame({column: [1] for column in _SOURCE_COLUMNS}).write_parquet(path)
+        _report(path)
+
+
+def _report(path: Path) -> None:
+    cases: list[tuple[str, int, Callable[[], pl.LazyFrame]]] = [
+        *(
+            ("wide_select", size, lambda size=size: wide_select_frame(path, size))
+            for size in (250, 1_000)
+        ),
+        *(
+            ("deep_with_columns", size, lambda size=size: deep_with_columns_frame(path, size))
+            for size in (50, 200)
+        ),
+    ]
+    print(f"{'shape':<20} {'size':>6} {'backend':<20} {'best_s':>10} {'peak_kib':>10}")
+    for shape, size, build in cases:
+        for backend in BACKENDS:
+            elapsed = _best_of(REPEATS, build, backend)
+            peak = _peak_bytes(build(), backend) / 1024
+            print(f"{shape:<20} {size:>6} {backend:<20} {elapsed:>10.4f} {peak:>10.0f}")
+            cached = _best_cached(REPEATS, build(), backend)
+            label = f"{backend} (cached)"
+            print(f"{shape:<20} {size:>6} {label:<20} {cached:>10.4f} {'':>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Measure ``extract_lineage_batch`` scaling across process-pool sizes.
+
+Each item is a distinct wide-select plan, so the in-process lineage cache never
+hits. Worker counts double up to ``os.cpu_count()``; speedup is relative to the
+in-process ``workers=1`` run and includes pool start-up.
+
+Run with ``uv run python benchmarks/bench_batch.py``.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+
+from plans import SINGLE_SOURCE_MAPPING, wide_select_plan
+
+from polars_lineage.pipeline import extract_lineage_batch
+
+ITEMS = 400
+WIDTH = 60
+
+
+def _worker_counts() -> list[int]:
+    cpu_count = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cpu_count:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cpu_count:
+        counts.append(cpu_count)
+    return counts
+
+
+def main() -> None:
+    # A trailing empty row makes every plan text, and so every cache key, unique.
+    items = [
+        (wide_select_plan(WIDTH + index % 7) + f"\n{index} │ │", SINGLE_SOURCE_MAPPING)
+        for index in range(ITEMS)
+    ]
+    baseline = 0.0
+    print(f"{'workers':>8} {'seconds':>9} {'speedup':>8}")
+    for workers in _worker_counts():
+        started = time.perf_counter()
+        results = list(extract_lineage_batch(items, workers=workers))
+        elapsed = time.perf_counter() - started
+        failed = sum(not result.ok for result in results)
+        if failed:
+            raise SystemExit(f"{failed} batch items failed")
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>9.3f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Time ``extract_plan_lineage`` on synthetic wide and deep plans.
+
+Run with ``uv run python benchmarks/bench_explain_tree.py``.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+
+from plans import SINGLE_SOURCE_MAPPING, deep_with_columns_plan, wide_select_plan
+
+from polars_lineage.extractor.explain_tree import extract_plan_lineage
+
+REPEATS = 5
+
+
+def _best_of(repeats: int, func: Callable[[], object]) -> float:
+    timings: list[float] = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    cases = [
+        *(("wide_select", size, wide_select_plan(size)) for size in (500, 1_000, 3_000)),
+        *(("deep_with_columns", size, deep_with_columns_plan(size)) for size in (100, 500, 1_000)),
+    ]
+    print(f"{'shape':<20} {'size':>6} {'plan_bytes':>12} {'best_s':>10}")
+    for shape, size, plan in cases:
+        elapsed = _best_of(REPEATS, lambda: extract_plan_lineage(plan, SINGLE_SOURCE_MAPPING))
+        print(f"{shape:<20} {size:>6} {len(plan.encode()):>12} {elapsed:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
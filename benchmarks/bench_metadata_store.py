@@ -0,0 +1,89 @@
+"""Stress the LazyFrame metadata store from several threads.
+
+Each thread attaches its own mapping to freshly built frames, reads it back
+through ``get_mapping``, the plan cache and the schema cache, and drops the
+frames so weakref callbacks fire concurrently with writers. Any read that
+returns another thread's mapping is counted as a mismatch; the store must end
+up empty once every frame is gone.
+
+Run with ``uv run python benchmarks/bench_metadata_store.py``.
+"""
+
+from __future__ import annotations
+
+import gc
+import threading
+import time
+
+import polars as pl
+
+from polars_lineage import metadata_store
+from polars_lineage.config import MappingConfig
+
+FRAMES_PER_THREAD = 2_000
+REPEATS = 3
+
+
+def _mapping(name: str) -> MappingConfig:
+    return MappingConfig.model_validate(
+        {"sources": {name: f"svc.db.raw.{name}"}, "destination_table": "svc.db.curated.out"}
+    )
+
+
+def _worker(
+    thread_index: int, base: pl.LazyFrame, start: threading.Barrier, mismatches: list[int]
+) -> None:
+    mapping = _mapping(f"t{thread_index}")
+    plan = f"plan-{thread_index}"
+    wrong = 0
+    start.wait()
+    for _ in range(FRAMES_PER_THREAD):
+        frame = base.clone()
+        metadata_store.set_mapping(frame, mapping)
+        if metadata_store.get_mapping(frame) is not mapping:
+            wrong += 1
+        if metadata_store.get_rendered_plan(frame, "tree", lambda _frame: plan) != plan:
+            wrong += 1
+        metadata_store.get_schema_names(frame)
+    mismatches.append(wrong)
+
+
+def run(threads: int) -> tuple[float, int]:
+    base = pl.LazyFrame({"a": [1], "b": [2]})
+    start = threading.Barrier(threads + 1)
+    mismatches: list[int] = []
+    workers = [
+        threading.Thread(target=_worker, args=(index, base, start, mismatches))
+        for index in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    started = time.perf_counter()
+    start.wait()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    return elapsed, sum(mismatches)
+
+
+def main() -> None:
+    print(f"{'threads':>8} {'frames':>8} {'best_s':>10} {'us_per_frame':>13} {'mismatches':>11}")
+    for threads in (1, 2, 4, 8):
+        timings: list[float] = []
+        mismatches = 0
+        for _ in range(REPEATS):
+            elapsed, wrong = run(threads)
+            timings.append(elapsed)
+            mismatches += wrong
+        frames = threads * FRAMES_PER_THREAD
+        best = min(timings)
+        print(
+            f"{threads:>8} {frames:>8} {best:>10.4f} {best / frames * 1e6:>13.2f} {mismatches:>11}"
+        )
+    gc.collect()
+    metadata_store.set_mapping(pl.LazyFrame(), _mapping("flush"))
+    print(f"entries left after collection: {len(metadata_store._ENTRIES)}")
+
+
+if __name__ == "__main__":
+    main()
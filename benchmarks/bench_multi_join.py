@@ -0,0 +1,86 @@
+"""Time N-way join extraction on star schemas with a growing number of dimensions.
+
+The plan text and serialized JSON are rendered once per size, so the timings cover
+only the plan-graph build and the scoped walk. Time and tracemalloc peak per join
+should stay roughly flat as the number of joins grows.
+
+Run with ``uv run python benchmarks/bench_multi_join.py``.
+"""
+
+from __future__ import annotations
+
+import time
+import tracemalloc
+from collections.abc import Callable
+
+import polars as pl
+
+from polars_lineage.config import MappingConfig
+from polars_lineage.extractor.explain_tree import extract_plan_lineage
+from polars_lineage.extractor.serialized_plan import (
+    extract_serialized_plan_lineage,
+    serialize_lazyframe_plan,
+)
+
+REPEATS = 5
+SIZES = (4, 16, 32, 64)
+
+
+def star_schema(dimensions: int) -> tuple[pl.LazyFrame, MappingConfig]:
+    keys = [f"k{index}" for index in range(dimensions)]
+    lazyframe = pl.LazyFrame({"amount": [1], **{key: [1] for key in keys}})
+    for index, key in enumerate(keys):
+        overlap = {"amount": [1]} if index == 0 else {}
+        dimension = pl.LazyFrame({key: [1], f"label{index}": ["x"], **overlap})
+        lazyframe = lazyframe.join(dimension, on=key, how="left")
+    lazyframe = lazyframe.select(
+        pl.col("amount"),
+        *(pl.col(f"label{index}") for index in range(dimensions)),
+        (pl.col("amount") * pl.col("amount_right")).alias("weighted"),
+    )
+    sources = {"left" + ".left" * (dimensions - 1): "svc.db.raw.fact"}
+    for index in range(dimensions):
+        path = ".".join(["left"] * (dimensions - 1 - index) + ["right"])
+        sources[path] = f"svc.db.raw.dim_{index}"
+    return lazyframe, MappingConfig(sources=sources, destination_table="svc.db.curated.report")
+
+
+def _best_of(repeats: int, func: Callable[[], object]) -> float:
+    timings: list[float] = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def _peak_bytes(func: Callable[[], object]) -> int:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    print(f"{'joins':>6} {'backend':<12} {'best_s':>10} {'us/join':>10} {'peak_kib':>10}")
+    for size in SIZES:
+        lazyframe, mapping = star_schema(size)
+        plan = lazyframe.explain(format="tree", optimized=False)
+        serialized = serialize_lazyframe_plan(lazyframe)
+        runs: dict[str, Callable[[], object]] = {
+            "tree": lambda: extract_plan_lineage(plan, mapping),
+            "serialized": lambda: extract_serialized_plan_lineage(serialized, mapping),
+        }
+        for backend, run in runs.items():
+            elapsed = _best_of(REPEATS, run)
+            peak = _peak_bytes(run) / 1024
+            print(
+                f"{size:>6} {backend:<12} {elapsed:>10.4f} "
+                f"{elapsed / size * 1e6:>10.1f} {peak:>10.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Per-call overhead of the lineage method wrappers on ``LazyFrame`` builders.
+
+Times ``select``/``with_columns``/``filter`` calls on a frame *without* lineage
+metadata in four states:
+
+- ``unwrapped``: recording disabled, original Polars methods
+- ``wrapped_idle``: wrappers installed, no frame has metadata (early exit)
+- ``wrapped_busy``: wrappers installed while another frame has metadata, which
+  is what every call paid before recording could be switched off
+- ``recorded``: the same calls on a frame that has metadata
+
+Run with ``uv run python benchmarks/bench_recording_overhead.py``.
+"""
+
+from __future__ import annotations
+
+import gc
+import time
+
+import polars as pl
+
+import polars_lineage
+
+CALLS = 3_000
+REPEATS = 7
+
+
+def _build(frame: pl.LazyFrame) -> None:
+    for index in range(CALLS):
+        frame.select("a", "b").with_columns(c=pl.col("a") + index).filter(pl.col("b") > 0)
+
+
+def _us_per_call(frame: pl.LazyFrame) -> float:
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        _build(frame)
+        return (time.perf_counter() - started) / (CALLS * 3) * 1e6
+    finally:
+        gc.enable()
+
+
+def main() -> None:
+    plain = pl.LazyFrame({"a": [1], "b": [2]})
+    best: dict[str, float] = {}
+
+    def keep(state: str, value: float) -> None:
+        best[state] = min(value, best.get(state, value))
+
+    # States are interleaved within every repeat so machine noise hits all of them.
+    for _ in range(REPEATS):
+        polars_lineage.disable_recording()
+        keep("unwrapped", _us_per_call(plain))
+
+        polars_lineage.enable_recording()
+        keep("wrapped_idle", _us_per_call(plain))
+
+        source = getattr(pl.LazyFrame({"a": [1], "b": [2]}), "lineage").add_source(
+            name="orders", uri="postgres://warehouse/svc.db.raw.orders"
+        )
+        keep("wrapped_busy", _us_per_call(plain))
+        keep("recorded", _us_per_call(source))
+        del source
+
+    print(f"{'state':<14} {'us_per_call':>12} {'overhead_us':>12}")
+    for state, value in best.items():
+        print(f"{state:<14} {value:>12.2f} {value - best['unwrapped']:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Time ``resolve_transitive_lineage`` on synthetic diamond-shaped lineage graphs.
+
+Every derived column reads the two previous derived columns and one source
+column, which is what long ``with_columns`` chains look like once extracted.
+The ``us_per_edge`` column should stay flat as the graph grows.
+
+Run with ``uv run python benchmarks/bench_resolver.py``.
+"""
+
+from __future__ import annotations
+
+import time
+
+from polars_lineage.ir import ColumnLineage, ColumnRef, DatasetRef
+from polars_lineage.resolver import resolve_transitive_lineage
+
+REPEATS = 3
+SOURCE_COLUMNS = 16
+_SOURCE = DatasetRef(service="svc", database="db", schema="raw", table="orders")
+_DESTINATION = DatasetRef(service="svc", database="db", schema="curated", table="metrics")
+
+
+def diamond_lineage(size: int) -> list[ColumnLineage]:
+    sources = [ColumnRef(dataset=_SOURCE, column=f"s{index}") for index in range(SOURCE_COLUMNS)]
+    derived = [ColumnRef(dataset=_DESTINATION, column=f"d{index}") for index in range(size)]
+    lineage: list[ColumnLineage] = []
+    for index, target in enumerate(derived):
+        inputs = [sources[index % SOURCE_COLUMNS], *derived[max(0, index - 2) : index]]
+        lineage.append(
+            ColumnLineage(
+                from_columns=tuple(inputs), to_column=target, function="f", confidence="exact"
+            )
+        )
+    return lineage
+
+
+def main() -> None:
+    print(f"{'columns':>8} {'edges':>8} {'best_s':>10} {'us_per_edge':>12}")
+    for size in (1_000, 10_000, 50_000):
+        lineage = diamond_lineage(size)
+        edges = sum(len(item.from_columns) for item in lineage)
+        timings: list[float] = []
+        for _ in range(REPEATS):
+            started = time.perf_counter()
+            resolve_transitive_lineage(lineage)
+            timings.append(time.perf_counter() - started)
+        best = min(timings)
+        print(f"{size:>8} {edges:>8} {best:>10.4f} {best / edges * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Time partition collapsing for hive-partitioned scans with a growing number of files.
+
+Each size lists ``files`` paths under ``/lake/sales/year=.../month=.../`` and folds
+them into one dataset root. Time per file should stay roughly flat as the number
+of files grows.
+
+Run with ``uv run python benchmarks/bench_scan_sources.py``.
+"""
+
+from __future__ import annotations
+
+import time
+
+from polars_lineage.extractor.scan_sources import partition_root
+
+REPEATS = 5
+SIZES = (1_000, 10_000, 100_000)
+
+
+def hive_paths(files: int) -> list[str]:
+    return [
+        f"s3://lake/sales/year={2000 + index // 1200}/month={index // 100 % 12 + 1:02d}/"
+        f"part-{index % 100:05d}.parquet"
+        for index in range(files)
+    ]
+
+
+def main() -> None:
+    print(f"{'files':>8} {'best_s':>10} {'us/file':>10}")
+    for size in SIZES:
+        paths = hive_paths(size)
+        timings: list[float] = []
+        for _ in range(REPEATS):
+            started = time.perf_counter()
+            root = partition_root(paths)
+            timings.append(time.perf_counter() - started)
+        assert root == "s3://lake/sales", root
+        elapsed = min(timings)
+        print(f"{size:>8} {elapsed:>10.4f} {elapsed / size * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
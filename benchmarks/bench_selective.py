@@ -0,0 +1,68 @@
+"""Time full extraction against ``columns=`` slices of a 2,000-column output.
+
+The plan text is rendered once per frame and kept by the metadata store, so the
+timings cover extraction only: the full run parses and resolves every
+expression, a slice only the expressions its columns depend on.
+
+Run with ``uv run python benchmarks/bench_selective.py``.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Collection
+
+import polars as pl
+
+import polars_lineage  # noqa: F401 - registers ``LazyFrame.lineage``
+from polars_lineage.cache import clear_lineage_cache
+from polars_lineage.ir import ColumnLineage
+from polars_lineage.metadata_store import require_mapping
+from polars_lineage.pipeline import extract_lineage_ir_from_lazyframe
+
+REPEATS = 5
+WIDTH = 2_000
+SLICES: tuple[tuple[str, Collection[str] | None], ...] = (
+    ("all", None),
+    ("100", [f"d{index}" for index in range(0, WIDTH, WIDTH // 100)]),
+    ("5 pii", ["email_hash", "d1", "d2", "d3", "d4"]),
+)
+
+
+def wide_frame() -> pl.LazyFrame:
+    lazyframe = pl.LazyFrame({"email": ["a@b"], **{f"c{index}": [index] for index in range(WIDTH)}})
+    lazyframe = lazyframe.lineage.add_source(
+        name="users", uri="postgres://warehouse/svc.db.raw.users"
+    )
+    lazyframe = lazyframe.with_columns(pl.col("email").str.to_lowercase().alias("normalized"))
+    lazyframe = lazyframe.select(
+        pl.col("normalized").hash().alias("email_hash"),
+        *((pl.col(f"c{index}") * 2 + 1).alias(f"d{index}") for index in range(WIDTH)),
+    )
+    return lazyframe
+
+
+def _extract(lazyframe: pl.LazyFrame, columns: Collection[str] | None) -> list[ColumnLineage]:
+    clear_lineage_cache()
+    return extract_lineage_ir_from_lazyframe(lazyframe, require_mapping(lazyframe), columns=columns)
+
+
+def _best_of(repeats: int, func: Callable[[], object]) -> float:
+    timings: list[float] = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    lazyframe = wide_frame()
+    print(f"{'columns':>8} {'best_s':>10} {'edges':>7}")
+    for label, columns in SLICES:
+        elapsed = _best_of(REPEATS, lambda: _extract(lazyframe, columns))
+        print(f"{label:>8} {elapsed:>10.4f} {len(_extract(lazyframe, columns)):>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Time union extraction over a growing number of identical daily partitions.
+
+Each size concatenates ``inputs`` frames of one source table and projects the
+result. Identical union inputs are interned while the plan tree is built, so the
+scoped walk (``walk_ms``) and the number of distinct inputs should stay flat; only
+plan decoding, included in the per-backend timings, grows with the number of inputs.
+
+Run with ``uv run python benchmarks/bench_union.py``.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+
+import polars as pl
+
+from polars_lineage.config import MappingConfig
+from polars_lineage.extractor import explain_tree, serialized_plan
+from polars_lineage.extractor.plan_graph import build_scoped_lineage
+
+REPEATS = 5
+SIZES = (10, 100, 300, 1000)
+MAPPING = MappingConfig(
+    sources={"events": "svc.db.raw.events"}, destination_table="svc.db.curated.events"
+)
+
+
+def daily_union(inputs: int) -> pl.LazyFrame:
+    partition = {"id": [1], "amount": [1.0], "day": ["2024-01-01"]}
+    days = [pl.LazyFrame(partition) for _ in range(inputs)]
+    return pl.concat(days).select(pl.col("id"), (pl.col("amount") * 2).alias("doubled"))
+
+
+def _best_of(repeats: int, func: Callable[[], object]) -> float:
+    timings: list[float] = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    print(f"{'inputs':>7} {'tree_ms':>10} {'serial_ms':>10} {'walk_ms':>10} {'distinct':>9}")
+    for size in SIZES:
+        lazyframe = daily_union(size)
+        plan = lazyframe.explain(format="tree", optimized=False)
+        serialized = serialized_plan.serialize_lazyframe_plan(lazyframe)
+        root = explain_tree.build_plan_tree(plan)
+        tree_s = _best_of(REPEATS, lambda: explain_tree.extract_plan_lineage(plan, MAPPING))
+        serialized_s = _best_of(
+            REPEATS, lambda: serialized_plan.extract_serialized_plan_lineage(serialized, MAPPING)
+        )
+        walk_s = _best_of(REPEATS, lambda: build_scoped_lineage(root, MAPPING))
+        print(
+            f"{size:>7} {tree_s * 1e3:>10.2f} {serialized_s * 1e3:>10.2f} "
+            f"{walk_s * 1e3:>10.3f} {len(root.inputs[0].inputs):>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
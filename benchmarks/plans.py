@@ -0,0 +1,111 @@
+"""Synthetic explain-tree plans for the benchmark scripts.
+
+The generators emit the compact ``row │ │ block`` layout that
+``_column_texts_from_tree`` accepts, so plan size is not capped by the
+``DF [...]`` abbreviation Polars applies to wide frames.
+"""
+
+from __future__ import annotations
+
+from polars_lineage.config import MappingConfig
+
+SINGLE_SOURCE_MAPPING = MappingConfig(
+    sources={"orders": "svc.db.raw.orders"},
+    destination_table="svc.db.curated.metrics",
+)
+
+
+def _df_block(columns: list[str]) -> str:
+    quoted = ", ".join(f'"{column}"' for column in columns)
+    return f"FROM: DF [{quoted}] PROJECT */{len(columns)} COLUMNS"
+
+
+def wide_select_plan(width: int) -> str:
+    """One SELECT with ``width`` expressions over a ``width``-column source."""
+    source_columns = [f"c{index}" for index in range(width)]
+    expressions = " ".join(
+        f'expression: [(col("c{index}")) + (col("c{(index + 1) % width}"))].alias("out_{index}")'
+        for index in range(width)
+    )
+    return "\n".join(
+        [
+            "0 │ │ SELECT │",
+            f"1 │ │ {expressions} {_df_block(source_columns)}",
+        ]
+    )
+
+
+def deep_with_columns_plan(depth: int) -> str:
+    """A chain of ``depth`` WITH_COLUMNS nodes, each deriving from the previous one."""
+    rows: list[str] = []
+    for level in range(depth):
+        previous = "a" if level == 0 else f"d{level - 1}"
+        rows.append(f"{2 * level} │ │ WITH_COLUMNS │")
+        rows.append(
+            f'{2 * level + 1} │ │ expression: [(col("{previous}")) + (col("b"))].alias("d{level}")'
+        )
+    rows.append(f"{2 * depth} │ │ {_df_block(['a', 'b'])}")
+    return "\n".join(rows)
+
+
+def diamond_plan(depth: int, source_width: int = 16) -> str:
+    """A WITH_COLUMNS chain where every derived column reads the two before it.
+
+    Each column is reachable from the leaves along many paths, which is what makes
+    naive transitive resolution blow up.
+    """
+    sources = [f"s{index}" for index in range(source_width)]
+    rows: list[str] = []
+    for level in range(depth):
+        previous = (f"d{index}" for index in range(max(0, level - 2), level))
+        inputs = [sources[level % source_width], *previous]
+        expression = " + ".join(f'(col("{name}"))' for name in inputs)
+        rows.append(f"{2 * level} │ │ WITH_COLUMNS │")
+        rows.append(f'{2 * level + 1} │ │ expression: [{expression}].alias("d{level}")')
+    rows.append(f"{2 * depth} │ │ {_df_block(sources)}")
+    return "\n".join(rows)
+
+
+JOIN_MAPPING = MappingConfig(
+    sources={"left": "svc.db.raw.orders", "right": "svc.db.raw.accounts"},
+    destination_table="svc.db.curated.metrics",
+)
+
+
+def overlap_join_plan(width: int) -> str:
+    """A join on ``width`` keys present on both sides, deriving two columns per key."""
+    keys = [f"k{index}" for index in range(width)]
+    left_columns = [*keys, *(f"l{index}" for index in range(width))]
+    right_columns = [*keys, *(f"r{index}" for index in range(width))]
+    expressions = " ".join(
+        f'expression: [(col("k{index}")) + (col("l{index}"))].alias("lo{index}") '
+        f'expression: [(col("k{index}")) * (col("r{index}"))].alias("ro{index}")'
+        for index in range(width)
+    )
+    on = "[" + ", ".join(f'col("{key}")' for key in keys) + "]"
+    left = ", ".join(f'"{column}"' for column in left_columns)
+    right = ", ".join(f'"{column}"' for column in right_columns)
+    return "\n".join(
+        [
+            "0 │ │ WITH_COLUMNS │",
+            f"1 │ │ {expressions} FROM: LEFT JOIN left on: {on} right on: {on} "
+            f"LEFT PLAN: DF [{left}] RIGHT PLAN: DF [{right}]",
+        ]
+    )
+
+
+def group_by_plan(aggregates: int, source_width: int = 16) -> str:
+    """One AGGREGATE with ``aggregates`` expressions grouped by a single key."""
+    sources = ["key", *(f"v{index}" for index in range(source_width))]
+    functions = ("sum", "mean", "max", "min", "count")
+    expressions = " ".join(
+        f'expression: col("v{index % source_width}").{functions[index % len(functions)]}()'
+        f'.alias("agg{index}")'
+        for index in range(aggregates)
+    )
+    return "\n".join(
+        [
+            "0 │ │ AGGREGATE[maintain_order: false] │",
+            f'1 │ │ {expressions} aggregate by: col("key") {_df_block(sources)}',
+        ]
+    )
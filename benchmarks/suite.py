@@ -0,0 +1,232 @@
+"""Regression suite over synthetic plan shapes with stored baselines.
+
+Each case generates one plan shape and measures, per stage, the best-of wall
+time and the tracemalloc peak of a single run:
+
+- ``extract``: ``extract_plan_lineage`` on the plan text
+- ``resolve``: ``resolve_transitive_lineage`` on the extracted lineage
+- ``export_<format>``: ``export_lineage`` for every output format
+- ``export_many``: ``export_lineage_many`` rendering every format at once
+
+Every repeat is paired with a fixed pure-Python calibration workload, and
+timings are compared as multiples of it (``relative``), which absorbs most of
+the difference between hosts and between a busy and an idle machine. A repeat
+calls a fast stage as many times as it takes to fill ``MIN_SAMPLE_SECONDS`` and
+keeps the per-call time, so millisecond stages are not timed off a single run.
+Results are compared with ``benchmarks/baseline.json`` and the script exits
+non-zero when a stage is slower than the baseline by both the relative
+tolerance and the absolute floor, or allocates more than the baseline allows.
+The expression cache is cleared before every call and garbage collection paused
+for every timed run.
+
+Run with ``uv run python benchmarks/suite.py`` and refresh baselines with
+``uv run python benchmarks/suite.py --update-baseline``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import math
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import get_args
+
+from plans import (
+    JOIN_MAPPING,
+    SINGLE_SOURCE_MAPPING,
+    deep_with_columns_plan,
+    diamond_plan,
+    group_by_plan,
+    overlap_join_plan,
+    wide_select_plan,
+)
+
+from polars_lineage.config import MappingConfig
+from polars_lineage.exporter import OutputFormat, export_lineage, export_lineage_many
+from polars_lineage.extractor.explain_tree import extract_plan_lineage
+from polars_lineage.extractor.expr_parser import clear_expression_cache
+from polars_lineage.resolver import resolve_transitive_lineage
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+REPEATS = 7
+MIN_SAMPLE_SECONDS = 0.05
+DEFAULT_TIME_TOLERANCE = 0.5
+# In calibration units (one unit is one calibration run, roughly 0.1s).
+DEFAULT_TIME_FLOOR = 0.05
+DEFAULT_MEMORY_TOLERANCE = 0.2
+
+
+@dataclass(frozen=True)
+class Case:
+    shape: str
+    size: int
+    plan: str
+    mapping: MappingConfig
+
+    @property
+    def name(self) -> str:
+        return f"{self.shape}[{self.size}]"
+
+
+@dataclass(frozen=True)
+class Measurement:
+    seconds: float
+    relative: float
+    peak_bytes: int
+
+
+def cases() -> list[Case]:
+    return [
+        Case("wide_select", 2_000, wide_select_plan(2_000), SINGLE_SOURCE_MAPPING),
+        Case("with_columns_chain", 500, deep_with_columns_plan(500), SINGLE_SOURCE_MAPPING),
+        Case("diamond", 500, diamond_plan(500), SINGLE_SOURCE_MAPPING),
+        Case("overlap_join", 500, overlap_join_plan(500), JOIN_MAPPING),
+        Case("group_by", 2_000, group_by_plan(2_000), SINGLE_SOURCE_MAPPING),
+    ]
+
+
+def _calibration_workload() -> None:
+    words = [f"column_{index % 997}_{index}" for index in range(60_000)]
+    counts: dict[str, int] = {}
+    for word in sorted(words):
+        counts[word[:10]] = counts.get(word[:10], 0) + 1
+
+
+def _timed_run(func: Callable[[], object], loops: int = 1) -> float:
+    """Mean seconds per call over ``loops`` cold-cache calls."""
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for _ in range(loops):
+            clear_expression_cache()
+            func()
+        return (time.perf_counter() - started) / loops
+    finally:
+        gc.enable()
+
+
+def _loops_for(func: Callable[[], object]) -> int:
+    single = _timed_run(func)
+    return max(1, math.ceil(MIN_SAMPLE_SECONDS / single)) if single > 0 else 1
+
+
+def _measure(func: Callable[[], object], repeats: int) -> Measurement:
+    """Best-of timing, normalized by a calibration workload run between repeats."""
+    loops = _loops_for(func)
+    timings: list[float] = []
+    calibrations: list[float] = []
+    for _ in range(repeats):
+        calibrations.append(_timed_run(_calibration_workload))
+        timings.append(_timed_run(func, loops))
+    clear_expression_cache()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Measurement(
+        seconds=min(timings), relative=min(timings) / min(calibrations), peak_bytes=peak
+    )
+
+
+def run_case(case: Case, repeats: int) -> dict[str, Measurement]:
+    extracted = extract_plan_lineage(case.plan, case.mapping)
+    resolved = resolve_transitive_lineage(extracted)
+    results = {
+        "extract": _measure(lambda: extract_plan_lineage(case.plan, case.mapping), repeats),
+        "resolve": _measure(lambda: resolve_transitive_lineage(extracted), repeats),
+    }
+    for output_format in get_args(OutputFormat):
+        results[f"export_{output_format}"] = _measure(
+            lambda: export_lineage(resolved, case.mapping, output_format), repeats
+        )
+    results["export_many"] = _measure(
+        lambda: export_lineage_many(resolved, case.mapping, get_args(OutputFormat)), repeats
+    )
+    return results
+
+
+def _regressions(
+    name: str,
+    current: Measurement,
+    baseline: Measurement,
+    time_tolerance: float,
+    time_floor: float,
+    memory_tolerance: float,
+) -> list[str]:
+    failures: list[str] = []
+    allowed = max(baseline.relative * (1 + time_tolerance), baseline.relative + time_floor)
+    if current.relative > allowed:
+        failures.append(
+            f"{name}: {current.relative:.3f} vs baseline {baseline.relative:.3f} calibration units"
+        )
+    if current.peak_bytes > baseline.peak_bytes * (1 + memory_tolerance):
+        failures.append(f"{name}: peak {current.peak_bytes} B vs baseline {baseline.peak_bytes} B")
+    return failures
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--time-tolerance", type=float, default=DEFAULT_TIME_TOLERANCE)
+    parser.add_argument("--time-floor", type=float, default=DEFAULT_TIME_FLOOR)
+    parser.add_argument("--memory-tolerance", type=float, default=DEFAULT_MEMORY_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    baseline: dict[str, Measurement] = {}
+    if args.baseline.exists() and not args.update_baseline:
+        stored = json.loads(args.baseline.read_text(encoding="utf-8"))
+        baseline = {name: Measurement(**values) for name, values in stored.items()}
+
+    current: dict[str, Measurement] = {}
+    failures: list[str] = []
+    print(f"{'case':<46} {'best_s':>10} {'peak_kib':>10} {'vs_base':>8}")
+    for case in cases():
+        for stage, measurement in run_case(case, args.repeats).items():
+            name = f"{case.name}.{stage}"
+            current[name] = measurement
+            reference = baseline.get(name)
+            ratio = "" if reference is None else f"{measurement.relative / reference.relative:.2f}x"
+            print(
+                f"{name:<46} {measurement.seconds:>10.4f} "
+                f"{measurement.peak_bytes / 1024:>10.1f} {ratio:>8}"
+            )
+            if reference is not None:
+                failures.extend(
+                    _regressions(
+                        name,
+                        measurement,
+                        reference,
+                        args.time_tolerance,
+                        args.time_floor,
+                        args.memory_tolerance,
+                    )
+                )
+
+    if args.update_baseline:
+        payload = {
+            name: {key: round(value, 6) for key, value in asdict(measurement).items()}
+            for name, measurement in sorted(current.items())
+        }
+        args.baseline.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if not baseline:
+        print(f"no baseline at {args.baseline}; run with --update-baseline first")
+        return 0
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
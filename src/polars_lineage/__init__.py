@@ -1,11 +1,21 @@
 from __future__ import annotations
 
 from polars_lineage.exporter.models import LineageDocument
-from polars_lineage.lineage_namespace import register_lineage_namespace
+from polars_lineage.lineage_namespace import (
+    disable_recording,
+    enable_recording,
+    is_recording,
+    recording,
+    register_lineage_namespace,
+)
 
 __all__ = [
     "__version__",
     "LineageDocument",
+    "disable_recording",
+    "enable_recording",
+    "is_recording",
+    "recording",
 ]
 
 __version__ = "0.1.0"
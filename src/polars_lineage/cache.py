@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from polars_lineage._stats import CacheStats as CacheStats
+from polars_lineage.config import MappingConfig
+from polars_lineage.disk_cache import DEFAULT_MAX_BYTES, SQLiteLineageCache
+from polars_lineage.ir import ColumnLineage
+
+DEFAULT_CACHE_SIZE = 256
+
+
+def mapping_fingerprint(mapping: MappingConfig) -> str:
+    payload = json.dumps(mapping.model_dump(mode="json"), sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def plan_digest(plan: str, *extra: str) -> str:
+    digest = hashlib.sha256()
+    for part in (plan, *extra):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _combined_key(plan_hash: str, mapping_hash: str) -> str:
+    return hashlib.sha256(f"{plan_hash}\0{mapping_hash}".encode()).hexdigest()
+
+
+def plan_fingerprint(plan: str, mapping: MappingConfig, *extra: str) -> str:
+    """Hash plan text, the mapping and any extra discriminators into one cache key."""
+    return _combined_key(plan_digest(plan, *extra), mapping_fingerprint(mapping))
+
+
+class LineageCache:
+    """Thread-safe LRU of resolved lineage keyed by ``plan_fingerprint``.
+
+    A ``maxsize`` of ``0`` disables caching while still counting misses.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE) -> None:
+        if maxsize < 0:
+            raise ValueError("cache maxsize must be >= 0")
+        self._maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[ColumnLineage, ...]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: str) -> list[ColumnLineage] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return list(entry)
+
+    def put(self, key: str, lineage: list[ColumnLineage]) -> None:
+        with self._lock:
+            if self._maxsize == 0:
+                return
+            self._entries[key] = tuple(lineage)
+            self._entries.move_to_end(key)
+            self._evict_locked()
+
+    def resize(self, maxsize: int) -> None:
+        if maxsize < 0:
+            raise ValueError("cache maxsize must be >= 0")
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict_locked()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._entries),
+                maxsize=self._maxsize,
+            )
+
+    def _evict_locked(self) -> None:
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+
+_LINEAGE_CACHE = LineageCache()
+_DISK_CACHE: SQLiteLineageCache | None = None
+
+
+def get_lineage_cache() -> LineageCache:
+    return _LINEAGE_CACHE
+
+
+def configure_lineage_cache(maxsize: int) -> None:
+    _LINEAGE_CACHE.resize(maxsize)
+
+
+def lineage_cache_stats() -> CacheStats:
+    return _LINEAGE_CACHE.stats()
+
+
+def clear_lineage_cache() -> None:
+    _LINEAGE_CACHE.clear()
+
+
+def configure_disk_cache(
+    path: Path | None, *, max_bytes: int = DEFAULT_MAX_BYTES
+) -> SQLiteLineageCache | None:
+    """Enable the shared SQLite cache at ``path``, or disable it with ``None``."""
+    global _DISK_CACHE
+    _DISK_CACHE = None if path is None else SQLiteLineageCache(path, max_bytes=max_bytes)
+    return _DISK_CACHE
+
+
+def get_disk_cache() -> SQLiteLineageCache | None:
+    return _DISK_CACHE
+
+
+def lookup_cached_lineage(plan_hash: str, mapping_hash: str) -> list[ColumnLineage] | None:
+    """Check the in-process LRU, then the disk cache, promoting disk hits into memory."""
+    key = _combined_key(plan_hash, mapping_hash)
+    cached = _LINEAGE_CACHE.get(key)
+    if cached is not None:
+        return cached
+    disk_cache = _DISK_CACHE
+    if disk_cache is None:
+        return None
+    cached = disk_cache.get(plan_hash, mapping_hash)
+    if cached is not None:
+        _LINEAGE_CACHE.put(key, cached)
+    return cached
+
+
+def store_cached_lineage(plan_hash: str, mapping_hash: str, lineage: list[ColumnLineage]) -> None:
+    _LINEAGE_CACHE.put(_combined_key(plan_hash, mapping_hash), lineage)
+    disk_cache = _DISK_CACHE
+    if disk_cache is not None:
+        disk_cache.put(plan_hash, mapping_hash, lineage)
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+STATE_VERSION = 1
+
+EdgeKey = tuple[str, str]
+
+
+def content_hash(value: Any) -> str:
+    """SHA-256 of the canonical JSON form of ``value`` (sorted keys, compact separators)."""
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def openmetadata_edge_key(payload: Mapping[str, Any]) -> EdgeKey:
+    """``(source_fqn, destination_fqn)`` of one ``addLineage`` payload."""
+    edge = payload["edge"]
+    return (
+        edge["fromEntity"]["fullyQualifiedName"],
+        edge["toEntity"]["fullyQualifiedName"],
+    )
+
+
+def openmetadata_payload_hash(payload: Mapping[str, Any]) -> str:
+    return content_hash(payload)
+
+
+@dataclass(frozen=True)
+class LineageChanges:
+    """Edges that differ from the published state; ``removed`` holds edge keys only."""
+
+    added: tuple[Mapping[str, Any], ...] = ()
+    changed: tuple[Mapping[str, Any], ...] = ()
+    removed: tuple[EdgeKey, ...] = ()
+    unchanged: int = 0
+    hashes: Mapping[EdgeKey, str] = field(default_factory=dict)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.changed or self.removed)
+
+
+class PublishedLineageState:
+    """Content hashes of the edges last published, per destination table, in a JSON file.
+
+    Only destinations that appear in a diff are compared, so runs for different
+    destination tables can share one state file. ``save`` replaces the file
+    atomically.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._hashes: dict[str, dict[str, str]] = {}
+        if path.exists():
+            payload = json.loads(path.read_text(encoding="utf-8"))
+            if payload.get("version") != STATE_VERSION:
+                raise ValueError(f"unsupported lineage state version: {payload.get('version')}")
+            self._hashes = {
+                destination: dict(sources)
+                for destination, sources in payload["destinations"].items()
+            }
+
+    def published_hash(self, key: EdgeKey) -> str | None:
+        source_fqn, destination_fqn = key
+        return self._hashes.get(destination_fqn, {}).get(source_fqn)
+
+    def diff(
+        self,
+        payloads: Sequence[Mapping[str, Any]],
+        destination_tables: Iterable[str] | None = None,
+    ) -> LineageChanges:
+        """Compare payloads with the state for their destinations (or ``destination_tables``).
+
+        Pass ``destination_tables`` explicitly when a destination may have lost all of
+        its edges, so its previously published edges are reported as removed.
+        """
+        hashes: dict[EdgeKey, str] = {}
+        added: list[Mapping[str, Any]] = []
+        changed: list[Mapping[str, Any]] = []
+        unchanged = 0
+        for payload in payloads:
+            key = openmetadata_edge_key(payload)
+            if key in hashes:
+                raise ValueError(f"duplicate lineage edge: {key[0]} -> {key[1]}")
+            digest = openmetadata_payload_hash(payload)
+            hashes[key] = digest
+            published = self.published_hash(key)
+            if published is None:
+                added.append(payload)
+            elif published != digest:
+                changed.append(payload)
+            else:
+                unchanged += 1
+
+        destinations = set(
+            destination_tables
+            if destination_tables is not None
+            else (destination for _, destination in hashes)
+        )
+        removed = sorted(
+            (source, destination)
+            for destination in destinations
+            for source in self._hashes.get(destination, {})
+            if (source, destination) not in hashes
+        )
+        return LineageChanges(
+            added=tuple(added),
+            changed=tuple(changed),
+            removed=tuple(removed),
+            unchanged=unchanged,
+            hashes=hashes,
+        )
+
+    def mark_published(self, key: EdgeKey, digest: str) -> None:
+        source_fqn, destination_fqn = key
+        self._hashes.setdefault(destination_fqn, {})[source_fqn] = digest
+
+    def mark_removed(self, key: EdgeKey) -> None:
+        source_fqn, destination_fqn = key
+        sources = self._hashes.get(destination_fqn)
+        if sources is None:
+            return
+        sources.pop(source_fqn, None)
+        if not sources:
+            del self._hashes[destination_fqn]
+
+    def save(self) -> None:
+        payload = {
+            "version": STATE_VERSION,
+            "destinations": {
+                destination: dict(sorted(sources.items()))
+                for destination, sources in sorted(self._hashes.items())
+            },
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(
+            dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as stream:
+                json.dump(payload, stream, indent=2)
+                stream.write("\n")
+            os.replace(temporary, self.path)
+        except BaseException:
+            Path(temporary).unlink(missing_ok=True)
+            raise
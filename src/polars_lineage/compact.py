@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Literal
+
+from polars_lineage.ir import ColumnLineage, ColumnRef, DatasetRef
+
+
+class ColumnInterner:
+    """Integer ids for datasets and ``(dataset, column)`` pairs.
+
+    Dataset FQNs are computed once per dataset, and pydantic ``ColumnRef`` objects
+    are only built when lineage leaves the compact representation.
+    """
+
+    __slots__ = (
+        "_column_ids",
+        "_column_refs",
+        "_dataset_ids",
+        "column_dataset",
+        "column_name",
+        "dataset_fqns",
+        "datasets",
+    )
+
+    def __init__(self) -> None:
+        self.datasets: list[DatasetRef] = []
+        self.dataset_fqns: list[str] = []
+        self.column_dataset: list[int] = []
+        self.column_name: list[str] = []
+        self._dataset_ids: dict[DatasetRef, int] = {}
+        self._column_ids: dict[tuple[int, str], int] = {}
+        self._column_refs: list[ColumnRef | None] = []
+
+    def dataset_id(self, dataset: DatasetRef) -> int:
+        dataset_id = self._dataset_ids.get(dataset)
+        if dataset_id is None:
+            dataset_id = len(self.datasets)
+            self._dataset_ids[dataset] = dataset_id
+            self.datasets.append(dataset)
+            self.dataset_fqns.append(dataset.fqn)
+        return dataset_id
+
+    def column_id(self, dataset_id: int, column: str) -> int:
+        key = (dataset_id, column)
+        column_id = self._column_ids.get(key)
+        if column_id is None:
+            column_id = len(self.column_name)
+            self._column_ids[key] = column_id
+            self.column_dataset.append(dataset_id)
+            self.column_name.append(column)
+            self._column_refs.append(None)
+        return column_id
+
+    def intern(self, column: ColumnRef) -> int:
+        column_id = self.column_id(self.dataset_id(column.dataset), column.column)
+        if self._column_refs[column_id] is None:
+            self._column_refs[column_id] = column
+        return column_id
+
+    def sort_key(self, column_id: int) -> tuple[str, str]:
+        return (self.dataset_fqns[self.column_dataset[column_id]], self.column_name[column_id])
+
+    def column_ref(self, column_id: int) -> ColumnRef:
+        column = self._column_refs[column_id]
+        if column is None:
+            column = ColumnRef(
+                dataset=self.datasets[self.column_dataset[column_id]],
+                column=self.column_name[column_id],
+            )
+            self._column_refs[column_id] = column
+        return column
+
+
+@dataclass(frozen=True, slots=True)
+class CompactEdge:
+    target: int
+    sources: tuple[int, ...]
+    function: str
+    confidence: Literal["exact", "inferred", "unknown"]
+
+
+@dataclass(slots=True)
+class CompactLineage:
+    """Lineage edges over interned column ids; the internal form of ``list[ColumnLineage]``."""
+
+    columns: ColumnInterner = field(default_factory=ColumnInterner)
+    edges: list[CompactEdge] = field(default_factory=list)
+
+    @classmethod
+    def from_lineage(cls, lineage: list[ColumnLineage]) -> CompactLineage:
+        compact = cls()
+        intern = compact.columns.intern
+        compact.edges = [
+            CompactEdge(
+                target=intern(item.to_column),
+                sources=tuple(intern(source) for source in item.from_columns),
+                function=item.function,
+                confidence=item.confidence,
+            )
+            for item in lineage
+        ]
+        return compact
+
+    def add_edge(
+        self,
+        target: int,
+        sources: tuple[int, ...],
+        function: str,
+        confidence: Literal["exact", "inferred", "unknown"],
+    ) -> None:
+        self.edges.append(
+            CompactEdge(target=target, sources=sources, function=function, confidence=confidence)
+        )
+
+    def to_lineage(self) -> list[ColumnLineage]:
+        """Materialize pydantic edges, reusing one ``ColumnRef`` per interned column.
+
+        ``ColumnRef`` objects are validated when first built. Edges skip model
+        validation because their sources are already sorted, so only the function
+        text is checked here.
+        """
+        column_ref = self.columns.column_ref
+        sort_key = self.columns.sort_key
+        lineage: list[ColumnLineage] = []
+        for edge in self.edges:
+            function = edge.function.strip()
+            if not function:
+                raise ValueError("lineage function text is required")
+            lineage.append(
+                ColumnLineage.model_construct(
+                    from_columns=tuple(
+                        column_ref(source) for source in sorted(edge.sources, key=sort_key)
+                    ),
+                    to_column=column_ref(edge.target),
+                    function=function,
+                    confidence=edge.confidence,
+                )
+            )
+        return lineage
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Any, NoReturn
 
 import yaml
 from pydantic import BaseModel, ConfigDict, field_validator
@@ -21,8 +22,26 @@ def _validate_source_alias(value: str) -> str:
     return normalized
 
 
+class ReadOnlySources(dict[str, str]):
+    """``MappingConfig.sources``: a ``dict`` that rejects in-place changes.
+
+    One ``MappingConfig`` is shared by every frame derived from a source, and
+    ``frozen=True`` does not stop ``mapping.sources[alias] = fqn`` from editing it.
+    """
+
+    def _read_only(self, *args: Any, **kwargs: Any) -> NoReturn:
+        raise TypeError("MappingConfig.sources is read-only; build a new MappingConfig instead")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self) -> tuple[type[ReadOnlySources], tuple[dict[str, str]]]:
+        # Pickle fills dict subclasses item by item, which ``__setitem__`` refuses.
+        return type(self), (dict(self),)
+
+
 class MappingConfig(BaseModel):
-    model_config = ConfigDict(extra="forbid")
+    model_config = ConfigDict(extra="forbid", frozen=True)
 
     sources: dict[str, str]
     destination_table: str
@@ -44,7 +63,7 @@ class MappingConfig(BaseModel):
             if normalized_alias in normalized_sources:
                 raise ValueError(f"duplicate source alias after normalization: {normalized_alias}")
             normalized_sources[normalized_alias] = _validate_fqn(fqn)
-        return normalized_sources
+        return ReadOnlySources(normalized_sources)
 
 
 def load_mapping_config(path: Path) -> MappingConfig:
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import closing
+from dataclasses import dataclass
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+from pydantic import TypeAdapter, ValidationError
+
+from polars_lineage.ir import ColumnLineage
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_LINEAGE_LIST = TypeAdapter(list[ColumnLineage])
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS lineage_cache (
+        plan_hash TEXT NOT NULL,
+        mapping_hash TEXT NOT NULL,
+        version TEXT NOT NULL,
+        payload BLOB NOT NULL,
+        size_bytes INTEGER NOT NULL,
+        last_access REAL NOT NULL,
+        PRIMARY KEY (plan_hash, mapping_hash, version)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS lineage_cache_last_access ON lineage_cache (last_access)",
+)
+
+
+def _package_version() -> str:
+    try:
+        return version("polars-lineage")
+    except PackageNotFoundError:  # pragma: no cover - source checkout without metadata
+        return "0+unknown"
+
+
+@dataclass(frozen=True)
+class DiskCacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    errors: int
+    entries: int
+    size_bytes: int
+    max_bytes: int
+
+
+class SQLiteLineageCache:
+    """Resolved lineage persisted in SQLite and shared by every process using ``path``.
+
+    Entries are keyed by plan hash, mapping hash and the installed polars-lineage
+    version, so upgrading the package never serves lineage computed by an older
+    extractor. Writers take an immediate transaction and the database runs in WAL
+    mode, which lets many readers proceed while one process inserts or evicts.
+    Once the stored payload exceeds ``max_bytes`` the least recently read entries
+    are deleted. Database errors are counted and treated as cache misses.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        timeout: float = 30.0,
+        version: str | None = None,
+    ) -> None:
+        if max_bytes <= 0:
+            raise ValueError("disk cache max_bytes must be > 0")
+        self.path = path
+        self.max_bytes = max_bytes
+        self._timeout = timeout
+        self._version = version or _package_version()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._errors = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            with connection:
+                for statement in _SCHEMA:
+                    connection.execute(statement)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=self._timeout, isolation_level=None)
+        connection.execute(f"PRAGMA busy_timeout = {int(self._timeout * 1000)}")
+        return connection
+
+    def _count(
+        self, *, hits: int = 0, misses: int = 0, evictions: int = 0, errors: int = 0
+    ) -> None:
+        with self._lock:
+            self._hits += hits
+            self._misses += misses
+            self._evictions += evictions
+            self._errors += errors
+
+    def get(self, plan_hash: str, mapping_hash: str) -> list[ColumnLineage] | None:
+        key = (plan_hash, mapping_hash, self._version)
+        try:
+            with closing(self._connect()) as connection:
+                row = connection.execute(
+                    "SELECT payload FROM lineage_cache "
+                    "WHERE plan_hash = ? AND mapping_hash = ? AND version = ?",
+                    key,
+                ).fetchone()
+                if row is None:
+                    self._count(misses=1)
+                    return None
+                connection.execute(
+                    "UPDATE lineage_cache SET last_access = ? "
+                    "WHERE plan_hash = ? AND mapping_hash = ? AND version = ?",
+                    (time.time(), *key),
+                )
+            lineage = _LINEAGE_LIST.validate_json(zlib.decompress(row[0]))
+        except (sqlite3.Error, zlib.error, ValidationError):
+            self._count(misses=1, errors=1)
+            return None
+        self._count(hits=1)
+        return lineage
+
+    def put(self, plan_hash: str, mapping_hash: str, lineage: list[ColumnLineage]) -> None:
+        payload = zlib.compress(_LINEAGE_LIST.dump_json(lineage))
+        if len(payload) > self.max_bytes:
+            return
+        try:
+            with closing(self._connect()) as connection:
+                connection.execute("BEGIN IMMEDIATE")
+                try:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO lineage_cache "
+                        "(plan_hash, mapping_hash, version, payload, size_bytes, last_access) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (
+                            plan_hash,
+                            mapping_hash,
+                            self._version,
+                            payload,
+                            len(payload),
+                            time.time(),
+                        ),
+                    )
+                    evicted = self._evict(connection)
+                    connection.execute("COMMIT")
+                except BaseException:
+                    connection.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error:
+            self._count(errors=1)
+            return
+        self._count(evictions=evicted)
+
+    def _evict(self, connection: sqlite3.Connection) -> int:
+        (total,) = connection.execute(
+            "SELECT COALESCE(SUM(size_bytes), 0) FROM lineage_cache"
+        ).fetchone()
+        excess = total - self.max_bytes
+        if excess <= 0:
+            return 0
+        victims: list[tuple[int]] = []
+        for rowid, size_bytes in connection.execute(
+            "SELECT rowid, size_bytes FROM lineage_cache ORDER BY last_access"
+        ):
+            if excess <= 0:
+                break
+            victims.append((rowid,))
+            excess -= size_bytes
+        connection.executemany("DELETE FROM lineage_cache WHERE rowid = ?", victims)
+        return len(victims)
+
+    def clear(self) -> None:
+        with closing(self._connect()) as connection:
+            connection.execute("DELETE FROM lineage_cache")
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+            self._errors = 0
+
+    def stats(self) -> DiskCacheStats:
+        with closing(self._connect()) as connection:
+            entries, size_bytes = connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM lineage_cache"
+            ).fetchone()
+        with self._lock:
+            return DiskCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                errors=self._errors,
+                entries=entries,
+                size_bytes=size_bytes,
+                max_bytes=self.max_bytes,
+            )
@@ -1,8 +1,14 @@
 from polars_lineage.exporter.json import export_lineage_document
 from polars_lineage.exporter.markdown import export_lineage_markdown
 from polars_lineage.exporter.models import LineageColumn, LineageDocument, LineageEdge
+from polars_lineage.exporter.ndjson import iter_lineage_ndjson, write_lineage_ndjson
 from polars_lineage.exporter.openmetadata import export_openmetadata_requests
-from polars_lineage.exporter.registry import OutputFormat, RenderedLineage, export_lineage
+from polars_lineage.exporter.registry import (
+    OutputFormat,
+    RenderedLineage,
+    export_lineage,
+    export_lineage_many,
+)
 
 __all__ = [
     "LineageColumn",
@@ -12,6 +18,9 @@ __all__ = [
     "RenderedLineage",
     "export_lineage",
     "export_lineage_document",
+    "export_lineage_many",
     "export_lineage_markdown",
     "export_openmetadata_requests",
+    "iter_lineage_ndjson",
+    "write_lineage_ndjson",
 ]
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Literal
+
+from polars_lineage.ir import ColumnLineage
+
+ColumnKey = tuple[str, str, Literal["exact", "inferred", "unknown"]]
+
+
+@dataclass(frozen=True)
+class GroupedLineage:
+    """IR entries grouped by ``(source_fqn, destination_fqn)`` and then by target column.
+
+    ``edges`` maps each table pair to ``(to_column, function, confidence)`` keys and
+    the source column names feeding them. Every exporter renders from this index,
+    so exporting several formats groups the IR once.
+    """
+
+    edges: dict[tuple[str, str], dict[ColumnKey, set[str]]]
+    destination_tables: frozenset[str]
+
+
+def group_lineage(lineage: list[ColumnLineage]) -> GroupedLineage:
+    grouped: dict[tuple[str, str], dict[ColumnKey, set[str]]] = defaultdict(dict)
+    destination_tables: set[str] = set()
+
+    for entry in lineage:
+        destination_dataset_fqn = entry.to_column.dataset.fqn
+        destination_tables.add(destination_dataset_fqn)
+        columns_by_source: dict[str, set[str]] = defaultdict(set)
+        for source in entry.from_columns:
+            columns_by_source[source.dataset.fqn].add(source.column)
+
+        for source_fqn, source_columns in columns_by_source.items():
+            edge_key = (source_fqn, destination_dataset_fqn)
+            column_key = (entry.to_column.column, entry.function, entry.confidence)
+            grouped[edge_key].setdefault(column_key, set()).update(source_columns)
+
+    return GroupedLineage(edges=dict(grouped), destination_tables=frozenset(destination_tables))
@@ -1,8 +1,6 @@
 from __future__ import annotations
 
-from collections import defaultdict
-from typing import Literal
-
+from polars_lineage.exporter.grouping import GroupedLineage, group_lineage
 from polars_lineage.exporter.models import LineageColumn, LineageDocument, LineageEdge
 from polars_lineage.ir import ColumnLineage
 
@@ -19,26 +17,15 @@ def export_lineage_document(
       ``LineageEdge.destination_table`` therefore refer to the same destination
       table FQN.
     """
-    grouped: dict[
-        tuple[str, str],
-        dict[tuple[str, str, Literal["exact", "inferred", "unknown"]], set[str]],
-    ] = defaultdict(dict)
-
-    for entry in lineage:
-        destination_dataset_fqn = entry.to_column.dataset.fqn
-        if destination_dataset_fqn != destination_table:
-            raise ValueError("destination_table must match every entry.to_column.dataset.fqn")
-        columns_by_source: dict[str, set[str]] = defaultdict(set)
-        for source in entry.from_columns:
-            columns_by_source[source.dataset.fqn].add(source.column)
-
-        for source_fqn, source_columns in columns_by_source.items():
-            edge_key = (source_fqn, destination_dataset_fqn)
-            column_key = (entry.to_column.column, entry.function, entry.confidence)
-            grouped[edge_key].setdefault(column_key, set()).update(source_columns)
+    return render_lineage_document(group_lineage(lineage), destination_table)
+
+
+def render_lineage_document(grouped: GroupedLineage, destination_table: str) -> LineageDocument:
+    if grouped.destination_tables - {destination_table}:
+        raise ValueError("destination_table must match every entry.to_column.dataset.fqn")
 
     edges: list[LineageEdge] = []
-    for (source_fqn, destination_fqn), columns_lineage in grouped.items():
+    for (source_fqn, destination_fqn), columns_lineage in grouped.edges.items():
         columns = [
             LineageColumn(
                 to_column=to_column,
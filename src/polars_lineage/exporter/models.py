@@ -4,6 +4,8 @@ from typing import Annotated, Literal
 
 from pydantic import BaseModel, ConfigDict, StringConstraints, field_validator
 
+from polars_lineage.change_detection import content_hash
+
 NonEmptyStr = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
 
 
@@ -41,6 +43,11 @@ class LineageEdge(BaseModel):
             ),
         )
 
+    @property
+    def content_hash(self) -> str:
+        """SHA-256 of the canonical JSON of this edge; stable across runs and processes."""
+        return content_hash(self.model_dump(mode="json"))
+
 
 class LineageDocument(BaseModel):
     model_config = ConfigDict(extra="forbid")
@@ -52,3 +59,8 @@ class LineageDocument(BaseModel):
     @classmethod
     def sort_edges(cls, value: list[LineageEdge]) -> list[LineageEdge]:
         return sorted(value, key=lambda item: (item.source_table, item.destination_table))
+
+    @property
+    def content_hash(self) -> str:
+        """SHA-256 of the canonical JSON of this document; stable across runs and processes."""
+        return content_hash(self.model_dump(mode="json"))
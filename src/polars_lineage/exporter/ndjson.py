@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator
+from typing import Any, TextIO
+
+from polars_lineage.exporter.grouping import GroupedLineage
+from polars_lineage.ir import ColumnLineage
+
+_RecordKey = tuple[str, str, str, str, str]
+
+
+def _record_keys(
+    lineage: list[ColumnLineage], destination_table: str
+) -> list[tuple[_RecordKey, int]]:
+    keys: list[tuple[_RecordKey, int]] = []
+    for index, entry in enumerate(lineage):
+        destination_fqn = entry.to_column.dataset.fqn
+        if destination_fqn != destination_table:
+            raise ValueError("destination_table must match every entry.to_column.dataset.fqn")
+        for source_fqn in {source.dataset.fqn for source in entry.from_columns}:
+            key = (
+                source_fqn,
+                destination_fqn,
+                entry.to_column.column,
+                entry.function,
+                entry.confidence,
+            )
+            keys.append((key, index))
+    keys.sort()
+    return keys
+
+
+def _render_record(key: _RecordKey, from_columns: set[str]) -> str:
+    source_fqn, destination_fqn, to_column, function, confidence = key
+    record: dict[str, Any] = {
+        "source_table": source_fqn,
+        "destination_table": destination_fqn,
+        "to_column": to_column,
+        "from_columns": sorted(from_columns),
+        "function": function,
+        "confidence": confidence,
+    }
+    return json.dumps(record, sort_keys=True, separators=(",", ":")) + "\n"
+
+
+def iter_lineage_ndjson(lineage: list[ColumnLineage], destination_table: str) -> Iterator[str]:
+    """Yield one JSON line per ``(source table, destination column)`` lineage record.
+
+    Records carry the fields of ``LineageColumn`` plus both table FQNs and are
+    ordered by source table, destination table, column, function and confidence.
+    Only a sort key per record is held in memory; each line is rendered on demand.
+    """
+    keys = _record_keys(lineage, destination_table)
+    current: _RecordKey | None = None
+    from_columns: set[str] = set()
+    for key, index in keys:
+        if key != current:
+            if current is not None:
+                yield _render_record(current, from_columns)
+            current = key
+            from_columns = set()
+        from_columns.update(
+            source.column for source in lineage[index].from_columns if source.dataset.fqn == key[0]
+        )
+    if current is not None:
+        yield _render_record(current, from_columns)
+
+
+def render_lineage_ndjson(grouped: GroupedLineage, destination_table: str) -> Iterator[str]:
+    """Yield the records of ``iter_lineage_ndjson`` from already grouped lineage."""
+    if grouped.destination_tables - {destination_table}:
+        raise ValueError("destination_table must match every entry.to_column.dataset.fqn")
+    records = sorted(
+        ((source_fqn, destination_fqn, *column_key), from_columns)
+        for (source_fqn, destination_fqn), columns_lineage in grouped.edges.items()
+        for column_key, from_columns in columns_lineage.items()
+    )
+    for key, from_columns in records:
+        yield _render_record(key, from_columns)
+
+
+def write_lineage_ndjson(
+    lineage: list[ColumnLineage], destination_table: str, stream: TextIO
+) -> int:
+    """Stream NDJSON records to ``stream`` and return the number of records written."""
+    written = 0
+    for line in iter_lineage_ndjson(lineage, destination_table):
+        stream.write(line)
+        written += 1
+    return written
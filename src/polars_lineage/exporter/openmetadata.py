@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from collections import defaultdict
 from typing import Any
 
+from polars_lineage.exporter.grouping import GroupedLineage, group_lineage
 from polars_lineage.ir import ColumnLineage
 
 
@@ -11,21 +11,16 @@ def _dataset_entity(dataset_fqn: str) -> dict[str, str]:
 
 
 def export_openmetadata_requests(lineage: list[ColumnLineage]) -> list[dict[str, Any]]:
-    grouped: dict[tuple[str, str], dict[tuple[str, str], set[str]]] = defaultdict(dict)
+    return render_openmetadata_requests(group_lineage(lineage))
 
-    for entry in lineage:
-        destination_dataset_fqn = entry.to_column.dataset.fqn
-        columns_by_source: dict[str, set[str]] = defaultdict(set)
-        for source in entry.from_columns:
-            columns_by_source[source.dataset.fqn].add(source.column)
-
-        for source_fqn, source_columns in columns_by_source.items():
-            edge_key = (source_fqn, destination_dataset_fqn)
-            column_key = (entry.to_column.column, entry.function)
-            grouped[edge_key].setdefault(column_key, set()).update(source_columns)
 
+def render_openmetadata_requests(grouped: GroupedLineage) -> list[dict[str, Any]]:
     payloads: list[dict[str, Any]] = []
-    for (source_fqn, destination_fqn), columns_lineage in sorted(grouped.items()):
+    for (source_fqn, destination_fqn), lineage_by_column in sorted(grouped.edges.items()):
+        # OpenMetadata has no confidence field, so entries differing only in it merge.
+        columns_lineage: dict[tuple[str, str], set[str]] = {}
+        for (to_column, function, _confidence), from_columns in lineage_by_column.items():
+            columns_lineage.setdefault((to_column, function), set()).update(from_columns)
         serialized_columns = [
             {
                 "fromColumns": sorted(list(from_columns)),
@@ -1,15 +1,21 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
 from typing import TYPE_CHECKING, Any, Literal, TypeAlias, assert_never
 
 from polars_lineage.config import MappingConfig
-from polars_lineage.exporter.json import export_lineage_document
+from polars_lineage.exporter.grouping import group_lineage
+from polars_lineage.exporter.json import export_lineage_document, render_lineage_document
 from polars_lineage.exporter.markdown import export_lineage_markdown
 from polars_lineage.exporter.models import LineageDocument
-from polars_lineage.exporter.openmetadata import export_openmetadata_requests
+from polars_lineage.exporter.ndjson import iter_lineage_ndjson, render_lineage_ndjson
+from polars_lineage.exporter.openmetadata import (
+    export_openmetadata_requests,
+    render_openmetadata_requests,
+)
 from polars_lineage.ir import ColumnLineage
 
-OutputFormat: TypeAlias = Literal["openmetadata", "json", "markdown"]
+OutputFormat: TypeAlias = Literal["openmetadata", "json", "markdown", "ndjson"]
 RenderedLineage: TypeAlias = list[dict[str, Any]] | LineageDocument | str
 
 
@@ -23,6 +29,42 @@ def export_lineage(
     if output_format == "markdown":
         document = export_lineage_document(lineage, destination_table=mapping.destination_table)
         return export_lineage_markdown(document, mapping)
+    if output_format == "ndjson":
+        return "".join(iter_lineage_ndjson(lineage, mapping.destination_table))
     if TYPE_CHECKING:
         assert_never(output_format)
     raise ValueError(f"unsupported output format: {output_format}")
+
+
+def export_lineage_many(
+    lineage: list[ColumnLineage], mapping: MappingConfig, formats: Iterable[OutputFormat]
+) -> dict[OutputFormat, RenderedLineage]:
+    """Render several formats from one grouping pass over ``lineage``.
+
+    The ``json`` and ``markdown`` outputs share a single ``LineageDocument``.
+    """
+    grouped = group_lineage(lineage)
+    document: LineageDocument | None = None
+    rendered: dict[OutputFormat, RenderedLineage] = {}
+    for output_format in formats:
+        if output_format in rendered:
+            continue
+        if output_format == "openmetadata":
+            rendered[output_format] = render_openmetadata_requests(grouped)
+            continue
+        if output_format == "json" or output_format == "markdown":
+            if document is None:
+                document = render_lineage_document(grouped, mapping.destination_table)
+            rendered[output_format] = (
+                document if output_format == "json" else export_lineage_markdown(document, mapping)
+            )
+            continue
+        if output_format == "ndjson":
+            rendered[output_format] = "".join(
+                render_lineage_ndjson(grouped, mapping.destination_table)
+            )
+            continue
+        if TYPE_CHECKING:
+            assert_never(output_format)
+        raise ValueError(f"unsupported output format: {output_format}")
+    return rendered
@@ -1,3 +1,7 @@
 from polars_lineage.extractor.explain_tree import extract_plan_lineage
+from polars_lineage.extractor.serialized_plan import (
+    extract_serialized_plan_lineage,
+    serialize_lazyframe_plan,
+)
 
-__all__ = ["extract_plan_lineage"]
+__all__ = ["extract_plan_lineage", "extract_serialized_plan_lineage", "serialize_lazyframe_plan"]
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+from collections.abc import Collection, Iterable, Mapping
+from dataclasses import dataclass
+from typing import Literal, TypeAlias
+
+from polars_lineage.compact import CompactLineage
+from polars_lineage.config import MappingConfig
+from polars_lineage.extractor.expr_parser import (
+    ParsedExpression,
+    parse_expression,
+    pass_through_column,
+)
+from polars_lineage.instrumentation import count, timed
+from polars_lineage.ir import ColumnLineage, DatasetRef
+
+JoinSide = Literal["left", "right"]
+# Source FQN -> column names, registered when the source was tagged.
+SourceSchemas: TypeAlias = Mapping[str, tuple[str, ...]]
+# Explain text lists at most a few columns of wide frames: ``DF ["a", "b", ...]``.
+ELIDED_COLUMNS = "..."
+
+
+@dataclass(frozen=True)
+class SourceColumns:
+    """Columns exposed by one leaf input of a plan, tagged with its join side."""
+
+    columns: tuple[str, ...]
+    side: JoinSide | None = None
+
+
+@dataclass(frozen=True)
+class PlanNamespace:
+    destination_dataset: DatasetRef
+    namespace_map: dict[str, tuple[DatasetRef, ...]]
+    left_join_keys: frozenset[str]
+    right_join_keys: frozenset[str]
+    left_dataset: DatasetRef | None
+    right_dataset: DatasetRef | None
+
+
+def build_plan_namespace(
+    mapping: MappingConfig,
+    *,
+    join_count: int,
+    source_columns: Iterable[SourceColumns],
+    left_join_keys: Iterable[str] = (),
+    right_join_keys: Iterable[str] = (),
+    source_schemas: SourceSchemas | None = None,
+) -> PlanNamespace:
+    """Index the columns every plan leaf exposes by name.
+
+    Leaves whose column list the plan abbreviated take the rest of their columns
+    from ``source_schemas``.
+    """
+    source_by_alias = {alias: DatasetRef.from_fqn(fqn) for alias, fqn in mapping.sources.items()}
+    source_datasets = list(source_by_alias.values())
+    if not source_datasets:
+        raise ValueError("at least one source dataset is required")
+
+    if join_count == 1 and not {"left", "right"}.issubset(source_by_alias):
+        raise ValueError("join plans require left/right source aliases in mapping.sources")
+
+    left_dataset = source_by_alias.get("left")
+    right_dataset = source_by_alias.get("right")
+    if left_dataset is None and source_datasets:
+        left_dataset = source_datasets[0]
+    if right_dataset is None and len(source_datasets) > 1:
+        right_dataset = source_datasets[1]
+
+    namespace_map: dict[str, set[DatasetRef]] = {}
+    fallback_index = 0
+    for source in source_columns:
+        if source.side == "left" and left_dataset is not None:
+            dataset = left_dataset
+        elif source.side == "right" and right_dataset is not None:
+            dataset = right_dataset
+        elif len(source_datasets) == 1:
+            dataset = source_datasets[0]
+        else:
+            dataset = source_datasets[min(fallback_index, len(source_datasets) - 1)]
+            fallback_index += 1
+
+        for column in complete_columns(source.columns, dataset, source_schemas):
+            namespace_map.setdefault(column, set()).add(dataset)
+
+    return PlanNamespace(
+        destination_dataset=DatasetRef.from_fqn(mapping.destination_table),
+        namespace_map={
+            column: tuple(sorted(candidates, key=lambda item: item.fqn))
+            for column, candidates in namespace_map.items()
+        },
+        left_join_keys=frozenset(left_join_keys),
+        right_join_keys=frozenset(right_join_keys),
+        left_dataset=left_dataset,
+        right_dataset=right_dataset,
+    )
+
+
+def complete_columns(
+    columns: tuple[str, ...], dataset: DatasetRef, source_schemas: SourceSchemas | None
+) -> tuple[str, ...]:
+    """``columns`` of a plan leaf, completed from ``source_schemas`` when abbreviated."""
+    if ELIDED_COLUMNS not in columns or not source_schemas:
+        return columns
+    registered = source_schemas.get(dataset.fqn)
+    if registered is None:
+        return columns
+    listed = tuple(column for column in columns if column != ELIDED_COLUMNS)
+    return tuple(dict.fromkeys((*listed, *registered)))
+
+
+def _resolve_source_dataset(
+    source_column_name: str, namespace: PlanNamespace, derived_columns: set[str]
+) -> DatasetRef:
+    source_candidates = namespace.namespace_map.get(source_column_name)
+    left_join_keys = namespace.left_join_keys
+    right_join_keys = namespace.right_join_keys
+    left_dataset = namespace.left_dataset
+    right_dataset = namespace.right_dataset
+
+    if source_candidates is None:
+        if source_column_name in derived_columns:
+            return namespace.destination_dataset
+        raise ValueError(f"unresolved source column: {source_column_name}")
+    if len(source_candidates) == 1:
+        return source_candidates[0]
+    if (
+        source_column_name in left_join_keys
+        and source_column_name in right_join_keys
+        and left_dataset is not None
+        and left_dataset in source_candidates
+    ):
+        return left_dataset
+    if (
+        source_column_name in left_join_keys
+        and left_dataset is not None
+        and left_dataset in source_candidates
+    ):
+        return left_dataset
+    if (
+        source_column_name in right_join_keys
+        and right_dataset is not None
+        and right_dataset in source_candidates
+    ):
+        return right_dataset
+    if source_column_name in left_join_keys | right_join_keys:
+        return source_candidates[0]
+    candidate_tables = ", ".join(item.fqn for item in source_candidates)
+    raise ValueError(f"ambiguous source column: {source_column_name} candidates={candidate_tables}")
+
+
+def _parse_block_expressions(blocks: list[tuple[str, str]]) -> list[ParsedExpression]:
+    return [parse_expression(expression) for _, expression in blocks]
+
+
+def backward_slice(
+    blocks: list[tuple[str, str]], columns: Collection[str]
+) -> tuple[list[tuple[str, str]], list[ParsedExpression]]:
+    """The blocks ``columns`` depend on, directly or through other blocks, parsed.
+
+    The slice grows from the requested columns through the columns each parsed
+    block reads; blocks outside it are never parsed. Block order is kept.
+    """
+    by_destination: dict[str, list[int]] = {}
+    for index, (destination_column, _) in enumerate(blocks):
+        by_destination.setdefault(destination_column, []).append(index)
+    parsed: dict[int, ParsedExpression] = {}
+    pending = list(dict.fromkeys(columns))
+    visited = set(pending)
+    while pending:
+        for index in by_destination.get(pending.pop(), ()):
+            parsed[index] = parse_expression(blocks[index][1])
+            for source_column in parsed[index].columns:
+                if source_column not in visited:
+                    visited.add(source_column)
+                    pending.append(source_column)
+    order = sorted(parsed)
+    return [blocks[index] for index in order], [parsed[index] for index in order]
+
+
+def _inline_pass_throughs(blocks: Iterable[tuple[str, str]]) -> list[tuple[str, str]]:
+    """Replace bare ``col(name)`` blocks of derived columns by the blocks deriving them.
+
+    A pass-through of a column another block produces carries that block's function,
+    so ``select("t")`` after ``with_columns(... .alias("t"))`` keeps the expression
+    that built ``t``. Names with no other derivation keep their own block.
+    """
+    by_destination: dict[str, list[str]] = {}
+    for destination_column, expression in blocks:
+        by_destination.setdefault(destination_column, []).append(expression)
+
+    resolved: dict[str, tuple[str, ...]] = {}
+    for root in by_destination:
+        path = [root]
+        while path:
+            name = path[-1]
+            if name in resolved:
+                path.pop()
+                continue
+            pending = next(
+                (
+                    upstream
+                    for expression in by_destination[name]
+                    if (upstream := pass_through_column(expression)) in by_destination
+                    and upstream not in resolved
+                    and upstream not in path
+                ),
+                None,
+            )
+            if pending is not None:
+                path.append(pending)
+                continue
+            path.pop()
+            expressions: list[str] = []
+            for expression in by_destination[name]:
+                upstream = pass_through_column(expression)
+                if upstream is None or upstream not in by_destination:
+                    expressions.append(expression)
+                elif upstream in resolved:
+                    expressions.extend(resolved[upstream])
+            resolved[name] = tuple(dict.fromkeys(expressions)) or tuple(by_destination[name])
+    return [
+        (destination_column, expression)
+        for destination_column, expressions in resolved.items()
+        for expression in expressions
+    ]
+
+
+def build_compact_lineage(
+    blocks: Iterable[tuple[str, str]],
+    namespace: PlanNamespace,
+    columns: Collection[str] | None = None,
+) -> CompactLineage:
+    """Turn ``(destination_column, expression_text)`` blocks into direct lineage edges.
+
+    Blocks are deduplicated in order and bare pass-throughs of derived columns take
+    the blocks that derive them. Columns that are not exposed by any source
+    but are produced by another block resolve to the destination dataset so that
+    ``resolve_compact_lineage`` can flatten them afterwards. With ``columns``, only
+    the ``backward_slice`` of those destination columns is parsed.
+    """
+    parsed_blocks = sorted(dict.fromkeys(_inline_pass_throughs(blocks)), key=lambda block: block[0])
+    derived_columns = {destination_column for destination_column, _ in parsed_blocks}
+    if columns is None:
+        parsed_expressions = timed("parse_expression", _parse_block_expressions, parsed_blocks)
+    else:
+        parsed_blocks, parsed_expressions = timed(
+            "parse_expression", backward_slice, parsed_blocks, columns
+        )
+    count("expressions", len(parsed_blocks))
+
+    lineage = CompactLineage()
+    interner = lineage.columns
+    destination_id = interner.dataset_id(namespace.destination_dataset)
+    for (destination_column, _), parsed in zip(parsed_blocks, parsed_expressions, strict=True):
+        source_ids = tuple(
+            interner.column_id(
+                interner.dataset_id(
+                    _resolve_source_dataset(source_column_name, namespace, derived_columns)
+                ),
+                source_column_name,
+            )
+            for source_column_name in parsed.columns
+        )
+        lineage.add_edge(
+            interner.column_id(destination_id, destination_column),
+            source_ids,
+            parsed.function,
+            parsed.confidence,
+        )
+    return lineage
+
+
+def build_column_lineage(
+    blocks: Iterable[tuple[str, str]], namespace: PlanNamespace
+) -> list[ColumnLineage]:
+    return build_compact_lineage(blocks, namespace).to_lineage()
@@ -1,32 +1,110 @@
 from __future__ import annotations
 
 import re
+from bisect import bisect_right
+from collections.abc import Collection
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Literal
 
+from polars_lineage.compact import CompactLineage
 from polars_lineage.config import MappingConfig
-from polars_lineage.extractor.expr_parser import parse_expression
-from polars_lineage.ir import ColumnLineage, ColumnRef, DatasetRef
+from polars_lineage.extractor.assembly import (
+    ELIDED_COLUMNS,
+    JoinSide,
+    PlanNamespace,
+    SourceColumns,
+    SourceSchemas,
+    build_compact_lineage,
+    build_plan_namespace,
+)
+from polars_lineage.extractor.plan_graph import (
+    PlanNode,
+    PlanNodeKind,
+    build_scoped_lineage,
+    intern_plan_node,
+)
+from polars_lineage.instrumentation import timed
+from polars_lineage.ir import ColumnLineage
 
-_DF_COLUMNS_PATTERN = re.compile(r"DF \[(?P<columns>[^\]]+)\]")
 _BOX_CHARS = re.compile(r"[┌┐└┘├┤┬┴─╭╮╯╰│]+")
 _ALIAS_PATTERN = re.compile(r'\.alias\("([^"]+)"\)')
 _COLUMN_PATTERN = re.compile(r'col\("([^"]+)"\)')
-_EXPR_BLOCK_PATTERN = re.compile(
-    r"expression:\s*(?P<body>.*?)"
-    r"(?=(?:expression:|aggregate by:|FROM:|left on:|right on:|LEFT PLAN:|RIGHT PLAN:|$))"
-)
-_AGG_BY_PATTERN = re.compile(
-    r"aggregate by:\s*(?P<body>.*?)"
-    r"(?=(?:expression:|FROM:|left on:|right on:|LEFT PLAN:|RIGHT PLAN:|$))"
-)
-_LEFT_JOIN_SIDE_PATTERN = re.compile(
-    r"left on:\s*(?P<body>.*?)"
-    r"(?=(?:right on:|LEFT PLAN:|RIGHT PLAN:|expression:|aggregate by:|FROM:|$))"
-)
-_RIGHT_JOIN_SIDE_PATTERN = re.compile(
-    r"right on:\s*(?P<body>.*?)"
-    r"(?=(?:LEFT PLAN:|RIGHT PLAN:|expression:|aggregate by:|FROM:|$))"
+_JOIN_PATTERN = re.compile(r"\bJOIN\b")
+_ROW_LABEL_PATTERN = re.compile(r"\s*(\d+) │")
+_SECTION_LABEL_PATTERN = re.compile(r"([a-z][a-z ]*):\s*")
+_NODE_PREFIX_PATTERN = re.compile(r"(?:FROM|LEFT PLAN|RIGHT PLAN|PLAN \d+):\s*")
+_DF_PATTERN = re.compile(r"DF \[([^\]]*)\]")
+# Tree explain fills a file scan's leaf box with the text of the whole plan above it.
+_FILE_SCAN_MARKER = " SCAN ["
+_PLAN_TOKEN_PATTERN = re.compile(
+    r"(?P<section>expression:|aggregate by:|FROM:|left on:|right on:|LEFT PLAN:|RIGHT PLAN:)"
+    r"|DF \[(?P<columns>[^\]]+)\]"
+    r"|(?P<join>\bJOIN\b)"
 )
 
+_PlanTokenKind = Literal["expression", "aggregate_by", "left_on", "right_on", "df", "join"]
+
+_SECTION_KINDS: dict[str, _PlanTokenKind | None] = {
+    "expression:": "expression",
+    "aggregate by:": "aggregate_by",
+    "left on:": "left_on",
+    "right on:": "right_on",
+    "FROM:": None,
+    "LEFT PLAN:": None,
+    "RIGHT PLAN:": None,
+}
+
+
+@dataclass(frozen=True)
+class _PlanToken:
+    """One lexical unit of an explain-tree column text.
+
+    ``expression``/``aggregate_by``/``left_on``/``right_on`` tokens carry the text
+    up to the next section marker. ``df`` tokens carry the raw ``DF [...]`` column
+    list and the join side (``LEFT PLAN:``/``RIGHT PLAN:``) they were found under.
+    """
+
+    kind: _PlanTokenKind
+    column_index: int
+    body: str
+    side: JoinSide | None = None
+
+
+@dataclass
+class _Box:
+    """One ``╭…╯`` box of a box-layout explain tree.
+
+    ``top_connector`` is the column of the ``┴`` linking the box to its parent and
+    ``bottom_connector`` the column of the first ``┬`` below it (``-1`` if absent).
+    """
+
+    start: int
+    end: int
+    top_connector: int
+    lines: list[str] = field(default_factory=list)
+    row: int = -1
+    bottom_connector: int = -1
+    children: list[_Box] = field(default_factory=list)
+
+    @cached_property
+    def text(self) -> str:
+        # Long expressions wrap onto indented ``.method()`` continuation lines.
+        parts = [line.strip() for line in self.lines if line.strip()]
+        text = "".join(
+            part if index == 0 or part.startswith(".") else f" {part}"
+            for index, part in enumerate(parts)
+        )
+        return re.sub(r"\s+", " ", text)
+
+    def section(self) -> tuple[str, str] | None:
+        """``(label, body)`` for section boxes such as ``left on:``; ``None`` for plan nodes."""
+        text = self.text
+        label = _SECTION_LABEL_PATTERN.match(text)
+        if label is None or _NODE_PREFIX_PATTERN.match(text):
+            return None
+        return label.group(1), text[label.end() :]
+
 
 def _normalize_block(value: str) -> str:
     text = _BOX_CHARS.sub(" ", value)
@@ -51,173 +129,286 @@ def _column_texts_from_tree(plan: str) -> dict[int, str]:
     return {column_index: " ".join(tokens) for column_index, tokens in column_tokens.items()}
 
 
-def _parse_join_keys(column_texts: dict[int, str]) -> tuple[set[str], set[str]]:
+def _tokenize_column_text(column_index: int, text: str) -> list[_PlanToken]:
+    tokens: list[_PlanToken] = []
+    open_kind: _PlanTokenKind | None = None
+    open_start = 0
+    plan_side: JoinSide | None = None
+
+    for match in _PLAN_TOKEN_PATTERN.finditer(text):
+        marker = match.group("section")
+        if marker is None:
+            if match.group("columns") is not None:
+                tokens.append(
+                    _PlanToken(
+                        kind="df",
+                        column_index=column_index,
+                        body=match.group("columns"),
+                        side=plan_side,
+                    )
+                )
+            else:
+                tokens.append(_PlanToken(kind="join", column_index=column_index, body="JOIN"))
+            continue
+
+        if open_kind is not None:
+            body = text[open_start : match.start()].strip()
+            tokens.append(_PlanToken(kind=open_kind, column_index=column_index, body=body))
+        open_kind = _SECTION_KINDS[marker]
+        open_start = match.end()
+        if marker == "LEFT PLAN:":
+            plan_side = "left"
+        elif marker == "RIGHT PLAN:":
+            plan_side = "right"
+
+    if open_kind is not None:
+        body = text[open_start:].strip()
+        tokens.append(_PlanToken(kind=open_kind, column_index=column_index, body=body))
+    return tokens
+
+
+def _tokenize_column_texts(column_texts: dict[int, str]) -> list[_PlanToken]:
+    tokens: list[_PlanToken] = []
+    for column_index in sorted(column_texts):
+        tokens.extend(_tokenize_column_text(column_index, column_texts[column_index]))
+    return tokens
+
+
+def _parse_join_keys(tokens: list[_PlanToken]) -> tuple[set[str], set[str]]:
     left_join_keys: set[str] = set()
     right_join_keys: set[str] = set()
-    for text in column_texts.values():
-        for side_match in _LEFT_JOIN_SIDE_PATTERN.finditer(text):
-            left_join_keys.update(_COLUMN_PATTERN.findall(side_match.group("body")))
-        for side_match in _RIGHT_JOIN_SIDE_PATTERN.finditer(text):
-            right_join_keys.update(_COLUMN_PATTERN.findall(side_match.group("body")))
+    for token in tokens:
+        if token.kind == "left_on":
+            left_join_keys.update(_COLUMN_PATTERN.findall(token.body))
+        elif token.kind == "right_on":
+            right_join_keys.update(_COLUMN_PATTERN.findall(token.body))
     return left_join_keys, right_join_keys
 
 
 def _parse_datasets(
-    column_texts: dict[int, str], mapping: MappingConfig
-) -> tuple[
-    DatasetRef,
-    dict[str, tuple[DatasetRef, ...]],
-    set[str],
-    set[str],
-    DatasetRef | None,
-    DatasetRef | None,
-]:
-    source_by_alias = {alias: DatasetRef.from_fqn(fqn) for alias, fqn in mapping.sources.items()}
-    source_datasets = list(source_by_alias.values())
-    if not source_datasets:
-        raise ValueError("at least one source dataset is required")
-
-    combined_text = " ".join(column_texts.values())
-    join_count = len(re.findall(r"\bJOIN\b", combined_text))
-    if join_count > 1:
-        raise ValueError("multiple joins are not supported yet")
-    if join_count == 1 and not {"left", "right"}.issubset(source_by_alias):
-        raise ValueError("join plans require left/right source aliases in mapping.sources")
-
-    left_dataset = source_by_alias.get("left")
-    right_dataset = source_by_alias.get("right")
-    if left_dataset is None and source_datasets:
-        left_dataset = source_datasets[0]
-    if right_dataset is None and len(source_datasets) > 1:
-        right_dataset = source_datasets[1]
-
-    destination_dataset = DatasetRef.from_fqn(mapping.destination_table)
-    left_join_keys, right_join_keys = _parse_join_keys(column_texts)
-
-    df_matches: list[tuple[int, re.Match[str]]] = []
-    for column_index, text in column_texts.items():
-        for match in _DF_COLUMNS_PATTERN.finditer(text):
-            df_matches.append((column_index, match))
-
-    if not df_matches:
-        return destination_dataset, {}, left_join_keys, right_join_keys, left_dataset, right_dataset
-
-    namespace_map: dict[str, set[DatasetRef]] = {}
-    fallback_index = 0
-    for _, match in sorted(df_matches, key=lambda item: item[0]):
-        text = match.string
-
-        left_marker = text.rfind("LEFT PLAN:", 0, match.start())
-        right_marker = text.rfind("RIGHT PLAN:", 0, match.start())
-
-        if left_marker > right_marker and left_dataset is not None:
-            dataset = left_dataset
-        elif right_marker > left_marker and right_dataset is not None:
-            dataset = right_dataset
-        elif len(source_datasets) == 1:
-            dataset = source_datasets[0]
-        else:
-            dataset = source_datasets[min(fallback_index, len(source_datasets) - 1)]
-            fallback_index += 1
-
-        column_values = [item.strip().strip('"') for item in match.group("columns").split(",")]
-        for column in column_values:
-            namespace_map.setdefault(column, set()).add(dataset)
-
-    normalized_map = {
-        column: tuple(sorted(candidates, key=lambda item: item.fqn))
-        for column, candidates in namespace_map.items()
+    tokens: list[_PlanToken], mapping: MappingConfig, source_schemas: SourceSchemas | None = None
+) -> PlanNamespace:
+    left_join_keys, right_join_keys = _parse_join_keys(tokens)
+    return build_plan_namespace(
+        mapping,
+        join_count=sum(1 for token in tokens if token.kind == "join"),
+        source_columns=[
+            SourceColumns(
+                columns=tuple(item.strip().strip('"') for item in token.body.split(",")),
+                side=token.side,
+            )
+            for token in tokens
+            if token.kind == "df"
+        ],
+        left_join_keys=left_join_keys,
+        right_join_keys=right_join_keys,
+        source_schemas=source_schemas,
+    )
+
+
+def _expression_block(expression_text: str) -> tuple[str, str] | None:
+    alias_match = _ALIAS_PATTERN.search(expression_text)
+    if alias_match:
+        return alias_match.group(1), expression_text[: alias_match.start()].strip()
+    destination_match = _COLUMN_PATTERN.search(expression_text)
+    if destination_match is None:
+        return None
+    return destination_match.group(1), expression_text
+
+
+def _tree_boxes(plan: str) -> list[_Box]:
+    """Read every box of a box-layout explain tree with its row and connectors."""
+    boxes: list[_Box] = []
+    open_boxes: dict[int, _Box] = {}
+    # Wide trees render to megabytes of padding; slice one line at a time.
+    line_start = 0
+    while line_start < len(plan):
+        line_end = plan.find("\n", line_start)
+        if line_end == -1:
+            line_end = len(plan)
+        line = plan[line_start:line_end]
+        line_start = line_end + 1
+        label = _ROW_LABEL_PATTERN.match(line)
+        for start in list(open_boxes):
+            box = open_boxes[start]
+            if line[start : start + 1] == "╰":
+                box.bottom_connector = line.find("┬", start, box.end)
+                del open_boxes[start]
+                continue
+            box.lines.append(line[start + 1 : box.end])
+            if label is not None:
+                box.row = int(label.group(1))
+        start = line.find("╭")
+        while start != -1:
+            end = line.find("╮", start)
+            if end == -1:
+                raise ValueError("malformed explain tree: unterminated box")
+            box = _Box(start, end, line.find("┴", start, end))
+            boxes.append(box)
+            open_boxes[start] = box
+            start = line.find("╭", end)
+    if open_boxes:
+        raise ValueError("malformed explain tree: unterminated box")
+    return boxes
+
+
+def _link_boxes(boxes: list[_Box]) -> _Box:
+    """Attach each box to the box one row up whose first ``┬`` is nearest to its left.
+
+    Every subtree occupies a contiguous range of columns that starts at its root,
+    so a child always hangs between its parent's connector and the next one.
+    """
+    parents_by_row: dict[int, list[_Box]] = {}
+    for box in sorted(boxes, key=lambda item: item.bottom_connector):
+        if box.bottom_connector != -1:
+            parents_by_row.setdefault(box.row, []).append(box)
+    connectors_by_row = {
+        row: [parent.bottom_connector for parent in parents]
+        for row, parents in parents_by_row.items()
     }
+    roots: list[_Box] = []
+    for box in sorted(boxes, key=lambda item: (item.row, item.top_connector)):
+        position = bisect_right(connectors_by_row.get(box.row - 1, []), box.top_connector)
+        if box.top_connector == -1 or position == 0:
+            roots.append(box)
+            continue
+        parents_by_row[box.row - 1][position - 1].children.append(box)
+    if len(roots) != 1:
+        raise ValueError("malformed explain tree: expected exactly one root node")
+    return roots[0]
+
+
+def _column_names(sections: list[tuple[str, str]], label: str) -> tuple[str, ...]:
+    return tuple(
+        name
+        for section_label, body in sections
+        if section_label == label
+        for name in _COLUMN_PATTERN.findall(body)
+    )
+
 
-    return (
-        destination_dataset,
-        normalized_map,
-        left_join_keys,
-        right_join_keys,
-        left_dataset,
-        right_dataset,
+def _plan_node(box: _Box, inputs: list[tuple[str, PlanNode]]) -> PlanNode:
+    header = box.text
+    prefix = _NODE_PREFIX_PATTERN.match(header)
+    if prefix is not None:
+        header = header[prefix.end() :]
+    sections = [section for child in box.children if (section := child.section()) is not None]
+
+    frame = _DF_PATTERN.match(header)
+    if frame is not None:
+        columns = tuple(item.strip().strip('"') for item in frame.group(1).split(","))
+        return PlanNode("scan", columns=columns)
+    if not inputs and _FILE_SCAN_MARKER in header:
+        # File scans do not list their columns; they come from the registered schemas.
+        return PlanNode("scan", columns=(ELIDED_COLUMNS,))
+    ordered = tuple(node for _, node in inputs)
+    if _JOIN_PATTERN.search(header):
+        if len(inputs) != 2:
+            raise ValueError("malformed explain tree: join without two inputs")
+        sides = dict(inputs)
+        return PlanNode(
+            "join",
+            inputs=(sides.get("LEFT PLAN", ordered[0]), sides.get("RIGHT PLAN", ordered[1])),
+            left_on=_column_names(sections, "left on"),
+            right_on=_column_names(sections, "right on"),
+            coalesce=not header.startswith("FULL"),
+        )
+
+    kind: PlanNodeKind = "other"
+    if header.startswith("UNION"):
+        return PlanNode("union", inputs=ordered)
+    if header.startswith("SELECT"):
+        kind = "select"
+    elif header.startswith("WITH_COLUMNS"):
+        kind = "with_columns"
+    elif header.startswith("AGGREGATE"):
+        kind = "aggregate"
+    if kind == "other":
+        return PlanNode(kind, inputs=ordered)
+
+    blocks: list[tuple[str, str]] = []
+    for label, body in sections:
+        if label != "expression" or not body:
+            continue
+        block = _expression_block(body)
+        if block is None:
+            # Selectors such as ``*`` cannot be named; keep the input columns visible.
+            kind = "with_columns" if kind == "select" else kind
+            continue
+        blocks.append(block)
+    return PlanNode(
+        kind, inputs=ordered, blocks=tuple(blocks), columns=_column_names(sections, "aggregate by")
     )
 
 
-def extract_plan_lineage(plan: str, mapping: MappingConfig) -> list[ColumnLineage]:
-    column_texts = _column_texts_from_tree(plan)
-    (
-        destination_dataset,
-        namespace_map,
-        left_join_keys,
-        right_join_keys,
-        left_dataset,
-        right_dataset,
-    ) = _parse_datasets(column_texts, mapping)
+def build_plan_tree(plan: str) -> PlanNode:
+    """Turn a box-layout ``explain(format="tree")`` rendering into a ``PlanNode`` tree."""
+    boxes = _tree_boxes(plan)
+    if not boxes:
+        raise ValueError("joins, unions and file scans require a box-layout explain tree")
+    root = _link_boxes(boxes)
+    built: dict[int, PlanNode] = {}
+    interned: dict[tuple[object, ...], PlanNode] = {}
+    pending: list[tuple[_Box, bool]] = [(root, False)]
+    while pending:
+        box, expanded = pending.pop()
+        node_children = [child for child in box.children if child.section() is None]
+        if not expanded:
+            pending.append((box, True))
+            pending.extend((child, False) for child in node_children)
+            continue
+        inputs = []
+        for child in node_children:
+            prefix = _NODE_PREFIX_PATTERN.match(child.text)
+            side = prefix.group(0).rstrip(": ") if prefix is not None else ""
+            inputs.append((side, built.pop(id(child))))
+        built[id(box)] = intern_plan_node(_plan_node(box, inputs), interned)
+    return built[id(root)]
+
+
+def extract_compact_plan_lineage(
+    plan: str,
+    mapping: MappingConfig,
+    source_schemas: SourceSchemas | None = None,
+    columns: Collection[str] | None = None,
+) -> CompactLineage:
+    """Direct lineage edges of a tree-format plan; ``columns`` limits them to a slice."""
+    # ``str.count`` keeps the routing check cheap on megabyte-sized wide trees. Joins
+    # need scoped names; only compact (box-less) renderings of one join stay flat.
+    join_count = plan.count(" JOIN")
+    if (
+        join_count > 1
+        or " UNION " in plan
+        or _FILE_SCAN_MARKER in plan
+        or (join_count and "╭" in plan)
+    ):
+        root = timed("plan_graph", build_plan_tree, plan)
+        return timed("resolve_plan", build_scoped_lineage, root, mapping, source_schemas, columns)
+    tokens = timed("column_texts", lambda: _tokenize_column_texts(_column_texts_from_tree(plan)))
+    namespace = timed("parse_datasets", _parse_datasets, tokens, mapping, source_schemas)
 
     parsed_blocks: list[tuple[str, str]] = []
-    for column_text in column_texts.values():
-        for expression_match in _EXPR_BLOCK_PATTERN.finditer(column_text):
-            expression_text = expression_match.group("body").strip()
-            if not expression_text:
+    aggregate_blocks: list[tuple[str, str]] = []
+    current_column_index: int | None = None
+    for token in tokens:
+        if token.column_index != current_column_index:
+            parsed_blocks.extend(aggregate_blocks)
+            aggregate_blocks = []
+            current_column_index = token.column_index
+
+        if token.kind == "expression":
+            if not token.body:
                 continue
-            alias_match = _ALIAS_PATTERN.search(expression_text)
-            if alias_match:
-                destination_column = alias_match.group(1)
-                expression = expression_text[: alias_match.start()].strip()
-            else:
-                destination_match = _COLUMN_PATTERN.search(expression_text)
-                if destination_match is None:
-                    continue
-                destination_column = destination_match.group(1)
-                expression = expression_text
-            parsed_blocks.append((destination_column, expression))
-
-        for aggregate_match in _AGG_BY_PATTERN.finditer(column_text):
-            aggregate_text = aggregate_match.group("body")
-            for aggregate_column in _COLUMN_PATTERN.findall(aggregate_text):
-                parsed_blocks.append((aggregate_column, f'col("{aggregate_column}")'))
-
-    parsed_blocks = list(dict.fromkeys(parsed_blocks))
-
-    derived_columns = {destination_column for destination_column, _ in parsed_blocks}
-
-    lineage: list[ColumnLineage] = []
-    for destination_column, expression in parsed_blocks:
-        parsed = parse_expression(expression)
-
-        source_columns: list[ColumnRef] = []
-        for source_column_name in parsed.columns:
-            source_candidates = namespace_map.get(source_column_name)
-            source_dataset: DatasetRef
-            if source_candidates is None:
-                if source_column_name in derived_columns:
-                    source_dataset = destination_dataset
-                else:
-                    raise ValueError(f"unresolved source column: {source_column_name}")
-            elif len(source_candidates) == 1:
-                source_dataset = source_candidates[0]
-            elif (
-                source_column_name in left_join_keys
-                and source_column_name in right_join_keys
-                and left_dataset in source_candidates
-            ):
-                source_dataset = left_dataset
-            elif source_column_name in left_join_keys and left_dataset in source_candidates:
-                source_dataset = left_dataset
-            elif source_column_name in right_join_keys and right_dataset in source_candidates:
-                source_dataset = right_dataset
-            elif source_column_name in left_join_keys | right_join_keys:
-                source_dataset = source_candidates[0]
-            else:
-                candidate_tables = ", ".join(item.fqn for item in source_candidates)
-                raise ValueError(
-                    f"ambiguous source column: {source_column_name} candidates={candidate_tables}"
-                )
-            source_columns.append(ColumnRef(dataset=source_dataset, column=source_column_name))
-
-        lineage.append(
-            ColumnLineage(
-                from_columns=tuple(source_columns),
-                to_column=ColumnRef(dataset=destination_dataset, column=destination_column),
-                function=parsed.function,
-                confidence=parsed.confidence,
-            )
-        )
+            block = _expression_block(token.body)
+            if block is not None:
+                parsed_blocks.append(block)
+        elif token.kind == "aggregate_by":
+            for aggregate_column in _COLUMN_PATTERN.findall(token.body):
+                aggregate_blocks.append((aggregate_column, f'col("{aggregate_column}")'))
+    parsed_blocks.extend(aggregate_blocks)
+
+    return build_compact_lineage(parsed_blocks, namespace, columns)
 
-    return sorted(lineage, key=lambda item: item.to_column.column)
+
+def extract_plan_lineage(plan: str, mapping: MappingConfig) -> list[ColumnLineage]:
+    return extract_compact_plan_lineage(plan, mapping).to_lineage()
@@ -1,76 +1,375 @@
 from __future__ import annotations
 
 import re
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Literal
+from typing import Literal, NamedTuple, TypeAlias
+
+from polars_lineage._stats import CacheStats
+
+Confidence: TypeAlias = Literal["exact", "inferred", "unknown"]
 
 _COLUMN_PATTERN = re.compile(r'col\("([^"]+)"\)')
-_CALL_PATTERN = re.compile(r"([A-Za-z_][A-Za-z0-9_]*)\(")
+_PASS_THROUGH_PATTERN = re.compile(r'col\("([^"]+)"\)(?:\s*\.alias\("[^"]+"\))?')
+_PLAN_TEXT_PATTERN = re.compile(r"[A-Z][A-Z_]+\b|predicate\s*:")
+# One string per token; whitespace never matches and is skipped by ``findall``.
+# Column references, call openers (``name(`` / ``.name(``) and dynamic literals
+# are single tokens so the parser can classify them by their first character.
+_TOKEN_PATTERN = re.compile(
+    r'col\("[^"]+"\)'
+    r'|"(?:[^"\\]|\\.)*"'
+    r"|'(?:[^'\\]|\\.)*'"
+    r"|dyn\s+\w+:\s*-?[^\s,()\[\]{}]+"
+    r"|\.?[^\W\d]\w*\(?"
+    r"|\d[\w.:+-]*"
+    r"|==|!=|>=|<=|//|\*\*"
+    r"|\S"
+)
+
+_KNOWN_CALLS = frozenset(
+    {
+        "col",
+        "coalesce",
+        "when",
+        "then",
+        "otherwise",
+        "len",
+        "fill_null",
+        "sum",
+        "mean",
+        "avg",
+        "min",
+        "max",
+        "count",
+        "alias",
+    }
+)
+_BINARY_OPERATORS = frozenset(
+    {"==", "!=", ">=", "<=", ">", "<", "+", "-", "*", "/", "//", "%", "**", "&", "|", "^"}
+)
+_UNARY_OPERATORS = frozenset({"-", "~", "!"})
+_LITERAL_NAMES = frozenset({"null", "true", "false", "NaN", "inf"})
+_NAMED_ARGUMENT_SEPARATORS = frozenset({"=", ":"})
+_CLOSING = {"(": ")", "[": "]", "{": "}"}
+DEFAULT_EXPRESSION_CACHE_SIZE = 4096
 
 
 @dataclass(frozen=True)
 class ParsedExpression:
     columns: tuple[str, ...]
     function: str
-    confidence: Literal["exact", "inferred", "unknown"]
+    confidence: Confidence
+
+
+class ColumnNode(NamedTuple):
+    name: str
+
+
+class LiteralNode(NamedTuple):
+    text: str
+
+
+class NameNode(NamedTuple):
+    """A bare identifier such as a dtype (``Int64``) or an option value."""
+
+    name: str
+
+
+class CallNode(NamedTuple):
+    """``receiver.name(args)``; ``receiver`` is ``None`` for free functions like ``len()``."""
+
+    name: str
+    receiver: ExprNode | None
+    args: tuple[ExprNode, ...]
+
+
+class BinaryNode(NamedTuple):
+    operator: str
+    left: ExprNode
+    right: ExprNode
+
+
+class UnaryNode(NamedTuple):
+    operator: str
+    operand: ExprNode
+
+
+class GroupNode(NamedTuple):
+    """Bracketed or parenthesized items, e.g. ``[(col("a")) + (col("b"))]`` or a list arg."""
+
+    items: tuple[ExprNode, ...]
+
+
+ExprNode: TypeAlias = (
+    ColumnNode | LiteralNode | NameNode | CallNode | BinaryNode | UnaryNode | GroupNode
+)
+
+
+class _Parser:
+    """Recursive descent over the expression display format used by Polars plans.
+
+    Columns and confidence are collected while nodes are built: columns, literals,
+    operators and the known calls are exact, any other call marks the tree inferred.
+    """
+
+    __slots__ = ("_index", "_tokens", "columns", "inferred")
+
+    def __init__(self, text: str) -> None:
+        self._tokens: list[str] = _TOKEN_PATTERN.findall(text)
+        self._index = 0
+        self.columns: set[str] = set()
+        self.inferred = False
+
+    def _peek(self) -> str | None:
+        index = self._index
+        return self._tokens[index] if index < len(self._tokens) else None
+
+    def _next(self) -> str:
+        index = self._index
+        if index >= len(self._tokens):
+            raise ValueError("unexpected end of expression")
+        self._index = index + 1
+        return self._tokens[index]
+
+    def _accept(self, value: str) -> bool:
+        index = self._index
+        if index < len(self._tokens) and self._tokens[index] == value:
+            self._index = index + 1
+            return True
+        return False
+
+    def parse(self) -> ExprNode:
+        node = self._expression()
+        if self._index < len(self._tokens):
+            raise ValueError(f"unexpected token {self._tokens[self._index]!r} in expression")
+        return node
+
+    def parse_prefix(self) -> tuple[ExprNode, str]:
+        """Parse one expression and return it with any unparsed trailing tokens."""
+        node = self._expression()
+        return node, " ".join(self._tokens[self._index :])
+
+    def _expression(self) -> ExprNode:
+        node = self._operand()
+        while True:
+            token = self._peek()
+            if token is None or token not in _BINARY_OPERATORS:
+                return node
+            self._index += 1
+            node = BinaryNode(token, node, self._operand())
+
+    def _operand(self) -> ExprNode:
+        token = self._peek()
+        if token is not None and token in _UNARY_OPERATORS:
+            self._index += 1
+            return UnaryNode(token, self._operand())
+        return self._postfix(self._primary())
+
+    def _items(self, closing: str) -> tuple[ExprNode, ...]:
+        items: list[ExprNode] = []
+        tokens = self._tokens
+        while not self._accept(closing):
+            if items:
+                if not self._accept(","):
+                    raise ValueError(f"expected ',' or {closing!r} in expression")
+                if self._accept(closing):
+                    break
+            index = self._index
+            if (
+                index + 1 < len(tokens)
+                and tokens[index + 1] in _NAMED_ARGUMENT_SEPARATORS
+                and tokens[index][0].isalpha()
+            ):
+                self._index = index + 2
+            items.append(self._expression())
+        return tuple(items)
+
+    def _call(self, name: str, receiver: ExprNode | None) -> CallNode:
+        if name.rpartition(".")[2] not in _KNOWN_CALLS:
+            self.inferred = True
+        return CallNode(name, receiver, self._items(")"))
+
+    def _primary(self) -> ExprNode:
+        token = self._next()
+        first = token[0]
+        if first == "c" and token.startswith('col("') and token.endswith('")'):
+            name = token[5:-2]
+            self.columns.add(name)
+            return ColumnNode(name)
+        if first == '"' or first == "'" or first.isdigit():
+            return LiteralNode(token)
+        if first == "d" and token.startswith("dyn") and token[3:4].isspace():
+            return LiteralNode(token)
+        if first == "." and len(token) > 1:
+            return self._method(token, None)
+        if token == "(" or token == "[":
+            return GroupNode(self._items(_CLOSING[token]))
+        if first.isalpha() or first == "_":
+            if token[-1] == "(":
+                return self._call(token[:-1], None)
+            if self._accept("{"):
+                self._items("}")
+                return LiteralNode(token)
+            if token in _LITERAL_NAMES:
+                return LiteralNode(token)
+            return NameNode(token)
+        raise ValueError(f"unexpected token {token!r} in expression")
+
+    def _method(self, token: str, receiver: ExprNode | None) -> CallNode:
+        segments = [token[1:]]
+        while segments[-1][-1] != "(":
+            token = self._next()
+            if token[0] != "." or len(token) == 1:
+                raise ValueError(f"expected method name, found {token!r}")
+            segments.append(token[1:])
+        return self._call(".".join(segments)[:-1], receiver)
+
+    def _postfix(self, node: ExprNode) -> ExprNode:
+        while True:
+            token = self._peek()
+            if token is None:
+                return node
+            if token[0] == "." and len(token) > 1:
+                self._index += 1
+                node = self._method(token, node)
+            elif token == "(" and isinstance(node, CallNode):
+                self._index += 1
+                node = CallNode("", node, self._items(")"))
+            else:
+                return node
+
+
+def parse_expression_tree(expression: str) -> ExprNode:
+    """Parse Polars expression display text into a small AST; raises ``ValueError``."""
+    try:
+        return _Parser(expression).parse()
+    except RecursionError as exc:
+        raise ValueError("expression nesting is too deep to parse") from exc
+
+
+class ExpressionCache:
+    """Thread-safe LRU of ``ParsedExpression`` keyed by whitespace-normalized text.
+
+    Every caller asking for the same expression gets the same interned instance.
+    A ``maxsize`` of ``0`` disables caching while still counting misses.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_EXPRESSION_CACHE_SIZE) -> None:
+        if maxsize < 0:
+            raise ValueError("cache maxsize must be >= 0")
+        self._maxsize = maxsize
+        self._entries: OrderedDict[str, ParsedExpression] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, normalized: str) -> ParsedExpression:
+        with self._lock:
+            entry = self._entries.get(normalized)
+            if entry is not None:
+                self._entries.move_to_end(normalized)
+                self._hits += 1
+                return entry
+            self._misses += 1
+        parsed = _parse_normalized(normalized)
+        with self._lock:
+            if self._maxsize == 0:
+                return parsed
+            # Another thread may have parsed the same text meanwhile; keep the first.
+            entry = self._entries.setdefault(normalized, parsed)
+            self._entries.move_to_end(normalized)
+            self._evict_locked()
+            return entry
+
+    def resize(self, maxsize: int) -> None:
+        if maxsize < 0:
+            raise ValueError("cache maxsize must be >= 0")
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict_locked()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._entries),
+                maxsize=self._maxsize,
+            )
+
+    def _evict_locked(self) -> None:
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+
+_EXPRESSION_CACHE = ExpressionCache()
+
+
+def configure_expression_cache(maxsize: int) -> None:
+    _EXPRESSION_CACHE.resize(maxsize)
+
+
+def expression_cache_stats() -> CacheStats:
+    return _EXPRESSION_CACHE.stats()
+
+
+def clear_expression_cache() -> None:
+    _EXPRESSION_CACHE.clear()
 
 
 def parse_expression(expression: str) -> ParsedExpression:
-    normalized = " ".join(expression.split())
-    columns = tuple(sorted(set(_COLUMN_PATTERN.findall(normalized))))
-
-    if normalized.startswith("dyn ") or normalized in {"len()", "null"}:
-        return ParsedExpression(columns=(), function=normalized, confidence="exact")
-
-    known_tokens = (
-        "col(",
-        ".alias(",
-        ".sum()",
-        ".mean()",
-        ".avg()",
-        ".min()",
-        ".max()",
-        ".count()",
-        ".fill_null(",
-        "coalesce",
-        "when",
-        "then",
-        "otherwise",
-        "+",
-        "-",
-        "*",
-        "/",
-        "==",
-        "!=",
-        ">=",
-        "<=",
-        ">",
-        "<",
-    )
+    """Derive source columns, function text and confidence for one plan expression.
+
+    Confidence comes from the node types in the parsed tree: columns, literals,
+    operators and the known calls are exact, any other call is inferred. Text that
+    does not parse, or a tree without columns that is not fully understood, falls
+    back to ``inferred``/``unknown``. Results are memoized per normalized text.
+    """
+    return _EXPRESSION_CACHE.get(" ".join(expression.split()))
+
+
+def pass_through_column(expression: str) -> str | None:
+    """The column a bare, optionally aliased ``col(name)`` expression reads, else ``None``."""
+    matched = _PASS_THROUGH_PATTERN.fullmatch(expression.strip())
+    return None if matched is None else matched.group(1)
 
-    if any(token in normalized for token in known_tokens):
-        known_calls = {
-            "col",
-            "coalesce",
-            "when",
-            "then",
-            "otherwise",
-            "len",
-            "fill_null",
-            "sum",
-            "mean",
-            "avg",
-            "min",
-            "max",
-            "count",
-            "alias",
-        }
-        calls = {match.group(1) for match in _CALL_PATTERN.finditer(normalized)}
-        if calls and not calls.issubset(known_calls):
-            return ParsedExpression(columns=columns, function=normalized, confidence="inferred")
-        return ParsedExpression(columns=columns, function=normalized, confidence="exact")
-
-    if columns:
-        return ParsedExpression(columns=columns, function=normalized, confidence="inferred")
-
-    return ParsedExpression(columns=(), function=normalized, confidence="unknown")
+
+def _parse_normalized(normalized: str) -> ParsedExpression:
+    parser = _Parser(normalized)
+    try:
+        root, trailing = parser.parse_prefix()
+    except (ValueError, RecursionError):
+        columns = tuple(sorted(set(_COLUMN_PATTERN.findall(normalized))))
+        return ParsedExpression(
+            columns=columns,
+            function=normalized,
+            confidence="inferred" if columns else "unknown",
+        )
+
+    column_names = parser.columns
+    inferred = parser.inferred
+    if trailing:
+        # Explain-tree blocks can carry plan text after the expression (``DF [...]``,
+        # ``WITH_COLUMNS``, ``predicate: ...``); anything else means we only half-parsed it.
+        column_names.update(_COLUMN_PATTERN.findall(trailing))
+        inferred = inferred or not _PLAN_TEXT_PATTERN.match(trailing)
+
+    confidence: Confidence = "exact"
+    if isinstance(root, NameNode) or (inferred and not column_names):
+        confidence = "unknown"
+    elif inferred:
+        confidence = "inferred"
+    return ParsedExpression(
+        columns=tuple(sorted(column_names)), function=normalized, confidence=confidence
+    )
@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Collection
+from dataclasses import dataclass, replace
+from functools import cache
+from typing import Literal, NamedTuple, TypeAlias
+
+from polars_lineage.compact import CompactLineage
+from polars_lineage.config import MappingConfig
+from polars_lineage.extractor.assembly import ELIDED_COLUMNS, SourceSchemas, complete_columns
+from polars_lineage.extractor.expr_parser import (
+    Confidence,
+    ParsedExpression,
+    parse_expression,
+    pass_through_column,
+)
+from polars_lineage.instrumentation import count
+from polars_lineage.ir import DatasetRef
+
+PlanNodeKind: TypeAlias = Literal[
+    "scan", "join", "union", "select", "with_columns", "rename", "aggregate", "other"
+]
+JOIN_SUFFIX = "_right"
+
+
+@dataclass(frozen=True)
+class PlanNode:
+    """One logical plan node; ``inputs`` of a join are ``(left, right)``.
+
+    ``blocks`` are ``(output_column, expression_text)`` pairs for ``select``,
+    ``with_columns``, ``rename`` and ``aggregate`` nodes; ``columns`` are the
+    scanned columns of a ``scan``, the grouping keys of an ``aggregate`` and the
+    replaced names of a ``rename``. ``union`` and ``other`` nodes pass the columns
+    of all their inputs through.
+    Joins with ``coalesce`` keep one column per shared key name; other duplicate
+    right-hand names get ``suffix``.
+    """
+
+    kind: PlanNodeKind
+    inputs: tuple[PlanNode, ...] = ()
+    blocks: tuple[tuple[str, str], ...] = ()
+    columns: tuple[str, ...] = ()
+    left_on: tuple[str, ...] = ()
+    right_on: tuple[str, ...] = ()
+    suffix: str = JOIN_SUFFIX
+    coalesce: bool = True
+
+
+def intern_plan_node(node: PlanNode, interned: dict[tuple[object, ...], PlanNode]) -> PlanNode:
+    """The shared instance of ``node``, whose inputs must already be interned.
+
+    Identical subtrees become one object, so keys compare inputs by identity and
+    stay shallow however deep the plan is. A union keeps each distinct input once.
+    """
+    if node.kind == "union":
+        node = replace(node, inputs=tuple({id(item): item for item in node.inputs}.values()))
+    key = (
+        node.kind,
+        tuple(id(item) for item in node.inputs),
+        node.blocks,
+        node.columns,
+        node.left_on,
+        node.right_on,
+        node.suffix,
+        node.coalesce,
+    )
+    return interned.setdefault(key, node)
+
+
+class _Origin(NamedTuple):
+    """What one column name in a scope stands for.
+
+    ``sources`` are ``(dataset, column)`` leaves. ``function`` is the expression
+    that last produced the column, ``None`` while it is an untouched scan column.
+    """
+
+    sources: tuple[tuple[DatasetRef, str], ...]
+    function: str | None = None
+    confidence: Confidence = "exact"
+
+
+_Scope: TypeAlias = dict[str, _Origin]
+# Column names a node must expose to its parent; ``None`` means all of them.
+_Needed: TypeAlias = frozenset[str] | None
+_Parse: TypeAlias = Callable[[str], ParsedExpression]
+
+
+def _unlisted_column(scope: _Scope, name: str) -> _Origin:
+    """Attribute a name missing from ``scope`` to the one scan whose columns were elided."""
+    elided = scope.get(ELIDED_COLUMNS)
+    if elided is None:
+        raise ValueError(f"unresolved source column: {name}")
+    datasets = list(dict.fromkeys(dataset for dataset, _ in elided.sources))
+    if len(datasets) > 1:
+        candidate_tables = ", ".join(sorted(dataset.fqn for dataset in datasets))
+        raise ValueError(f"ambiguous source column: {name} candidates={candidate_tables}")
+    return _Origin(((datasets[0], name),))
+
+
+def _resolve(scope: _Scope, expression: str, parse: _Parse) -> _Origin:
+    parsed = parse(expression)
+    passed = pass_through_column(parsed.function)
+    if passed is not None:
+        # A bare ``col(name)`` keeps the expression that produced ``name`` upstream.
+        upstream = scope.get(passed)
+        if upstream is not None and upstream.function is not None:
+            return upstream
+    sources: dict[tuple[DatasetRef, str], None] = {}
+    for name in parsed.columns:
+        origin = scope.get(name)
+        if origin is None:
+            origin = _unlisted_column(scope, name)
+        sources.update(dict.fromkeys(origin.sources))
+    return _Origin(tuple(sources), parsed.function, parsed.confidence)
+
+
+def _project(
+    scope: _Scope,
+    blocks: tuple[tuple[str, str], ...],
+    target: _Scope,
+    needed: _Needed,
+    parse: _Parse,
+) -> None:
+    for output, expression in blocks:
+        if needed is None or output in needed:
+            target[output] = _resolve(scope, expression, parse)
+
+
+def _input_needed(node: PlanNode, needed: _Needed, parse: _Parse) -> _Needed:
+    """Columns the inputs of ``node`` must expose so it can produce ``needed``."""
+    if needed is None or node.kind in {"union", "other"}:
+        return needed
+    if node.kind == "join":
+        unsuffixed = {name.removesuffix(node.suffix) for name in needed}
+        return needed | unsuffixed | set(node.left_on) | set(node.right_on)
+    produced = {output for output, _ in node.blocks}
+    read = {
+        column
+        for output, expression in node.blocks
+        if output in needed
+        for column in parse(expression).columns
+    }
+    if node.kind == "with_columns":
+        return frozenset(read | (needed - produced))
+    if node.kind == "rename":
+        return frozenset(read | (needed - produced) - set(node.columns))
+    if node.kind == "aggregate":
+        return frozenset(read | set(node.columns))
+    return frozenset(read)
+
+
+def _union(current: _Origin | None, origin: _Origin) -> _Origin:
+    if current is None:
+        return origin
+    sources = tuple(dict.fromkeys((*current.sources, *origin.sources)))
+    if current.function is None or origin.function is None:
+        # A column some input passes through untouched stays a plain column.
+        return _Origin(sources)
+    return current._replace(sources=sources)
+
+
+def _grouped_scan(
+    columns: tuple[str, ...], datasets: list[DatasetRef], source_schemas: SourceSchemas | None
+) -> _Scope:
+    """Scope of a scan below a union: each column comes from every source that has it."""
+    contributors: dict[str, list[tuple[DatasetRef, str]]] = {}
+    for dataset in datasets:
+        registered = source_schemas.get(dataset.fqn) if source_schemas else None
+        available = None if registered is None else set(registered)
+        for column in complete_columns(columns, dataset, source_schemas):
+            if available is None or column in available or column == ELIDED_COLUMNS:
+                contributors.setdefault(column, []).append((dataset, column))
+    return {column: _Origin(tuple(sources)) for column, sources in contributors.items()}
+
+
+def _join(left: _Scope, right: _Scope, node: PlanNode) -> _Scope:
+    coalesced = set(node.left_on) & set(node.right_on) if node.coalesce else set()
+    for name, origin in right.items():
+        if name == ELIDED_COLUMNS:
+            left[name] = _union(left.get(name), origin)
+        elif name not in left:
+            left[name] = origin
+        elif name not in coalesced:
+            left[f"{name}{node.suffix}"] = origin
+    return left
+
+
+def build_scoped_lineage(
+    root: PlanNode,
+    mapping: MappingConfig,
+    source_schemas: SourceSchemas | None = None,
+    columns: Collection[str] | None = None,
+) -> CompactLineage:
+    """Resolve every output column of ``root`` to source columns in one post-order walk.
+
+    Each node sees only the columns its inputs expose, so equal names in different
+    join inputs never collide. Scan nodes below joins map to the ``mapping.sources``
+    alias spelling their join path from the root (``left``, ``right.left``, ...);
+    scans below a union read from all sources at once, and other scans take the
+    sources in plan order. Scopes are updated in place and
+    released as soon as the parent consumes them, so memory stays linear in plan size.
+    Scans whose column list the plan abbreviated take the rest of their columns
+    from ``source_schemas``. With ``columns``, each node is told which of its
+    output columns the requested ones depend on, and only the expressions that
+    produce them are parsed and resolved.
+    """
+    source_by_alias = {alias: DatasetRef.from_fqn(fqn) for alias, fqn in mapping.sources.items()}
+    sources = list(source_by_alias.values())
+    destination = DatasetRef.from_fqn(mapping.destination_table)
+    unpathed_index = 0
+
+    requested: _Needed = None if columns is None else frozenset(columns)
+    # Slices read a block twice, to plan the walk and to resolve it; parse it once.
+    parse: _Parse = parse_expression if requested is None else cache(parse_expression)
+
+    scopes: list[_Scope] = []
+    pending: list[tuple[PlanNode, tuple[str, ...], bool, _Needed, bool]] = [
+        (root, (), False, requested, False)
+    ]
+    while pending:
+        node, path, grouped, needed, expanded = pending.pop()
+        if not expanded:
+            pending.append((node, path, grouped, needed, True))
+            input_needed = _input_needed(node, needed, parse)
+            if node.kind == "join":
+                left, right = node.inputs
+                pending.append((right, (*path, "right"), False, input_needed, False))
+                pending.append((left, (*path, "left"), False, input_needed, False))
+            else:
+                grouped = grouped or node.kind == "union"
+                pending.extend(
+                    (child, path, grouped, input_needed, False) for child in reversed(node.inputs)
+                )
+            continue
+
+        inputs = [scopes.pop() for _ in node.inputs][::-1]
+        if node.kind == "scan":
+            if path:
+                alias = ".".join(path)
+                if alias not in source_by_alias:
+                    raise ValueError(
+                        f"join input {alias} has no source alias in mapping.sources; "
+                        "join plans require left/right join-path aliases"
+                    )
+                dataset = source_by_alias[alias]
+            elif len(sources) == 1:
+                dataset = sources[0]
+            elif grouped:
+                scopes.append(_grouped_scan(node.columns, sources, source_schemas))
+                continue
+            else:
+                dataset = sources[min(unpathed_index, len(sources) - 1)]
+                unpathed_index += 1
+            scanned = complete_columns(node.columns, dataset, source_schemas)
+            scopes.append({column: _Origin(((dataset, column),)) for column in scanned})
+            continue
+        if node.kind == "join":
+            scopes.append(_join(inputs[0], inputs[1], node))
+            continue
+
+        scope = inputs[0] if inputs else {}
+        for other in inputs[1:]:
+            for name, origin in other.items():
+                scope[name] = _union(scope.get(name), origin)
+        if node.kind == "select":
+            projected: _Scope = {}
+            _project(scope, node.blocks, projected, needed, parse)
+            scope = projected
+        elif node.kind == "with_columns":
+            updates: _Scope = {}
+            _project(scope, node.blocks, updates, needed, parse)
+            scope.update(updates)
+        elif node.kind == "rename":
+            updates = {}
+            _project(scope, node.blocks, updates, needed, parse)
+            for name in node.columns:
+                scope.pop(name, None)
+            scope.update(updates)
+        elif node.kind == "aggregate":
+            aggregated: _Scope = {}
+            for key in node.columns:
+                aggregated[key] = _resolve(scope, f'col("{key}")', parse)
+            _project(scope, node.blocks, aggregated, needed, parse)
+            scope = aggregated
+        scopes.append(scope)
+
+    (output,) = scopes
+    lineage = CompactLineage()
+    interner = lineage.columns
+    destination_id = interner.dataset_id(destination)
+    expressions = 0
+    for name in sorted(output):
+        origin = output[name]
+        if origin.function is None or (requested is not None and name not in requested):
+            continue
+        expressions += 1
+        lineage.add_edge(
+            interner.column_id(destination_id, name),
+            tuple(
+                interner.column_id(interner.dataset_id(dataset), column)
+                for dataset, column in origin.sources
+            ),
+            origin.function,
+            origin.confidence,
+        )
+    count("expressions", expressions)
+    return lineage
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+import warnings
+from collections.abc import Iterable
+from typing import Any, Literal, NamedTuple, TypeAlias
+
+import polars as pl
+
+ScanFormat: TypeAlias = Literal["parquet", "csv", "ipc", "ndjson"]
+
+_SCAN_FORMATS: dict[str, ScanFormat] = {
+    "Parquet": "parquet",
+    "Csv": "csv",
+    "Ipc": "ipc",
+    "NDJson": "ndjson",
+}
+_GLOB_CHARACTERS = frozenset("*?[{")
+_TRIE_END = ""
+
+
+class ScanSource(NamedTuple):
+    """One dataset read by a file scan, named after the root its paths collapse to.
+
+    ``alias`` is the join path of the scan (``left``, ``right.left``, ...) or its
+    ``name`` outside joins.
+    """
+
+    alias: str
+    name: str
+    uri: str
+    format: ScanFormat
+    columns: tuple[str, ...]
+
+
+def scan_format(payload: dict[str, Any]) -> ScanFormat | None:
+    """File format of a serialized ``Scan`` payload; ``None`` for non-file scans."""
+    scan_type = payload.get("scan_type")
+    if not isinstance(scan_type, dict) or len(scan_type) != 1:
+        return None
+    return _SCAN_FORMATS.get(next(iter(scan_type)))
+
+
+def scan_paths(payload: dict[str, Any]) -> list[str]:
+    sources = payload.get("sources")
+    paths = sources.get("Paths") if isinstance(sources, dict) else None
+    if not isinstance(paths, list):
+        return []
+    return [item["inner"] if isinstance(item, dict) else item for item in paths]
+
+
+def _dataset_segments(path: str) -> list[str]:
+    """Path segments up to the first hive ``key=value`` or glob segment."""
+    segments = path.split("/")
+    for index, segment in enumerate(segments):
+        if "=" in segment or not _GLOB_CHARACTERS.isdisjoint(segment):
+            return segments[:index]
+    return segments
+
+
+def partition_root(paths: Iterable[str]) -> str:
+    """Deepest path every file of one dataset shares.
+
+    Paths are cut before their first hive or glob segment and folded into a
+    prefix trie of segments, so thousands of partition files cost one pass over
+    their segments. A single file is its own root.
+    """
+    trie: dict[str, Any] = {}
+    for path in paths:
+        node = trie
+        for segment in _dataset_segments(path):
+            node = node.setdefault(segment or "/", {})
+        node[_TRIE_END] = None
+
+    segments: list[str] = []
+    node = trie
+    while len(node) == 1 and _TRIE_END not in node:
+        segment, node = next(iter(node.items()))
+        segments.append("" if segment == "/" else segment)
+    return "/".join(segments)
+
+
+def _dataset_uri(root: str) -> str:
+    if "://" in root:
+        return root.rstrip("/")
+    return f"file://{os.path.abspath(root or os.curdir)}"
+
+
+def _dataset_name(root: str, is_file: bool) -> str:
+    name = root.rstrip("/").rsplit("/", 1)[-1]
+    return (os.path.splitext(name)[0] if is_file else name) or name
+
+
+def _scan_columns(payload: dict[str, Any]) -> tuple[str, ...]:
+    """Schema of one scan, read by deserializing the scan node on its own."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=UserWarning)
+        warnings.simplefilter("ignore", category=DeprecationWarning)
+        scan = pl.LazyFrame.deserialize(io.StringIO(json.dumps({"Scan": payload})), format="json")
+    return tuple(scan.collect_schema().names())
+
+
+def scan_source(payload: dict[str, Any], alias: str | None = None) -> ScanSource | None:
+    """Describe the dataset behind a serialized ``Scan`` payload, or ``None`` if not a file."""
+    file_format = scan_format(payload)
+    paths = scan_paths(payload)
+    if file_format is None or not paths:
+        return None
+    root = partition_root(paths)
+    name = _dataset_name(root, is_file=paths == [root])
+    return ScanSource(
+        alias=alias or name,
+        name=name,
+        uri=_dataset_uri(root),
+        format=file_format,
+        columns=_scan_columns(payload),
+    )
@@ -0,0 +1,706 @@
+from __future__ import annotations
+
+import io
+import json
+import re
+from collections.abc import Callable, Collection
+from dataclasses import dataclass, field
+from functools import cache
+from typing import Any
+
+import polars as pl
+
+from polars_lineage.compact import CompactLineage
+from polars_lineage.config import MappingConfig
+from polars_lineage.extractor.assembly import (
+    ELIDED_COLUMNS,
+    JoinSide,
+    SourceColumns,
+    SourceSchemas,
+    build_compact_lineage,
+    build_plan_namespace,
+)
+from polars_lineage.extractor.plan_graph import (
+    JOIN_SUFFIX,
+    PlanNode,
+    PlanNodeKind,
+    build_scoped_lineage,
+    intern_plan_node,
+)
+from polars_lineage.extractor.scan_sources import ScanSource, scan_source
+from polars_lineage.instrumentation import timed
+from polars_lineage.ir import ColumnLineage
+
+_COLUMN_PATTERN = re.compile(r'col\("([^"]+)"\)')
+_EMBEDDED_FRAME_PATTERN = re.compile(r'"df"\s*:\s*\[[0-9,\s]*\]')
+_JSON_TOKEN_PATTERN = re.compile(
+    r'\s*(?:(?P<punct>[{}\[\],:])|(?P<string>"(?:[^"\\]|\\.)*")'
+    r"|(?P<number>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)|(?P<literal>true|false|null))"
+)
+# Plain ``explain`` prints each in-memory frame as a ``DF [columns]`` line.
+_IN_MEMORY_SCAN_PATTERN = re.compile(r"^\s*DF \[", re.MULTILINE)
+_IR_VERSION_PATTERN = re.compile(r',"version":\d+\}')
+_SNAKE_CASE_PATTERN = re.compile(r"(?<!^)(?=[A-Z])")
+
+_BINARY_OPERATORS = {
+    "Plus": "+",
+    "Minus": "-",
+    "Multiply": "*",
+    "TrueDivide": "/",
+    "FloorDivide": "//",
+    "Modulus": "%",
+    "Eq": "==",
+    "EqValidity": "==",
+    "NotEq": "!=",
+    "NotEqValidity": "!=",
+    "Gt": ">",
+    "GtEq": ">=",
+    "Lt": "<",
+    "LtEq": "<=",
+    "And": "&",
+    "Or": "|",
+    "Xor": "^",
+    "LogicalAnd": "&",
+    "LogicalOr": "|",
+}
+_FUNCTION_NAMESPACES = {
+    "StringExpr": "str",
+    "TemporalExpr": "dt",
+    "ListExpr": "list",
+    "ArrayExpr": "arr",
+    "StructExpr": "struct",
+    "BinaryExpr": "bin",
+    "Categorical": "cat",
+}
+_PLAN_INPUT_KEYS = ("dsl", "input", "input_left", "input_right", "inputs")
+_DROPPED_FRAME_PATTERN = re.compile(r'"df": null')
+# Expressions that stand for several output columns or rename their input.
+_SELECTOR_VARIANTS = frozenset({"Selector", "Nth"})
+_MULTI_OUTPUT_VARIANTS = _SELECTOR_VARIANTS | {"RenameAlias"}
+# Functions that take every column a selector input matches as one more input.
+_HORIZONTAL_FUNCTIONS = frozenset(
+    {
+        "SumHorizontal",
+        "MaxHorizontal",
+        "MinHorizontal",
+        "MeanHorizontal",
+        "AsStruct",
+        "Coalesce",
+        "Boolean.AllHorizontal",
+        "Boolean.AnyHorizontal",
+        "StringExpr.ConcatHorizontal",
+        "ListExpr.Concat",
+        "ArrayExpr.Concat",
+    }
+)
+
+
+class UnsupportedPlanError(ValueError):
+    """A plan the serialized extractor cannot read; ``explain`` may still render it."""
+
+
+@dataclass
+class _SerializedPlan:
+    blocks: list[tuple[str, str]] = field(default_factory=list)
+    source_columns: list[SourceColumns] = field(default_factory=list)
+    left_join_keys: set[str] = field(default_factory=set)
+    right_join_keys: set[str] = field(default_factory=set)
+    join_count: int = 0
+    union_count: int = 0
+
+
+def has_in_memory_scan(lazyframe: pl.LazyFrame) -> bool:
+    """Whether the plan reads an in-memory frame, found from the cheap plain ``explain``."""
+    return _IN_MEMORY_SCAN_PATTERN.search(lazyframe.explain(optimized=False)) is not None
+
+
+def serialize_lazyframe_plan(lazyframe: pl.LazyFrame) -> str:
+    """The JSON plan of ``lazyframe``.
+
+    This relies on ``LazyFrame.serialize(format="json")``, which Polars has
+    deprecated and warns about; the serialized backend goes away with it. The JSON
+    embeds the data of in-memory frames (``DataFrame.lazy()``), so callers check
+    ``has_in_memory_scan`` first rather than serialize a frame's data.
+    """
+    try:
+        return lazyframe.serialize(format="json")
+    except pl.exceptions.PolarsError as exc:
+        # Python UDFs only serialize with ``cloudpickle`` installed.
+        raise UnsupportedPlanError(f"cannot serialize plan: {exc}") from exc
+
+
+def normalize_serialized_plan(plan: str) -> str:
+    """Drop the per-frame ``IR`` version counters that ``collect_schema`` leaves behind."""
+    return _IR_VERSION_PATTERN.sub("}", plan)
+
+
+def _loads_iterative(text: str) -> Any:
+    containers: list[Any] = []
+    pending_keys: list[str | None] = []
+    root: Any = None
+    index = 0
+
+    def emit(value: Any) -> None:
+        nonlocal root
+        if not containers:
+            root = value
+            return
+        container = containers[-1]
+        if isinstance(container, list):
+            container.append(value)
+            return
+        key = pending_keys[-1]
+        if key is None:
+            raise ValueError("malformed serialized plan: missing object key")
+        container[key] = value
+        pending_keys[-1] = None
+
+    while True:
+        match = _JSON_TOKEN_PATTERN.match(text, index)
+        if match is None:
+            if text[index:].strip():
+                raise ValueError(f"malformed serialized plan at offset {index}")
+            break
+        index = match.end()
+        punct = match.group("punct")
+        if punct == "{":
+            containers.append({})
+            pending_keys.append(None)
+        elif punct == "[":
+            containers.append([])
+            pending_keys.append(None)
+        elif punct in {"}", "]"}:
+            closed = containers.pop()
+            pending_keys.pop()
+            emit(closed)
+        elif punct is not None:
+            continue
+        elif match.group("string") is not None:
+            value = json.loads(match.group("string"))
+            if containers and isinstance(containers[-1], dict) and pending_keys[-1] is None:
+                pending_keys[-1] = value
+            else:
+                emit(value)
+        elif match.group("number") is not None:
+            number = match.group("number")
+            emit(float(number) if any(char in number for char in ".eE") else int(number))
+        else:
+            emit({"true": True, "false": False, "null": None}[match.group("literal")])
+    return root
+
+
+def _load_plan(plan: str) -> Any:
+    compact = _EMBEDDED_FRAME_PATTERN.sub('"df":null', plan)
+    try:
+        return json.loads(compact)
+    except RecursionError:
+        return _loads_iterative(compact)
+
+
+def _variant(node: Any) -> tuple[str, Any]:
+    if isinstance(node, str):
+        return node, None
+    if isinstance(node, dict) and len(node) == 1:
+        return next(iter(node.items()))
+    raise ValueError(f"unsupported serialized plan node: {type(node).__name__}")
+
+
+def _snake_case(name: str) -> str:
+    return _SNAKE_CASE_PATTERN.sub("_", name).lower()
+
+
+def _contains_variant(node: Any, variants: Collection[str]) -> bool:
+    pending = [node]
+    while pending:
+        current = pending.pop()
+        if isinstance(current, dict):
+            if any(key in variants for key in current):
+                return True
+            pending.extend(current.values())
+        elif isinstance(current, list):
+            pending.extend(current)
+    return False
+
+
+def _column_names_in(node: Any) -> list[str]:
+    names: list[str] = []
+    pending = [node]
+    while pending:
+        current = pending.pop()
+        if isinstance(current, dict):
+            column = current.get("Column")
+            if isinstance(column, str) and len(current) == 1:
+                names.append(column)
+                continue
+            pending.extend(reversed(list(current.values())))
+        elif isinstance(current, list):
+            pending.extend(reversed(current))
+    return names
+
+
+def _render_literal(payload: Any, *, top_level: bool = False) -> str:
+    kind, value = _variant(payload)
+    if kind == "Dyn":
+        dyn_kind, dyn_value = _variant(value)
+        return f"dyn {dyn_kind.lower()}: {dyn_value}" if top_level else str(dyn_value)
+    if kind == "Scalar":
+        scalar_kind, scalar_value = _variant(value)
+        if isinstance(scalar_value, (str, int, float, bool)):
+            return f"{scalar_kind}({scalar_value})"
+        return f"{scalar_kind}(...)"
+    return "null" if kind == "Null" else f"lit({kind})"
+
+
+def _function_name(function: Any) -> str:
+    name, payload = _variant(function)
+    namespace = _FUNCTION_NAMESPACES.get(name)
+    if namespace is not None and payload is not None:
+        inner_name, _ = _variant(payload)
+        return f"{namespace}.{_snake_case(inner_name)}"
+    return _snake_case(name)
+
+
+@cache
+def _empty_frame_json() -> str:
+    return json.dumps(json.loads(serialize_lazyframe_plan(pl.LazyFrame()))["DataFrameScan"]["df"])
+
+
+def _input_schema(plan: Any) -> pl.Schema:
+    """Schema of a decoded plan input, deserialized with empty frames for dropped data."""
+    try:
+        text = _DROPPED_FRAME_PATTERN.sub(f'"df": {_empty_frame_json()}', json.dumps(plan))
+        return pl.LazyFrame.deserialize(io.StringIO(text), format="json").collect_schema()
+    except (pl.exceptions.PolarsError, RecursionError) as exc:
+        raise UnsupportedPlanError(f"cannot read the input schema of a selector: {exc}") from exc
+
+
+def _selected_names(node: Any, schema: pl.Schema) -> list[str]:
+    variant, payload = _variant(node)
+    if variant == "Nth":
+        return [schema.names()[payload]]
+    try:
+        expression = pl.Expr.deserialize(io.StringIO(json.dumps(node)), format="json")
+        return pl.LazyFrame(schema=schema).select(expression).collect_schema().names()
+    except pl.exceptions.PolarsError as exc:
+        raise UnsupportedPlanError(f"unsupported selector in serialized plan: {exc}") from exc
+
+
+def _renamed(function: Any, name: str) -> str:
+    kind, value = _variant(function)
+    if kind == "Prefix":
+        return f"{value}{name}"
+    if kind == "Suffix":
+        return f"{name}{value}"
+    if kind == "ToLowercase":
+        return name.lower()
+    if kind == "ToUppercase":
+        return name.upper()
+    raise UnsupportedPlanError(f"unsupported expression in serialized plan: RenameAlias {kind}")
+
+
+def _output_name(node: Any) -> str:
+    variant, payload = _variant(node)
+    if variant == "Alias":
+        return str(payload[1])
+    names = _column_names_in(node)
+    if not names:
+        raise UnsupportedPlanError("unsupported expression in serialized plan: unnamed rename")
+    return names[0]
+
+
+def _expands_inputs(function: Any) -> bool:
+    name, payload = _variant(function)
+    if name in _HORIZONTAL_FUNCTIONS:
+        return True
+    if isinstance(payload, str) or (isinstance(payload, dict) and len(payload) == 1):
+        return f"{name}.{_variant(payload)[0]}" in _HORIZONTAL_FUNCTIONS
+    return False
+
+
+def _substitute(node: Any, replace: Callable[[str, Any], Any | None]) -> Any:
+    """Copy of ``node`` with each variant ``replace`` returns a node for swapped out."""
+    if isinstance(node, list):
+        return [_substitute(item, replace) for item in node]
+    if not isinstance(node, dict):
+        return node
+    if len(node) == 1:
+        variant, payload = next(iter(node.items()))
+        replaced = replace(variant, payload)
+        if replaced is not None:
+            return replaced
+    return {key: _substitute(value, replace) for key, value in node.items()}
+
+
+def _expand_expression(node: Any, schema: pl.Schema) -> list[Any]:
+    """The single-output expressions a selector, ``nth`` or ``name.*`` expression stands for.
+
+    Selectors expand against ``schema``; several selectors in one expression are
+    zipped, as polars does, and selectors feeding horizontal functions become
+    extra inputs instead. ``name.*`` renames become plain aliases.
+    """
+    selected: dict[str, list[str]] = {}
+
+    def names(variant: str, payload: Any) -> list[str]:
+        key = json.dumps({variant: payload})
+        if key not in selected:
+            selected[key] = _selected_names({variant: payload}, schema)
+        return selected[key]
+
+    def expanded(index: int) -> Callable[[str, Any], Any | None]:
+        def replace(variant: str, payload: Any) -> Any | None:
+            if variant in _SELECTOR_VARIANTS:
+                return {"Column": names(variant, payload)[index]}
+            if variant == "RenameAlias":
+                inner = _substitute(payload["expr"], replace)
+                inner_variant, inner_payload = _variant(inner)
+                if inner_variant == "Alias":
+                    inner = inner_payload[0]
+                return {"Alias": [inner, _renamed(payload["function"], _output_name(inner))]}
+            if variant == "Function" and _expands_inputs(payload["function"]):
+                inputs: list[Any] = []
+                for item in payload["input"]:
+                    item_variant, item_payload = _variant(item)
+                    if item_variant in _SELECTOR_VARIANTS:
+                        inputs.extend(
+                            {"Column": name} for name in names(item_variant, item_payload)
+                        )
+                    else:
+                        inputs.append(_substitute(item, replace))
+                return {"Function": {**payload, "input": inputs}}
+            return None
+
+        return replace
+
+    def widths(variant: str, payload: Any) -> Any | None:
+        if variant in _SELECTOR_VARIANTS:
+            counts.add(len(names(variant, payload)))
+            return {variant: payload}
+        if variant == "Function" and _expands_inputs(payload["function"]):
+            _substitute(
+                [item for item in payload["input"] if _variant(item)[0] not in _SELECTOR_VARIANTS],
+                widths,
+            )
+            return {variant: payload}
+        return None
+
+    counts: set[int] = set()
+    _substitute(node, widths)
+    if len(counts) > 1:
+        raise UnsupportedPlanError("unsupported expression in serialized plan: uneven selectors")
+    width = counts.pop() if counts else 1
+    return [_hoist_alias(_substitute(node, expanded(index))) for index in range(width)]
+
+
+def _hoist_alias(node: Any) -> Any:
+    """Move an alias a rename left inside ``node`` to its top, where polars applies it."""
+    if _variant(node)[0] == "Alias":
+        return node
+    names: list[str] = []
+
+    def unalias(variant: str, payload: Any) -> Any | None:
+        if variant != "Alias":
+            return None
+        names.append(payload[1])
+        return _substitute(payload[0], unalias)
+
+    stripped = _substitute(node, unalias)
+    return {"Alias": [stripped, names[0]]} if names else node
+
+
+def _expanded(expressions: list[Any], plan: Any, exclude: Collection[str] = ()) -> list[Any]:
+    """``expressions`` with selectors, ``nth`` and ``name.*`` expanded against ``plan``'s schema.
+
+    ``exclude`` drops columns selectors never match, such as group-by keys.
+    """
+    if not _contains_variant(expressions, _MULTI_OUTPUT_VARIANTS):
+        return expressions
+    schema = _input_schema(plan)
+    for name in exclude:
+        schema.pop(name, None)
+    return [item for expression in expressions for item in _expand_expression(expression, schema)]
+
+
+def _render_expression(node: Any) -> str:
+    variant, payload = _variant(node)
+    if variant == "Column":
+        return f'col("{payload}")'
+    if variant == "Alias":
+        inner, name = payload
+        return f'{_render_expression(inner)}.alias("{name}")'
+    if variant == "KeepName":
+        return _render_expression(payload)
+    if variant == "Literal":
+        return _render_literal(payload)
+    if variant == "Len":
+        return "len()"
+    if variant == "BinaryExpr":
+        operator = _BINARY_OPERATORS.get(payload["op"], _snake_case(payload["op"]))
+        left = _render_expression(payload["left"])
+        right = _render_expression(payload["right"])
+        return f"[({left}) {operator} ({right})]"
+    if variant == "Agg":
+        aggregation, aggregation_payload = _variant(payload)
+        if isinstance(aggregation_payload, dict) and "input" in aggregation_payload:
+            aggregation_payload = aggregation_payload["input"]
+        return f"{_render_expression(aggregation_payload)}.{_snake_case(aggregation)}()"
+    if variant == "Function":
+        inputs = [_render_expression(item) for item in payload["input"]]
+        name = _function_name(payload["function"])
+        if not inputs:
+            return f"{name}()"
+        if len(inputs) == 1:
+            return f"{inputs[0]}.{name}()"
+        return f"{inputs[0]}.{name}([{', '.join(inputs[1:])}])"
+    if variant == "Cast":
+        dtype_kind, dtype = _variant(payload["dtype"])
+        dtype_text = dtype if isinstance(dtype, str) else dtype_kind
+        cast_name = "strict_cast" if payload.get("options") == "Strict" else "cast"
+        return f"{_render_expression(payload['expr'])}.{cast_name}({dtype_text})"
+    if variant == "Ternary":
+        predicate = _render_expression(payload["predicate"])
+        truthy = _render_expression(payload["truthy"])
+        falsy = _render_expression(payload["falsy"])
+        return f"when({predicate}).then({truthy}).otherwise({falsy})"
+    if variant == "Over":
+        partitions = ", ".join(_render_expression(item) for item in payload["partition_by"])
+        return f"{_render_expression(payload['function'])}.over([{partitions}])"
+    if variant in _MULTI_OUTPUT_VARIANTS or _contains_variant(payload, _SELECTOR_VARIANTS):
+        raise UnsupportedPlanError(f"unsupported expression in serialized plan: {variant}")
+
+    columns = ", ".join(f'col("{name}")' for name in _column_names_in(payload))
+    return f"{_snake_case(variant)}({columns})"
+
+
+def _expression_block(node: Any) -> tuple[str, str] | None:
+    variant, payload = _variant(node)
+    if variant == "Selector":
+        return None
+    if variant == "Alias":
+        inner, name = payload
+        inner_variant, inner_payload = _variant(inner)
+        if inner_variant == "Literal":
+            return name, _render_literal(inner_payload, top_level=True)
+        return name, _render_expression(inner)
+    expression = _render_expression(node)
+    destination_match = _COLUMN_PATTERN.search(expression)
+    if destination_match is None:
+        return None
+    return destination_match.group(1), expression
+
+
+def _collect_expression_blocks(expressions: list[Any], plan: _SerializedPlan) -> None:
+    for expression in expressions:
+        block = _expression_block(expression)
+        if block is not None:
+            plan.blocks.append(block)
+
+
+def _collect_plan(root: Any) -> _SerializedPlan:
+    plan = _SerializedPlan()
+    pending: list[tuple[Any, JoinSide | None]] = [(root, None)]
+    while pending:
+        node, side = pending.pop()
+        variant, payload = _variant(node)
+        if not isinstance(payload, dict):
+            continue
+
+        if variant == "Select":
+            _collect_expression_blocks(_expanded(payload["expr"], payload["input"]), plan)
+        elif variant == "HStack":
+            _collect_expression_blocks(_expanded(payload["exprs"], payload["input"]), plan)
+        elif variant == "GroupBy":
+            keys = _key_columns(_expanded(payload["keys"], payload["input"]))
+            aggs = _expanded(payload["aggs"], payload["input"], exclude=keys)
+            _collect_expression_blocks(aggs, plan)
+            plan.blocks.extend((key_column, f'col("{key_column}")') for key_column in keys)
+        elif variant == "Sort":
+            _collect_expression_blocks(payload["by_column"], plan)
+        elif variant == "Union":
+            plan.union_count += 1
+        elif variant == "MapFunction":
+            function_name, function_payload = _variant(payload["function"])
+            if function_name == "Rename":
+                for existing, new in zip(function_payload["existing"], function_payload["new"]):
+                    plan.blocks.append((new, f'col("{existing}")'))
+        elif variant == "Join":
+            plan.join_count += 1
+            for key in payload["left_on"]:
+                plan.left_join_keys.update(_COLUMN_PATTERN.findall(_render_expression(key)))
+            for key in payload["right_on"]:
+                plan.right_join_keys.update(_COLUMN_PATTERN.findall(_render_expression(key)))
+            pending.append((payload["input_right"], "right"))
+            pending.append((payload["input_left"], "left"))
+            continue
+        elif variant == "DataFrameScan":
+            fields = payload["schema"]["fields"]
+            plan.source_columns.append(SourceColumns(columns=tuple(fields), side=side))
+            continue
+        elif variant == "Scan":
+            # File scans do not list their columns; they come from the registered schemas.
+            plan.source_columns.append(SourceColumns(columns=(ELIDED_COLUMNS,), side=side))
+            continue
+
+        for key in _PLAN_INPUT_KEYS:
+            child = payload.get(key)
+            if isinstance(child, list):
+                pending.extend((item, side) for item in reversed(child))
+            elif isinstance(child, dict):
+                pending.append((child, side))
+
+    return plan
+
+
+def _plan_inputs(payload: dict[str, Any]) -> list[Any]:
+    if "input_left" in payload:
+        return [payload["input_left"], payload["input_right"]]
+    inputs: list[Any] = []
+    for key in _PLAN_INPUT_KEYS:
+        child = payload.get(key)
+        if isinstance(child, list):
+            inputs.extend(child)
+        elif isinstance(child, dict):
+            inputs.append(child)
+    return inputs
+
+
+def _key_columns(keys: list[Any]) -> tuple[str, ...]:
+    return tuple(name for key in keys for name in _COLUMN_PATTERN.findall(_render_expression(key)))
+
+
+def _projection_node(
+    kind: PlanNodeKind, expressions: list[Any], inputs: tuple[PlanNode, ...]
+) -> PlanNode:
+    blocks = [_expression_block(expression) for expression in expressions]
+    if kind == "select" and None in blocks:
+        # Selectors (``drop``, ``pl.all()``) cannot be named; keep the input columns visible.
+        kind = "with_columns"
+    return PlanNode(
+        kind, inputs=inputs, blocks=tuple(block for block in blocks if block is not None)
+    )
+
+
+def _plan_node(variant: str, payload: Any, inputs: tuple[PlanNode, ...]) -> PlanNode:
+    if variant == "DataFrameScan":
+        return PlanNode("scan", columns=tuple(payload["schema"]["fields"]))
+    if variant == "Scan":
+        return PlanNode("scan", columns=(ELIDED_COLUMNS,))
+    if variant == "Join":
+        args = payload.get("options", {}).get("args", {})
+        coalesce = args.get("coalesce", "JoinSpecific")
+        return PlanNode(
+            "join",
+            inputs=inputs,
+            left_on=_key_columns(payload["left_on"]),
+            right_on=_key_columns(payload["right_on"]),
+            suffix=args.get("suffix") or JOIN_SUFFIX,
+            coalesce=coalesce == "CoalesceColumns"
+            or (coalesce == "JoinSpecific" and args.get("how") != "Full"),
+        )
+    if variant == "Union":
+        return PlanNode("union", inputs=inputs)
+    if variant == "Select":
+        return _projection_node("select", _expanded(payload["expr"], payload["input"]), inputs)
+    if variant == "HStack":
+        return _projection_node(
+            "with_columns", _expanded(payload["exprs"], payload["input"]), inputs
+        )
+    if variant == "GroupBy":
+        keys = _key_columns(_expanded(payload["keys"], payload["input"]))
+        aggs = _expanded(payload["aggs"], payload["input"], exclude=keys)
+        node = _projection_node("aggregate", aggs, inputs)
+        return PlanNode("aggregate", inputs, node.blocks, keys)
+    if variant == "MapFunction":
+        function_name, function_payload = _variant(payload["function"])
+        if function_name == "Rename":
+            existing_names = function_payload["existing"]
+            renames = zip(existing_names, function_payload["new"])
+            return PlanNode(
+                "rename",
+                inputs=inputs,
+                blocks=tuple((new, f'col("{existing}")') for existing, new in renames),
+                columns=tuple(existing_names),
+            )
+    return PlanNode("other", inputs=inputs)
+
+
+def build_plan_tree(root: Any) -> PlanNode:
+    """Turn a decoded serialized plan into a ``PlanNode`` tree without recursion."""
+    built: list[PlanNode] = []
+    interned: dict[tuple[object, ...], PlanNode] = {}
+    pending: list[tuple[Any, bool]] = [(root, False)]
+    while pending:
+        node, expanded = pending.pop()
+        variant, payload = _variant(node)
+        inputs = _plan_inputs(payload) if isinstance(payload, dict) else []
+        if not expanded:
+            pending.append((node, True))
+            pending.extend((child, False) for child in reversed(inputs))
+            continue
+        children = tuple(built[len(built) - len(inputs) :]) if inputs else ()
+        del built[len(built) - len(inputs) :]
+        built.append(intern_plan_node(_plan_node(variant, payload, children), interned))
+    (plan,) = built
+    return plan
+
+
+def detect_scan_sources(plan: str) -> list[ScanSource]:
+    """File datasets scanned by a serialized plan, in plan order.
+
+    Scans below joins are aliased by their join path, as ``build_scoped_lineage``
+    expects; a scan repeated under the same alias is reported once.
+    """
+    found: dict[tuple[str, str], ScanSource] = {}
+    pending: list[tuple[Any, tuple[str, ...]]] = [(_load_plan(plan), ())]
+    while pending:
+        node, path = pending.pop()
+        variant, payload = _variant(node)
+        if not isinstance(payload, dict):
+            continue
+        if variant == "Scan":
+            source = scan_source(payload, ".".join(path) or None)
+            if source is not None:
+                found.setdefault((source.alias, source.uri), source)
+            continue
+        if variant == "Join":
+            pending.append((payload["input_right"], (*path, "right")))
+            pending.append((payload["input_left"], (*path, "left")))
+            continue
+        pending.extend((child, path) for child in reversed(_plan_inputs(payload)))
+    return list(found.values())
+
+
+def _load_and_collect_plan(plan: str) -> tuple[Any, _SerializedPlan]:
+    root = _load_plan(plan)
+    return root, _collect_plan(root)
+
+
+def extract_compact_serialized_plan_lineage(
+    plan: str,
+    mapping: MappingConfig,
+    source_schemas: SourceSchemas | None = None,
+    columns: Collection[str] | None = None,
+) -> CompactLineage:
+    """Extract direct lineage from ``LazyFrame.serialize(format="json")`` output.
+
+    The structured plan is walked node by node, so no explain text is rendered or
+    re-parsed. Embedded ``DataFrameScan`` payloads are dropped before decoding.
+    With ``columns``, only the expressions those columns depend on are parsed.
+    """
+    root, collected = timed("parse_datasets", _load_and_collect_plan, plan)
+    file_scan = any(ELIDED_COLUMNS in source.columns for source in collected.source_columns)
+    if collected.join_count or collected.union_count or file_scan:
+        tree = timed("plan_graph", build_plan_tree, root)
+        return timed("resolve_plan", build_scoped_lineage, tree, mapping, source_schemas, columns)
+    namespace = build_plan_namespace(
+        mapping,
+        join_count=collected.join_count,
+        source_columns=collected.source_columns,
+        left_join_keys=collected.left_join_keys,
+        right_join_keys=collected.right_join_keys,
+        source_schemas=source_schemas,
+    )
+    return build_compact_lineage(collected.blocks, namespace, columns)
+
+
+def extract_serialized_plan_lineage(plan: str, mapping: MappingConfig) -> list[ColumnLineage]:
+    return extract_compact_serialized_plan_lineage(plan, mapping).to_lineage()
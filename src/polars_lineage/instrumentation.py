@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Literal, ParamSpec, Protocol, TypeAlias, TypeVar
+
+StageName: TypeAlias = Literal[
+    "explain",
+    "serialize",
+    "column_texts",
+    "parse_datasets",
+    "plan_graph",
+    "resolve_plan",
+    "parse_expression",
+    "replay_operations",
+    "resolve",
+    "validate",
+    "export",
+]
+CounterName: TypeAlias = Literal[
+    "plan_bytes",
+    "plan_lines",
+    "expressions",
+    "edges",
+    "cache_hits",
+    "cache_misses",
+]
+
+_P = ParamSpec("_P")
+_R = TypeVar("_R")
+
+_COUNTER_HELP: dict[str, str] = {
+    "plan_bytes": "UTF-8 size of rendered plans.",
+    "plan_lines": "Lines in rendered plans.",
+    "expressions": "Expressions parsed into lineage edges.",
+    "edges": "Resolved lineage edges returned.",
+    "cache_hits": "Lineage cache lookups served from memory or disk.",
+    "cache_misses": "Lineage cache lookups that required extraction.",
+}
+
+
+class InstrumentationHook(Protocol):
+    """Receives stage timings and counters from the extraction pipeline."""
+
+    def observe_stage(self, stage: StageName, seconds: float) -> None: ...
+
+    def increment(self, counter: CounterName, value: int = 1) -> None: ...
+
+
+_HOOK: InstrumentationHook | None = None
+
+
+def set_instrumentation_hook(hook: InstrumentationHook | None) -> None:
+    """Install a process-wide hook; ``None`` disables instrumentation."""
+    global _HOOK
+    _HOOK = hook
+
+
+def get_instrumentation_hook() -> InstrumentationHook | None:
+    return _HOOK
+
+
+@contextmanager
+def instrumentation(hook: InstrumentationHook) -> Iterator[InstrumentationHook]:
+    """Install ``hook`` for the duration of a ``with`` block."""
+    previous = _HOOK
+    set_instrumentation_hook(hook)
+    try:
+        yield hook
+    finally:
+        set_instrumentation_hook(previous)
+
+
+def timed(stage: StageName, func: Callable[_P, _R], *args: _P.args, **kwargs: _P.kwargs) -> _R:
+    """Call ``func`` and report its wall time; a plain call when no hook is installed."""
+    hook = _HOOK
+    if hook is None:
+        return func(*args, **kwargs)
+    started = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        hook.observe_stage(stage, time.perf_counter() - started)
+
+
+def count(counter: CounterName, value: int = 1) -> None:
+    hook = _HOOK
+    if hook is not None:
+        hook.increment(counter, value)
+
+
+def record_plan_size(plan: str) -> None:
+    hook = _HOOK
+    if hook is not None:
+        hook.increment("plan_bytes", len(plan.encode("utf-8")))
+        hook.increment("plan_lines", plan.count("\n") + 1 if plan else 0)
+
+
+@dataclass(frozen=True)
+class StageStats:
+    count: int
+    total_seconds: float
+    max_seconds: float
+
+
+class InMemoryCollector:
+    """Thread-safe ``InstrumentationHook`` aggregating timings and counters in memory."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stages: dict[str, StageStats] = {}
+        self._counters: dict[str, int] = {}
+
+    def observe_stage(self, stage: StageName, seconds: float) -> None:
+        with self._lock:
+            current = self._stages.get(stage)
+            if current is None:
+                self._stages[stage] = StageStats(1, seconds, seconds)
+            else:
+                self._stages[stage] = StageStats(
+                    current.count + 1,
+                    current.total_seconds + seconds,
+                    max(current.max_seconds, seconds),
+                )
+
+    def increment(self, counter: CounterName, value: int = 1) -> None:
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + value
+
+    def stages(self) -> dict[str, StageStats]:
+        with self._lock:
+            return dict(sorted(self._stages.items()))
+
+    def counters(self) -> dict[str, int]:
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+    def to_prometheus(self, prefix: str = "polars_lineage") -> str:
+        """Render the collected values in the Prometheus text exposition format."""
+        stages = self.stages()
+        counters = self.counters()
+        lines: list[str] = []
+        if stages:
+            name = f"{prefix}_stage_seconds"
+            lines.append(f"# HELP {name} Wall time spent in each extraction stage.")
+            lines.append(f"# TYPE {name} summary")
+            for stage, stats in stages.items():
+                lines.append(f'{name}_sum{{stage="{stage}"}} {stats.total_seconds!r}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {stats.count}')
+            lines.append(f"# HELP {name}_max Slowest single run of each extraction stage.")
+            lines.append(f"# TYPE {name}_max gauge")
+            for stage, stats in stages.items():
+                lines.append(f'{name}_max{{stage="{stage}"}} {stats.max_seconds!r}')
+        for counter, value in counters.items():
+            name = f"{prefix}_{counter}_total"
+            lines.append(f"# HELP {name} {_COUNTER_HELP.get(counter, counter)}")
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n" if lines else ""
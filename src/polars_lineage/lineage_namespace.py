@@ -1,21 +1,69 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
-from typing import Any, cast
+import threading
+import weakref
+from collections.abc import Callable, Collection, Iterable, Iterator
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Literal, TypeAlias, cast
 from urllib.parse import urlparse
 
 import polars as pl
 
-from polars_lineage.config import MappingConfig
+from polars_lineage.config import MappingConfig, ReadOnlySources
 from polars_lineage.exporter.models import LineageDocument
-from polars_lineage.metadata_store import get_mapping, require_mapping, set_mapping
+from polars_lineage.extractor.serialized_plan import (
+    UnsupportedPlanError,
+    detect_scan_sources,
+    has_in_memory_scan,
+    serialize_lazyframe_plan,
+)
+from polars_lineage.instrumentation import timed
+from polars_lineage.metadata_store import (
+    get_mapping,
+    get_operations,
+    get_schema_names,
+    has_mappings,
+    require_mapping,
+    set_mapping,
+    set_source_schema,
+)
 from polars_lineage.pipeline import (
     extract_lineage_output_from_lazyframe,
     extract_lineage_payloads_from_lazyframe,
 )
+from polars_lineage.recorder import (
+    SOURCE_OPERATION,
+    RecordedOperation,
+    record_aggregation,
+    record_group_by,
+    record_operation,
+)
 
-_PATCHED = False
-_GROUP_BY_PATCHED = False
+ExtractionMode: TypeAlias = Literal["plan", "recorded"]
+_MappingKey: TypeAlias = tuple[tuple[tuple[str, str], ...], str]
+
+_PATCHED_METHODS = (
+    "select",
+    "with_columns",
+    "filter",
+    "sort",
+    "rename",
+    "drop",
+    "join",
+    "group_by",
+)
+# Wrappers are installed while a ``recording()`` block is active, or per the global
+# switch: ``None`` (default) installs them once the first source is registered.
+_RECORDING_LOCK = threading.Lock()
+_RECORDING_SWITCH: bool | None = None
+_RECORDING_SCOPES = 0
+_SOURCE_REGISTERED = False
+_ORIGINAL_METHODS: list[tuple[object, str, Any]] = []
+_INTERNED_MAPPINGS: weakref.WeakValueDictionary[_MappingKey, MappingConfig] = (
+    weakref.WeakValueDictionary()
+)
+_INTERN_LOCK = threading.Lock()
 
 
 def _sanitize_token(value: str) -> str:
@@ -31,6 +79,11 @@ def _default_destination_fqn(sources: dict[str, str]) -> str:
     return f"derived.lineage.public.{suffix or 'result'}"
 
 
+# Joined mappings name every input by its join path (``left``, ``right.left``, ...)
+# and share one default destination however deep the joins nest.
+_JOIN_DESTINATION = _default_destination_fqn({"left": "", "right": ""})
+
+
 def _source_fqn_from_metadata(name: str, uri: str) -> str:
     parsed = urlparse(uri)
     path = parsed.path.strip("/")
@@ -49,6 +102,53 @@ def _first_source_fqn(mapping: MappingConfig) -> str:
     return next(iter(mapping.sources.values()))
 
 
+def _is_join_path(alias: str) -> bool:
+    return all(side in {"left", "right"} for side in alias.split("."))
+
+
+def _join_operand_sources(mapping: MappingConfig, side: str) -> dict[str, str]:
+    if len(mapping.sources) == 1:
+        return {side: _first_source_fqn(mapping)}
+    if not all(_is_join_path(alias) for alias in mapping.sources):
+        raise ValueError(
+            "join operands must come from a single source or an earlier join; "
+            f"got source aliases {sorted(mapping.sources)}"
+        )
+    return {f"{side}.{alias}": fqn for alias, fqn in mapping.sources.items()}
+
+
+def _mapping_from_scans(lazyframe: pl.LazyFrame) -> MappingConfig | None:
+    """Mapping for a frame without ``add_source`` metadata, derived from its file scans.
+
+    Every scanned dataset is registered as if ``add_source`` had been called with
+    its collapsed root path; the mapping is kept on the frame for later calls.
+    Scans are read from the serialized plan whichever backend extracts lineage;
+    plans that read in-memory frames or do not serialize (UDFs without
+    ``cloudpickle``) detect none.
+    """
+    if has_in_memory_scan(lazyframe):
+        return None
+    try:
+        plan = timed("serialize", serialize_lazyframe_plan, lazyframe)
+    except UnsupportedPlanError:
+        return None
+    scans = detect_scan_sources(plan)
+    if not scans:
+        return None
+    sources: dict[str, str] = {}
+    for scan in scans:
+        fqn = _source_fqn_from_metadata(scan.name, scan.uri)
+        sources[scan.alias] = fqn
+        set_source_schema(fqn, scan.columns)
+    if all(_is_join_path(alias) for alias in sources):
+        destination_table = _JOIN_DESTINATION
+    else:
+        destination_table = _default_destination_fqn(sources)
+    mapping = _intern_mapping(sources, destination_table)
+    set_mapping(lazyframe, mapping)
+    return mapping
+
+
 def _extract_mappings(values: Iterable[Any]) -> list[MappingConfig]:
     found: list[MappingConfig] = []
     for value in values:
@@ -63,6 +163,25 @@ def _extract_mappings(values: Iterable[Any]) -> list[MappingConfig]:
     return found
 
 
+def _intern_mapping(sources: dict[str, str], destination_table: str) -> MappingConfig:
+    """Shared ``MappingConfig`` for already-validated sources and destination.
+
+    Patched methods only combine mappings that were validated when they were
+    created, so new instances are built with ``model_construct`` and equal ones
+    are reused while any frame still refers to them. ``sources`` is copied into a
+    ``ReadOnlySources`` so no caller can edit the shared instance.
+    """
+    key = (tuple(sources.items()), destination_table)
+    with _INTERN_LOCK:
+        mapping = _INTERNED_MAPPINGS.get(key)
+        if mapping is None:
+            mapping = MappingConfig.model_construct(
+                sources=ReadOnlySources(sources), destination_table=destination_table
+            )
+            _INTERNED_MAPPINGS[key] = mapping
+    return mapping
+
+
 def _merge_mapping_for_method(
     method_name: str, base: MappingConfig | None, others: list[MappingConfig]
 ) -> MappingConfig | None:
@@ -76,41 +195,24 @@ def _merge_mapping_for_method(
                 "`lazyframe.lineage.add_source(name=..., uri=...)` on left and right"
             )
         if len(others) != 1:
-            raise ValueError("multiple joins in one parsed plan are currently rejected")
-        if "left" in base.sources and "right" in base.sources:
-            raise ValueError("multiple joins in one parsed plan are currently rejected")
-
-        base_keys = set(base.sources)
-        other_keys = set(others[0].sources)
-        if base_keys == {"left"} and other_keys == {"right"}:
-            left_source = base.sources["left"]
-            right_source = others[0].sources["right"]
-        else:
-            if len(base.sources) != 1 or len(others[0].sources) != 1:
-                raise ValueError("multiple joins in one parsed plan are currently rejected")
-            left_source = _first_source_fqn(base)
-            right_source = _first_source_fqn(others[0])
-
-        return MappingConfig(
-            sources={
-                "left": left_source,
-                "right": right_source,
-            },
-            destination_table=_default_destination_fqn(
-                {
-                    "left": left_source,
-                    "right": right_source,
-                }
-            ),
+            raise ValueError("join lineage expects exactly one right-hand frame")
+        return _intern_mapping(
+            {**_join_operand_sources(base, "left"), **_join_operand_sources(others[0], "right")},
+            _JOIN_DESTINATION,
         )
 
     seed = base or others[0]
-    merged_sources = dict(seed.sources)
-
-    def merge_sources(other: MappingConfig) -> None:
+    rest = others if base is not None else others[1:]
+    # Copy-on-write: the seed is shared as-is unless another mapping adds an alias.
+    merged_sources: dict[str, str] | None = None
+    for other in rest:
+        if other is seed:
+            continue
         for alias, fqn in other.sources.items():
-            existing = merged_sources.get(alias)
+            existing = (merged_sources or seed.sources).get(alias)
             if existing is None:
+                if merged_sources is None:
+                    merged_sources = dict(seed.sources)
                 merged_sources[alias] = fqn
                 continue
             if existing != fqn:
@@ -119,92 +221,209 @@ def _merge_mapping_for_method(
                     f"alias={alias} existing={existing} conflicting={fqn}"
                 )
 
-    for other in [] if base is None else others:
-        merge_sources(other)
-    if base is None and len(others) > 1:
-        for other in others[1:]:
-            merge_sources(other)
+    if merged_sources is None:
+        return seed
+    return _intern_mapping(merged_sources, seed.destination_table)
 
-    return MappingConfig(
-        sources=merged_sources,
-        destination_table=seed.destination_table,
-    )
 
+def _merge_union_mappings(mappings: list[MappingConfig | None]) -> MappingConfig | None:
+    """One mapping for all inputs of a union, listing each source FQN once.
+
+    Inputs sharing a mapping or a source FQN collapse up front, so hundreds of
+    daily partitions of one table stay a single source.
+    """
+    tagged = [mapping for mapping in mappings if mapping is not None]
+    if not tagged:
+        return None
+    if len(tagged) != len(mappings):
+        raise ValueError(
+            "union lineage requires metadata on every input; call "
+            "`lazyframe.lineage.add_source(name=..., uri=...)` on each frame"
+        )
+    distinct = list({id(mapping): mapping for mapping in tagged}.values())
+    seed = distinct[0]
+    if len(distinct) == 1:
+        return seed
+
+    sources: dict[str, str] = {}
+    seen_fqns: set[str] = set()
+    for mapping in distinct:
+        if any(_is_join_path(alias) for alias in mapping.sources):
+            raise ValueError("union inputs built from joins must share one lineage mapping")
+        for alias, fqn in mapping.sources.items():
+            if fqn in seen_fqns:
+                continue
+            seen_fqns.add(fqn)
+            unique_alias, index = alias, len(sources)
+            while unique_alias in sources:
+                unique_alias, index = f"{alias}_{index}", index + 1
+            sources[unique_alias] = fqn
+    if sources == seed.sources:
+        return seed
+    return _intern_mapping(sources, seed.destination_table)
+
+
+def _record_method_call(
+    method_name: str, lazyframe: pl.LazyFrame, args: tuple[Any, ...], kwargs: dict[str, Any]
+) -> RecordedOperation | None:
+    parent = get_operations(lazyframe)
+    if parent is None:
+        return None
+    if method_name == "group_by":
+        return record_group_by(parent, args, kwargs)
+    return record_operation(method_name, parent, args, kwargs)
 
-def _patch_lazyframe_method(method_name: str) -> None:
-    original = getattr(pl.LazyFrame, method_name, None)
-    if original is None or getattr(original, "__lineage_patched__", False):
-        return
 
+def _lazyframe_wrapper(method_name: str, original: Callable[..., Any]) -> Callable[..., Any]:
     def patched(self: pl.LazyFrame, *args: Any, **kwargs: Any) -> Any:
         result = original(self, *args, **kwargs)
+        if not has_mappings():
+            return result
         base_mapping = get_mapping(self)
         other_mappings = _extract_mappings([*args, *kwargs.values()])
         merged = _merge_mapping_for_method(method_name, base_mapping, other_mappings)
         if merged is None:
             return result
+        operations = _record_method_call(method_name, self, args, kwargs)
         if isinstance(result, pl.LazyFrame):
-            set_mapping(result, merged)
+            set_mapping(result, merged, operations)
             return result
         setattr(result, "_lineage_mapping", merged)
+        setattr(result, "_lineage_operations", operations)
         return result
 
-    setattr(patched, "__lineage_patched__", True)
-    setattr(pl.LazyFrame, method_name, patched)
+    return patched
 
 
-def _patch_group_by_agg() -> None:
-    global _GROUP_BY_PATCHED
-    if _GROUP_BY_PATCHED:
-        return
-    try:
-        from polars.lazyframe.group_by import LazyGroupBy
-    except ImportError:  # pragma: no cover
-        return
+def _concat_wrapper(original: Callable[..., Any]) -> Callable[..., Any]:
+    def patched(items: Iterable[Any], *args: Any, **kwargs: Any) -> Any:
+        items = list(items)
+        result = original(items, *args, **kwargs)
+        if not isinstance(result, pl.LazyFrame) or not has_mappings():
+            return result
+        merged = _merge_union_mappings(
+            [get_mapping(item) for item in items if isinstance(item, pl.LazyFrame)]
+        )
+        if merged is not None:
+            set_mapping(result, merged)
+        return result
+
+    return patched
 
-    original = getattr(LazyGroupBy, "agg", None)
-    if original is None or getattr(original, "__lineage_patched__", False):
-        _GROUP_BY_PATCHED = True
-        return
 
+def _group_by_agg_wrapper(original: Callable[..., Any]) -> Callable[..., Any]:
     def patched(self: Any, *args: Any, **kwargs: Any) -> pl.LazyFrame:
         result = cast(pl.LazyFrame, original(self, *args, **kwargs))
         mapping = getattr(self, "_lineage_mapping", None)
         if isinstance(mapping, MappingConfig):
-            set_mapping(result, mapping)
+            operations = record_aggregation(
+                getattr(self, "_lineage_operations", None), args, kwargs
+            )
+            set_mapping(result, mapping, operations)
         return result
 
-    setattr(patched, "__lineage_patched__", True)
-    setattr(LazyGroupBy, "agg", patched)
-    _GROUP_BY_PATCHED = True
+    return patched
+
+
+def _wrapper_targets() -> list[
+    tuple[object, str, Callable[[Callable[..., Any]], Callable[..., Any]]]
+]:
+    targets: list[tuple[object, str, Callable[[Callable[..., Any]], Callable[..., Any]]]] = [
+        (pl.LazyFrame, method_name, partial(_lazyframe_wrapper, method_name))
+        for method_name in _PATCHED_METHODS
+    ]
+    targets.append((pl, "concat", _concat_wrapper))
+    try:
+        from polars.lazyframe.group_by import LazyGroupBy
+    except ImportError:  # pragma: no cover
+        return targets
+    targets.append((LazyGroupBy, "agg", _group_by_agg_wrapper))
+    return targets
+
+
+def _install_wrappers_locked() -> None:
+    for owner, method_name, wrap in _wrapper_targets():
+        original = getattr(owner, method_name, None)
+        if original is None:
+            continue
+        _ORIGINAL_METHODS.append((owner, method_name, owner.__dict__.get(method_name)))
+        setattr(owner, method_name, wrap(original))
 
 
-def _enable_lineage_propagation() -> None:
-    global _PATCHED
-    if _PATCHED:
+def _uninstall_wrappers_locked() -> None:
+    while _ORIGINAL_METHODS:
+        owner, method_name, original = _ORIGINAL_METHODS.pop()
+        if original is None:
+            delattr(owner, method_name)
+        else:
+            setattr(owner, method_name, original)
+
+
+def _sync_wrappers_locked() -> None:
+    if _RECORDING_SCOPES:
+        wanted = True
+    elif _RECORDING_SWITCH is None:
+        wanted = _SOURCE_REGISTERED
+    else:
+        wanted = _RECORDING_SWITCH
+    if wanted and not _ORIGINAL_METHODS:
+        _install_wrappers_locked()
+    elif not wanted and _ORIGINAL_METHODS:
+        _uninstall_wrappers_locked()
+
+
+def _note_source_registered() -> None:
+    global _SOURCE_REGISTERED
+    if _SOURCE_REGISTERED:
         return
+    with _RECORDING_LOCK:
+        _SOURCE_REGISTERED = True
+        _sync_wrappers_locked()
+
+
+def enable_recording() -> None:
+    """Wrap the ``LazyFrame`` methods that propagate lineage metadata until disabled."""
+    global _RECORDING_SWITCH
+    with _RECORDING_LOCK:
+        _RECORDING_SWITCH = True
+        _sync_wrappers_locked()
+
+
+def disable_recording() -> None:
+    """Restore the original ``LazyFrame`` methods outside ``recording()`` blocks.
 
-    for method_name in (
-        "select",
-        "with_columns",
-        "filter",
-        "sort",
-        "rename",
-        "drop",
-        "join",
-        "group_by",
-    ):
-        _patch_lazyframe_method(method_name)
+    Metadata already attached to frames is kept, but new frames derived from them
+    no longer inherit it.
+    """
+    global _RECORDING_SWITCH
+    with _RECORDING_LOCK:
+        _RECORDING_SWITCH = False
+        _sync_wrappers_locked()
 
-    _patch_group_by_agg()
-    _PATCHED = True
+
+def is_recording() -> bool:
+    return bool(_ORIGINAL_METHODS)
+
+
+@contextmanager
+def recording() -> Iterator[None]:
+    """Propagate lineage metadata for the duration of a ``with`` block."""
+    global _RECORDING_SCOPES
+    with _RECORDING_LOCK:
+        _RECORDING_SCOPES += 1
+        _sync_wrappers_locked()
+    try:
+        yield
+    finally:
+        with _RECORDING_LOCK:
+            _RECORDING_SCOPES -= 1
+            _sync_wrappers_locked()
 
 
 @pl.api.register_lazyframe_namespace("lineage")
 class LazyFrameLineageNamespace:
     def __init__(self, lazyframe: pl.LazyFrame) -> None:
         self._lazyframe = lazyframe
-        _enable_lineage_propagation()
 
     def add_source(
         self,
@@ -223,30 +442,54 @@ class LazyFrameLineageNamespace:
             sources=normalized_sources,
             destination_table=destination_table or _default_destination_fqn(normalized_sources),
         )
-        set_mapping(self._lazyframe, mapping)
+        mapping = _intern_mapping(mapping.sources, mapping.destination_table)
+        # Wide frames are abbreviated in explain text; extraction uses this schema instead.
+        set_source_schema(next(iter(mapping.sources.values())), get_schema_names(self._lazyframe))
+        set_mapping(self._lazyframe, mapping, SOURCE_OPERATION)
+        _note_source_registered()
         return self._lazyframe
 
-    def extract(self) -> list[dict[str, Any]]:
-        mapping = require_mapping(self._lazyframe)
-        return extract_lineage_payloads_from_lazyframe(self._lazyframe, mapping)
+    def _mapping(self) -> MappingConfig:
+        mapping = get_mapping(self._lazyframe) or _mapping_from_scans(self._lazyframe)
+        return mapping or require_mapping(self._lazyframe)
 
-    def to_markdown(self) -> str:
-        mapping = require_mapping(self._lazyframe)
+    def _operations(self, mode: ExtractionMode) -> RecordedOperation | None:
+        return get_operations(self._lazyframe) if mode == "recorded" else None
+
+    def extract(
+        self, *, mode: ExtractionMode = "plan", columns: Collection[str] | None = None
+    ) -> list[dict[str, Any]]:
+        """OpenMetadata payloads; ``columns`` limits them to those output columns."""
+        mapping = self._mapping()
+        return extract_lineage_payloads_from_lazyframe(
+            self._lazyframe, mapping, operations=self._operations(mode), columns=columns
+        )
+
+    def to_markdown(
+        self, *, mode: ExtractionMode = "plan", columns: Collection[str] | None = None
+    ) -> str:
+        mapping = self._mapping()
         output = extract_lineage_output_from_lazyframe(
             self._lazyframe,
             mapping,
             output_format="markdown",
+            operations=self._operations(mode),
+            columns=columns,
         )
         if not isinstance(output, str):  # pragma: no cover - defensive typing guard
             raise TypeError("markdown export must return a string")
         return output
 
-    def to_json(self) -> LineageDocument:
-        mapping = require_mapping(self._lazyframe)
+    def to_json(
+        self, *, mode: ExtractionMode = "plan", columns: Collection[str] | None = None
+    ) -> LineageDocument:
+        mapping = self._mapping()
         output = extract_lineage_output_from_lazyframe(
             self._lazyframe,
             mapping,
             output_format="json",
+            operations=self._operations(mode),
+            columns=columns,
         )
         if not isinstance(output, LineageDocument):  # pragma: no cover - defensive typing guard
             raise TypeError("json export must return a LineageDocument")
@@ -254,4 +497,8 @@ class LazyFrameLineageNamespace:
 
 
 def register_lineage_namespace() -> None:
-    _enable_lineage_propagation()
+    """Register ``LazyFrame.lineage``; importing ``polars_lineage`` already does this.
+
+    Method wrappers are not installed here: they follow the recording switch and
+    are installed by the first ``add_source`` call unless recording is disabled.
+    """
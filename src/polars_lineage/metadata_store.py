@@ -1,34 +1,200 @@
 from __future__ import annotations
 
+import hashlib
+import threading
 import weakref
+from collections import deque
+from collections.abc import Iterable, Mapping
 from functools import partial
+from types import MappingProxyType
+from typing import NamedTuple
 
 import polars as pl
 
 from polars_lineage.config import MappingConfig
+from polars_lineage.recorder import RecordedOperation
 
-_MAPPINGS_BY_ID: dict[int, MappingConfig] = {}
-_REFS_BY_ID: dict[int, weakref.ref[pl.LazyFrame]] = {}
+_NO_PLAN_DIGESTS: Mapping[str, str] = MappingProxyType({})
 
 
-def _cleanup_by_key(key: int) -> None:
-    _REFS_BY_ID.pop(key, None)
-    _MAPPINGS_BY_ID.pop(key, None)
+class _Entry(NamedTuple):
+    """Everything stored for one ``LazyFrame``; replaced as a whole, never mutated."""
 
+    reference: weakref.ref[pl.LazyFrame]
+    mapping: MappingConfig | None = None
+    operations: RecordedOperation | None = None
+    schema_names: tuple[str, ...] | None = None
+    plan_digests: Mapping[str, str] = _NO_PLAN_DIGESTS
 
-def _cleanup_with_ref(_key: int, _reference: weakref.ReferenceType[pl.LazyFrame]) -> None:
-    _cleanup_by_key(_key)
 
+# Readers do a single dict lookup and check that the entry's weakref still points
+# at the frame they hold, so an entry left behind by a collected frame whose id()
+# was reused is never returned. Writers publish whole new entries under
+# ``_WRITE_LOCK``. Weakref callbacks can fire on any thread, including one that
+# already holds the lock, so they only queue the removal and apply it if the lock
+# is free; otherwise the next writer does.
+_ENTRIES: dict[int, _Entry] = {}
+_WRITE_LOCK = threading.Lock()
+_PENDING_REMOVALS: deque[tuple[int, weakref.ref[pl.LazyFrame]]] = deque()
+# Entries with a mapping; lets patched methods skip all work while it is zero.
+_MAPPED_FRAMES = 0
 
-def set_mapping(lazyframe: pl.LazyFrame, mapping: MappingConfig) -> None:
+
+class SourceSchema(NamedTuple):
+    """Column names of one registered source, captured once at ``add_source`` time."""
+
+    columns: tuple[str, ...]
+    fingerprint: str
+
+
+# Keyed by source FQN. Explain text abbreviates wide ``DF [...]`` column lists, so
+# extraction looks source columns up here instead of trusting the plan text.
+_SOURCE_SCHEMAS: dict[str, SourceSchema] = {}
+
+
+def _on_collected(key: int, reference: weakref.ref[pl.LazyFrame]) -> None:
+    _PENDING_REMOVALS.append((key, reference))
+    if _WRITE_LOCK.acquire(blocking=False):
+        try:
+            _purge_locked()
+        finally:
+            _WRITE_LOCK.release()
+
+
+def _purge_locked() -> None:
+    global _MAPPED_FRAMES
+    while _PENDING_REMOVALS:
+        key, reference = _PENDING_REMOVALS.popleft()
+        entry = _ENTRIES.get(key)
+        # A newer frame may already own this id(); only drop the collected one's entry.
+        if entry is not None and entry.reference is reference:
+            del _ENTRIES[key]
+            if entry.mapping is not None:
+                _MAPPED_FRAMES -= 1
+
+
+def _entry(lazyframe: pl.LazyFrame) -> _Entry | None:
+    entry = _ENTRIES.get(id(lazyframe))
+    if entry is None or entry.reference() is not lazyframe:
+        return None
+    return entry
+
+
+def _live_entry_locked(lazyframe: pl.LazyFrame, key: int) -> _Entry | None:
+    global _MAPPED_FRAMES
+    if _PENDING_REMOVALS:
+        _purge_locked()
+    entry = _ENTRIES.get(key)
+    if entry is None:
+        return None
+    if entry.reference() is not lazyframe:
+        # Two live objects never share an id(), so this frame's predecessor is dead
+        # and its weakref callback has not been applied yet.
+        del _ENTRIES[key]
+        if entry.mapping is not None:
+            _MAPPED_FRAMES -= 1
+        return None
+    return entry
+
+
+def _reference(lazyframe: pl.LazyFrame, key: int) -> weakref.ref[pl.LazyFrame]:
+    return weakref.ref(lazyframe, partial(_on_collected, key))
+
+
+def set_mapping(
+    lazyframe: pl.LazyFrame,
+    mapping: MappingConfig,
+    operations: RecordedOperation | None = None,
+) -> None:
+    global _MAPPED_FRAMES
     key = id(lazyframe)
-    _MAPPINGS_BY_ID[key] = mapping
-    if key not in _REFS_BY_ID:
-        _REFS_BY_ID[key] = weakref.ref(lazyframe, partial(_cleanup_with_ref, key))
+    with _WRITE_LOCK:
+        entry = _live_entry_locked(lazyframe, key)
+        if entry is None:
+            _ENTRIES[key] = _Entry(_reference(lazyframe, key), mapping, operations)
+            _MAPPED_FRAMES += 1
+        else:
+            if entry.mapping is None:
+                _MAPPED_FRAMES += 1
+            _ENTRIES[key] = _Entry(
+                entry.reference, mapping, operations, entry.schema_names, entry.plan_digests
+            )
+
+
+def has_mappings() -> bool:
+    """Whether any live ``LazyFrame`` currently has lineage metadata attached."""
+    return _MAPPED_FRAMES > 0
 
 
 def get_mapping(lazyframe: pl.LazyFrame) -> MappingConfig | None:
-    return _MAPPINGS_BY_ID.get(id(lazyframe))
+    entry = _entry(lazyframe)
+    return None if entry is None else entry.mapping
+
+
+def get_operations(lazyframe: pl.LazyFrame) -> RecordedOperation | None:
+    entry = _entry(lazyframe)
+    return None if entry is None else entry.operations
+
+
+def get_schema_names(lazyframe: pl.LazyFrame) -> tuple[str, ...]:
+    """``collect_schema().names()``, resolved once per ``LazyFrame`` instance."""
+    entry = _entry(lazyframe)
+    if entry is not None and entry.schema_names is not None:
+        return entry.schema_names
+    names = tuple(lazyframe.collect_schema().names())
+    key = id(lazyframe)
+    with _WRITE_LOCK:
+        entry = _live_entry_locked(lazyframe, key)
+        if entry is None:
+            _ENTRIES[key] = _Entry(_reference(lazyframe, key), schema_names=names)
+        elif entry.schema_names is not None:
+            return entry.schema_names
+        else:
+            _ENTRIES[key] = _Entry(
+                entry.reference, entry.mapping, entry.operations, names, entry.plan_digests
+            )
+    return names
+
+
+def get_plan_digest(lazyframe: pl.LazyFrame, backend: str) -> str | None:
+    """Digest of the plan ``backend`` rendered for this ``LazyFrame``, if any.
+
+    Only the digest is kept: a serialized plan embeds in-memory frame data, so
+    holding the text would keep a copy of it alive for the frame's lifetime.
+    """
+    entry = _entry(lazyframe)
+    return None if entry is None else entry.plan_digests.get(backend)
+
+
+def set_plan_digest(lazyframe: pl.LazyFrame, backend: str, digest: str) -> None:
+    key = id(lazyframe)
+    with _WRITE_LOCK:
+        entry = _live_entry_locked(lazyframe, key)
+        if entry is None:
+            digests = MappingProxyType({backend: digest})
+            _ENTRIES[key] = _Entry(_reference(lazyframe, key), plan_digests=digests)
+        elif entry.plan_digests.get(backend) != digest:
+            digests = MappingProxyType({**entry.plan_digests, backend: digest})
+            _ENTRIES[key] = _Entry(
+                entry.reference, entry.mapping, entry.operations, entry.schema_names, digests
+            )
+
+
+def set_source_schema(fqn: str, columns: Iterable[str]) -> SourceSchema:
+    """Register the columns of source ``fqn``; an identical schema is stored once."""
+    names = tuple(columns)
+    current = _SOURCE_SCHEMAS.get(fqn)
+    if current is not None and current.columns == names:
+        return current
+    schema = SourceSchema(names, hashlib.sha256("\0".join(names).encode("utf-8")).hexdigest())
+    with _WRITE_LOCK:
+        _SOURCE_SCHEMAS[fqn] = schema
+    return schema
+
+
+def get_source_schemas(fqns: Iterable[str]) -> dict[str, SourceSchema]:
+    """Registered schemas for those of ``fqns`` that have one."""
+    return {fqn: schema for fqn in fqns if (schema := _SOURCE_SCHEMAS.get(fqn)) is not None}
 
 
 def require_mapping(lazyframe: pl.LazyFrame) -> MappingConfig:
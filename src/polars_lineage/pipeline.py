@@ -1,84 +1,296 @@
 from __future__ import annotations
 
 import json
+import multiprocessing
+import os
+from collections.abc import Collection, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Literal, TypeAlias, assert_never
 
 import polars as pl
 
+from polars_lineage.cache import (
+    configure_disk_cache,
+    get_disk_cache,
+    lookup_cached_lineage,
+    mapping_fingerprint,
+    plan_digest,
+    store_cached_lineage,
+)
+from polars_lineage.compact import CompactLineage
 from polars_lineage.config import MappingConfig
 from polars_lineage.exporter import OutputFormat, RenderedLineage, export_lineage
 from polars_lineage.exporter.models import LineageDocument
-from polars_lineage.extractor.explain_tree import extract_plan_lineage
-from polars_lineage.ir import ColumnLineage, ColumnRef, DatasetRef
-from polars_lineage.resolver import resolve_transitive_lineage
+from polars_lineage.exporter.ndjson import write_lineage_ndjson
+from polars_lineage.extractor.assembly import SourceSchemas
+from polars_lineage.extractor.explain_tree import extract_compact_plan_lineage
+from polars_lineage.extractor.serialized_plan import (
+    UnsupportedPlanError,
+    extract_compact_serialized_plan_lineage,
+    has_in_memory_scan,
+    normalize_serialized_plan,
+    serialize_lazyframe_plan,
+)
+from polars_lineage.instrumentation import count, record_plan_size, timed
+from polars_lineage.ir import ColumnLineage, DatasetRef
+from polars_lineage.metadata_store import (
+    get_plan_digest,
+    get_schema_names,
+    get_source_schemas,
+    set_plan_digest,
+)
+from polars_lineage.recorder import RecordedOperation, build_recorded_lineage
+from polars_lineage.resolver import resolve_compact_lineage
 from polars_lineage.validation import validate_lineage
 
+ExtractorBackend: TypeAlias = Literal["tree", "serialized"]
+_BATCH_CHUNKS_PER_WORKER = 4
 
-def extract_lineage_ir_from_plan(plan: str, mapping: MappingConfig) -> list[ColumnLineage]:
-    extracted = extract_plan_lineage(plan, mapping)
-    resolved = resolve_transitive_lineage(extracted)
-    validate_lineage(resolved)
+
+def _render_plan_text(lazyframe: pl.LazyFrame, backend: ExtractorBackend) -> str:
+    if backend == "tree":
+        return timed("explain", lazyframe.explain, format="tree", optimized=False)
+    if backend == "serialized":
+        if has_in_memory_scan(lazyframe):
+            raise UnsupportedPlanError("in-memory frames embed their data in the serialized plan")
+        return timed("serialize", serialize_lazyframe_plan, lazyframe)
+    if TYPE_CHECKING:
+        assert_never(backend)
+    raise ValueError(f"unsupported extractor backend: {backend}")
+
+
+def _extract_rendered_plan_lineage(
+    plan: str,
+    mapping: MappingConfig,
+    backend: ExtractorBackend,
+    source_schemas: SourceSchemas | None = None,
+    columns: Collection[str] | None = None,
+) -> CompactLineage:
+    if backend == "serialized":
+        return extract_compact_serialized_plan_lineage(plan, mapping, source_schemas, columns)
+    return extract_compact_plan_lineage(plan, mapping, source_schemas, columns)
+
+
+def _lookup_cached_lineage(plan_hash: str, mapping_hash: str) -> list[ColumnLineage] | None:
+    cached = lookup_cached_lineage(plan_hash, mapping_hash)
+    count("cache_misses" if cached is None else "cache_hits")
+    return cached
+
+
+def _select_columns(lineage: CompactLineage, columns: Collection[str] | None) -> CompactLineage:
+    if columns is not None:
+        column_name = lineage.columns.column_name
+        lineage.edges = [edge for edge in lineage.edges if column_name[edge.target] in columns]
+    return lineage
+
+
+def _resolve_and_validate(
+    extracted: CompactLineage, columns: Collection[str] | None = None
+) -> list[ColumnLineage]:
+    resolved = timed(
+        "resolve",
+        lambda: _select_columns(resolve_compact_lineage(extracted), columns).to_lineage(),
+    )
+    timed("validate", validate_lineage, resolved)
+    count("edges", len(resolved))
     return resolved
 
 
+def _column_digest(plan_hash: str, columns: Collection[str] | None) -> str:
+    if columns is None:
+        return plan_hash
+    return plan_digest(plan_hash, "columns", *sorted(columns))
+
+
+def extract_lineage_ir_from_plan(
+    plan: str, mapping: MappingConfig, columns: Collection[str] | None = None
+) -> list[ColumnLineage]:
+    """Extract resolved lineage from tree-format plan text.
+
+    With ``columns``, only the backward slice of those destination columns is
+    parsed and resolved, and only their lineage is returned.
+    """
+    record_plan_size(plan)
+    plan_hash = _column_digest(plan_digest(plan), columns)
+    mapping_hash = mapping_fingerprint(mapping)
+    cached = _lookup_cached_lineage(plan_hash, mapping_hash)
+    if cached is not None:
+        return cached
+
+    extracted = extract_compact_plan_lineage(plan, mapping, columns=columns)
+    resolved = _resolve_and_validate(extracted, columns)
+    store_cached_lineage(plan_hash, mapping_hash, resolved)
+    return resolved
+
+
+def _extract_recorded_lineage(
+    lazyframe: pl.LazyFrame,
+    mapping: MappingConfig,
+    operations: RecordedOperation,
+    columns: Collection[str] | None = None,
+) -> list[ColumnLineage] | None:
+    if len(mapping.sources) != 1:
+        return None
+    recorded = timed(
+        "replay_operations",
+        build_recorded_lineage,
+        operations,
+        mapping,
+        get_schema_names(lazyframe),
+    )
+    if recorded is None:
+        return None
+    lineage = _select_columns(recorded, columns).to_lineage()
+    timed("validate", validate_lineage, lineage)
+    count("edges", len(lineage))
+    return lineage
+
+
 def extract_lineage_ir_from_lazyframe(
-    lazyframe: pl.LazyFrame, mapping: MappingConfig
+    lazyframe: pl.LazyFrame,
+    mapping: MappingConfig,
+    backend: ExtractorBackend = "tree",
+    operations: RecordedOperation | None = None,
+    columns: Collection[str] | None = None,
+) -> list[ColumnLineage]:
+    """Extract resolved lineage, replaying ``operations`` when given and modelable.
+
+    A recorded operation log skips plan rendering entirely; logs containing an
+    operation the recorder cannot model fall back to the ``backend`` extractor.
+    Plans the serialized extractor cannot read fall back to the tree extractor.
+    ``columns`` limits extraction to the backward slice of those output columns.
+    """
+    requested: frozenset[str] | None = None
+    if columns is not None:
+        requested = frozenset(columns)
+        unknown = requested.difference(get_schema_names(lazyframe))
+        if unknown:
+            raise ValueError(f"unknown destination columns: {sorted(unknown)}")
+    if operations is not None:
+        recorded = _extract_recorded_lineage(lazyframe, mapping, operations, requested)
+        if recorded is not None:
+            return recorded
+
+    output_columns: set[str] = set()
+    if len(mapping.sources) == 1:
+        output_columns = set(get_schema_names(lazyframe))
+        if requested is not None:
+            output_columns &= requested
+    try:
+        return _extract_backend_lineage(lazyframe, mapping, backend, output_columns, requested)
+    except UnsupportedPlanError:
+        # In-memory frames, UDFs without ``cloudpickle`` and unexpandable selectors
+        # still render in ``explain``.
+        return _extract_backend_lineage(lazyframe, mapping, "tree", output_columns, requested)
+
+
+def _extract_backend_lineage(
+    lazyframe: pl.LazyFrame,
+    mapping: MappingConfig,
+    backend: ExtractorBackend,
+    output_columns: set[str],
+    requested: frozenset[str] | None,
 ) -> list[ColumnLineage]:
-    plan = lazyframe.explain(format="tree", optimized=False)
-    extracted = extract_plan_lineage(plan, mapping)
+    # The frame keeps only its plan digest, so a lineage cache hit skips rendering
+    # without holding the plan text (and any in-memory data in it) alive.
+    plan: str | None = None
+    frame_digest = get_plan_digest(lazyframe, backend)
+    if frame_digest is None:
+        plan = _render_plan_text(lazyframe, backend)
+        record_plan_size(plan)
+        cache_text = normalize_serialized_plan(plan) if backend == "serialized" else plan
+        frame_digest = plan_digest(cache_text, backend)
+        set_plan_digest(lazyframe, backend, frame_digest)
+    plan_hash = _column_digest(plan_digest(frame_digest, *sorted(output_columns)), requested)
+    mapping_hash = mapping_fingerprint(mapping)
+    schemas = get_source_schemas(mapping.sources.values())
+    if schemas:
+        fingerprints = (schemas[fqn].fingerprint for fqn in sorted(schemas))
+        mapping_hash = plan_digest(mapping_hash, *fingerprints)
+    cached = _lookup_cached_lineage(plan_hash, mapping_hash)
+    if cached is not None:
+        return cached
+
+    if plan is None:
+        plan = _render_plan_text(lazyframe, backend)
+        record_plan_size(plan)
+    source_schemas = {fqn: schema.columns for fqn, schema in schemas.items()}
+    extracted = _extract_rendered_plan_lineage(plan, mapping, backend, source_schemas, requested)
 
     if len(mapping.sources) == 1:
-        output_columns = set(lazyframe.collect_schema().names())
-        covered_columns = {entry.to_column.column for entry in extracted}
+        interner = extracted.columns
+        covered_columns = {interner.column_name[edge.target] for edge in extracted.edges}
         passthrough_columns = sorted(output_columns - covered_columns)
         if passthrough_columns:
-            source_dataset = DatasetRef.from_fqn(next(iter(mapping.sources.values())))
-            destination_dataset = DatasetRef.from_fqn(mapping.destination_table)
-            extracted.extend(
-                [
-                    ColumnLineage(
-                        from_columns=(ColumnRef(dataset=source_dataset, column=column_name),),
-                        to_column=ColumnRef(dataset=destination_dataset, column=column_name),
-                        function=f'col("{column_name}")',
-                        confidence="inferred",
-                    )
-                    for column_name in passthrough_columns
-                ]
+            source_id = interner.dataset_id(
+                DatasetRef.from_fqn(next(iter(mapping.sources.values())))
             )
+            destination_id = interner.dataset_id(DatasetRef.from_fqn(mapping.destination_table))
+            for column_name in passthrough_columns:
+                extracted.add_edge(
+                    interner.column_id(destination_id, column_name),
+                    (interner.column_id(source_id, column_name),),
+                    f'col("{column_name}")',
+                    "inferred",
+                )
 
-    resolved = resolve_transitive_lineage(extracted)
-    validate_lineage(resolved)
+    resolved = _resolve_and_validate(extracted, requested)
+    store_cached_lineage(plan_hash, mapping_hash, resolved)
     return resolved
 
 
 def extract_lineage_output_from_plan(
-    plan: str, mapping: MappingConfig, output_format: OutputFormat = "openmetadata"
+    plan: str,
+    mapping: MappingConfig,
+    output_format: OutputFormat = "openmetadata",
+    columns: Collection[str] | None = None,
 ) -> RenderedLineage:
-    resolved = extract_lineage_ir_from_plan(plan, mapping)
-    return export_lineage(resolved, mapping, output_format)
+    resolved = extract_lineage_ir_from_plan(plan, mapping, columns)
+    return timed("export", export_lineage, resolved, mapping, output_format)
 
 
 def extract_lineage_output_from_lazyframe(
     lazyframe: pl.LazyFrame,
     mapping: MappingConfig,
     output_format: OutputFormat = "openmetadata",
+    backend: ExtractorBackend = "tree",
+    operations: RecordedOperation | None = None,
+    columns: Collection[str] | None = None,
 ) -> RenderedLineage:
-    resolved = extract_lineage_ir_from_lazyframe(lazyframe, mapping)
-    return export_lineage(resolved, mapping, output_format)
+    resolved = extract_lineage_ir_from_lazyframe(
+        lazyframe, mapping, backend=backend, operations=operations, columns=columns
+    )
+    return timed("export", export_lineage, resolved, mapping, output_format)
 
 
-def extract_lineage_payloads_from_plan(plan: str, mapping: MappingConfig) -> list[dict[str, Any]]:
-    output = extract_lineage_output_from_plan(plan, mapping, output_format="openmetadata")
+def extract_lineage_payloads_from_plan(
+    plan: str, mapping: MappingConfig, columns: Collection[str] | None = None
+) -> list[dict[str, Any]]:
+    output = extract_lineage_output_from_plan(
+        plan, mapping, output_format="openmetadata", columns=columns
+    )
     if not isinstance(output, list):  # pragma: no cover - defensive typing guard
         raise TypeError("openmetadata export must return a JSON payload list")
     return output
 
 
 def extract_lineage_payloads_from_lazyframe(
-    lazyframe: pl.LazyFrame, mapping: MappingConfig
+    lazyframe: pl.LazyFrame,
+    mapping: MappingConfig,
+    backend: ExtractorBackend = "tree",
+    operations: RecordedOperation | None = None,
+    columns: Collection[str] | None = None,
 ) -> list[dict[str, Any]]:
-    output = extract_lineage_output_from_lazyframe(lazyframe, mapping, output_format="openmetadata")
+    output = extract_lineage_output_from_lazyframe(
+        lazyframe,
+        mapping,
+        output_format="openmetadata",
+        backend=backend,
+        operations=operations,
+        columns=columns,
+    )
     if not isinstance(output, list):  # pragma: no cover - defensive typing guard
         raise TypeError("openmetadata export must return a JSON payload list")
     return output
@@ -89,8 +301,16 @@ def run_extraction_to_file(
     mapping: MappingConfig,
     output_path: Path,
     output_format: OutputFormat = "openmetadata",
+    backend: ExtractorBackend = "tree",
 ) -> None:
-    output = extract_lineage_output_from_lazyframe(lazyframe, mapping, output_format=output_format)
+    if output_format == "ndjson":
+        resolved = extract_lineage_ir_from_lazyframe(lazyframe, mapping, backend=backend)
+        with output_path.open("w", encoding="utf-8") as stream:
+            timed("export", write_lineage_ndjson, resolved, mapping.destination_table, stream)
+        return
+    output = extract_lineage_output_from_lazyframe(
+        lazyframe, mapping, output_format=output_format, backend=backend
+    )
     if isinstance(output, str):
         output_path.write_text(output, encoding="utf-8")
         return
@@ -100,3 +320,100 @@ def run_extraction_to_file(
     else:
         payload = output
     output_path.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+
+
+@dataclass(frozen=True)
+class BatchItemResult:
+    """Outcome of one ``(plan, mapping)`` item; ``index`` is its position in the input."""
+
+    index: int
+    output: RenderedLineage | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _extract_batch_item(
+    index: int, plan: str, mapping: MappingConfig, output_format: OutputFormat
+) -> BatchItemResult:
+    try:
+        output = extract_lineage_output_from_plan(plan, mapping, output_format)
+    except Exception as exc:
+        return BatchItemResult(index=index, error=f"{type(exc).__name__}: {exc}")
+    return BatchItemResult(index=index, output=output)
+
+
+def _extract_batch_chunk(
+    chunk: list[tuple[int, str, MappingConfig]], output_format: OutputFormat
+) -> list[BatchItemResult]:
+    return [
+        _extract_batch_item(index, plan, mapping, output_format) for index, plan, mapping in chunk
+    ]
+
+
+def _init_batch_worker(disk_cache_path: Path | None, disk_cache_max_bytes: int) -> None:
+    if disk_cache_path is not None:
+        configure_disk_cache(disk_cache_path, max_bytes=disk_cache_max_bytes)
+
+
+def extract_lineage_batch(
+    plans_and_mappings: Iterable[tuple[str, MappingConfig]],
+    workers: int | None = None,
+    output_format: OutputFormat = "openmetadata",
+    *,
+    chunksize: int | None = None,
+    ordered: bool = True,
+) -> Iterator[BatchItemResult]:
+    """Run ``extract_lineage_output_from_plan`` for many plans on a process pool.
+
+    Items are sent to workers in chunks (by default about four per worker) and a
+    failing item is reported through ``BatchItemResult.error`` instead of stopping
+    the batch. Results follow input order when ``ordered`` is true, otherwise they
+    are yielded chunk by chunk as workers finish. ``workers=1`` runs in-process.
+    Workers use the ``spawn`` start method and share the configured disk cache.
+    """
+    items = [(index, plan, mapping) for index, (plan, mapping) in enumerate(plans_and_mappings)]
+    worker_count = (os.cpu_count() or 1) if workers is None else workers
+    if worker_count < 1:
+        raise ValueError("batch workers must be >= 1")
+    if chunksize is None:
+        chunksize = max(1, -(-len(items) // (worker_count * _BATCH_CHUNKS_PER_WORKER)))
+    elif chunksize < 1:
+        raise ValueError("batch chunksize must be >= 1")
+    chunks = [items[start : start + chunksize] for start in range(0, len(items), chunksize)]
+    if worker_count == 1 or len(chunks) <= 1:
+        return (result for chunk in chunks for result in _extract_batch_chunk(chunk, output_format))
+    return _run_batch_pool(chunks, worker_count, output_format, ordered)
+
+
+def _run_batch_pool(
+    chunks: list[list[tuple[int, str, MappingConfig]]],
+    worker_count: int,
+    output_format: OutputFormat,
+    ordered: bool,
+) -> Iterator[BatchItemResult]:
+    disk_cache = get_disk_cache()
+    with ProcessPoolExecutor(
+        max_workers=min(worker_count, len(chunks)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_batch_worker,
+        initargs=(
+            None if disk_cache is None else disk_cache.path,
+            0 if disk_cache is None else disk_cache.max_bytes,
+        ),
+    ) as executor:
+        futures: dict[Future[list[BatchItemResult]], list[tuple[int, str, MappingConfig]]] = {
+            executor.submit(_extract_batch_chunk, chunk, output_format): chunk for chunk in chunks
+        }
+        for future in futures if ordered else as_completed(futures):
+            try:
+                results = future.result()
+            except Exception as exc:
+                # The worker itself died (e.g. BrokenProcessPool); fail only its items.
+                error = f"{type(exc).__name__}: {exc}"
+                results = [
+                    BatchItemResult(index=index, error=error) for index, _, _ in futures[future]
+                ]
+            yield from results
@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import http.client
+import json
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, NamedTuple
+from urllib.parse import quote, urlsplit
+
+from polars_lineage.change_detection import (
+    EdgeKey,
+    PublishedLineageState,
+    openmetadata_edge_key,
+)
+
+DEFAULT_ENDPOINT = "/api/v1/lineage"
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_Connection = http.client.HTTPConnection
+
+
+@dataclass(frozen=True)
+class PublishResult:
+    """Outcome of one request; ``index`` is its position in the published sequence."""
+
+    index: int
+    status: int | None
+    attempts: int
+    error: str | None = None
+    edge: EdgeKey | None = None
+    method: str = "PUT"
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass(frozen=True)
+class PublishReport:
+    results: tuple[PublishResult, ...]
+    dry_run: bool = False
+
+    @property
+    def published(self) -> int:
+        return sum(result.ok for result in self.results) if not self.dry_run else 0
+
+    @property
+    def failed(self) -> tuple[PublishResult, ...]:
+        return tuple(result for result in self.results if not result.ok)
+
+
+class _ConnectionPool:
+    """Keep-alive connections to one host, handed out to one thread at a time."""
+
+    def __init__(self, scheme: str, netloc: str, timeout: float) -> None:
+        self._scheme = scheme
+        self._netloc = netloc
+        self._timeout = timeout
+        self._idle: queue.SimpleQueue[_Connection] = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._open: set[_Connection] = set()
+
+    def acquire(self) -> _Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        connection_type = (
+            http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+        )
+        connection = connection_type(self._netloc, timeout=self._timeout)
+        with self._lock:
+            self._open.add(connection)
+        return connection
+
+    def release(self, connection: _Connection) -> None:
+        self._idle.put(connection)
+
+    def discard(self, connection: _Connection) -> None:
+        connection.close()
+        with self._lock:
+            self._open.discard(connection)
+
+    def close(self) -> None:
+        with self._lock:
+            connections = list(self._open)
+            self._open.clear()
+        for connection in connections:
+            connection.close()
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+
+
+class _Request(NamedTuple):
+    position: int
+    method: str
+    path: str
+    body: bytes | None
+    edge: EdgeKey
+
+
+def _validate_payload(payload: Mapping[str, Any]) -> bytes:
+    edge = payload.get("edge")
+    if not isinstance(edge, Mapping) or "fromEntity" not in edge or "toEntity" not in edge:
+        raise ValueError("payload must be an addLineage request with edge.fromEntity/toEntity")
+    return json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+class OpenMetadataPublisher:
+    """PUT ``export_openmetadata_requests`` payloads to an OpenMetadata server.
+
+    Payloads are split into batches of ``batch_size``; up to ``concurrency`` batches
+    run at once, each sending its requests back to back over one pooled keep-alive
+    connection. Connection errors and ``RETRYABLE_STATUSES`` are retried up to
+    ``max_retries`` times with exponential backoff (``Retry-After`` wins when sent).
+    A payload that still fails is reported in the ``PublishReport`` and does not
+    stop the others. ``dry_run`` validates and serializes payloads without sending.
+
+    ``publish_changes`` sends only the edges whose content hash differs from a
+    ``PublishedLineageState`` and deletes edges that disappeared from it.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        token: str | None = None,
+        endpoint: str = DEFAULT_ENDPOINT,
+        concurrency: int = 4,
+        batch_size: int = 50,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.5,
+        max_backoff_seconds: float = 30.0,
+        timeout: float = 30.0,
+        dry_run: bool = False,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        parsed = urlsplit(base_url)
+        if parsed.scheme not in {"http", "https"} or not parsed.netloc:
+            raise ValueError("base_url must be an http(s) URL")
+        if concurrency < 1:
+            raise ValueError("publisher concurrency must be >= 1")
+        if batch_size < 1:
+            raise ValueError("publisher batch_size must be >= 1")
+        if max_retries < 0:
+            raise ValueError("publisher max_retries must be >= 0")
+        self._path = parsed.path.rstrip("/") + endpoint
+        self._headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        if token is not None:
+            self._headers["Authorization"] = f"Bearer {token}"
+        self._concurrency = concurrency
+        self._batch_size = batch_size
+        self._max_retries = max_retries
+        self._backoff_seconds = backoff_seconds
+        self._max_backoff_seconds = max_backoff_seconds
+        self._dry_run = dry_run
+        self._sleep = sleep
+        self._pool = _ConnectionPool(parsed.scheme, parsed.netloc, timeout)
+
+    def __enter__(self) -> OpenMetadataPublisher:
+        return self
+
+    def __exit__(self, *_exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._pool.close()
+
+    def publish(self, payloads: Sequence[Mapping[str, Any]]) -> PublishReport:
+        requests = [self._put_request(index, payload) for index, payload in enumerate(payloads)]
+        return self._run(requests)
+
+    def publish_changes(
+        self,
+        payloads: Sequence[Mapping[str, Any]],
+        state: PublishedLineageState,
+        *,
+        destination_tables: Iterable[str] | None = None,
+    ) -> PublishReport:
+        """Publish added and changed edges, delete removed ones, then save ``state``.
+
+        Results list the PUTs (added, then changed) followed by the DELETEs. Only
+        requests that succeeded are recorded, so failed edges are retried next run.
+        A dry run reports the requests it would send and leaves ``state`` untouched.
+        """
+        changes = state.diff(payloads, destination_tables)
+        upserts = (*changes.added, *changes.changed)
+        requests = [self._put_request(index, payload) for index, payload in enumerate(upserts)]
+        requests.extend(
+            self._delete_request(len(upserts) + offset, edge)
+            for offset, edge in enumerate(changes.removed)
+        )
+        report = self._run(requests)
+        if report.dry_run:
+            return report
+        for request, result in zip(requests, report.results, strict=True):
+            if not result.ok:
+                continue
+            if request.method == "DELETE":
+                state.mark_removed(request.edge)
+            else:
+                state.mark_published(request.edge, changes.hashes[request.edge])
+        state.save()
+        return report
+
+    def _put_request(self, index: int, payload: Mapping[str, Any]) -> _Request:
+        body = _validate_payload(payload)
+        return _Request(index, "PUT", self._path, body, openmetadata_edge_key(payload))
+
+    def _delete_request(self, index: int, edge: EdgeKey) -> _Request:
+        source_fqn, destination_fqn = edge
+        path = (
+            f"{self._path}/table/name/{quote(source_fqn, safe='')}"
+            f"/table/name/{quote(destination_fqn, safe='')}"
+        )
+        return _Request(index, "DELETE", path, None, edge)
+
+    def _run(self, requests: list[_Request]) -> PublishReport:
+        if self._dry_run:
+            results = tuple(
+                PublishResult(
+                    index=request.position,
+                    status=None,
+                    attempts=0,
+                    edge=request.edge,
+                    method=request.method,
+                )
+                for request in requests
+            )
+            return PublishReport(results=results, dry_run=True)
+
+        batches = [
+            requests[start : start + self._batch_size]
+            for start in range(0, len(requests), self._batch_size)
+        ]
+        with ThreadPoolExecutor(max_workers=min(self._concurrency, len(batches) or 1)) as pool:
+            batch_results = list(pool.map(self._send_batch, batches))
+        ordered = sorted(
+            (result for batch in batch_results for result in batch),
+            key=lambda result: result.index,
+        )
+        return PublishReport(results=tuple(ordered))
+
+    def _send_batch(self, batch: list[_Request]) -> list[PublishResult]:
+        connection = self._pool.acquire()
+        results: list[PublishResult] = []
+        try:
+            for request in batch:
+                result, connection = self._send_with_retries(request, connection)
+                results.append(result)
+        finally:
+            self._pool.release(connection)
+        return results
+
+    def _send_with_retries(
+        self, request: _Request, connection: _Connection
+    ) -> tuple[PublishResult, _Connection]:
+        attempt = 0
+        while True:
+            attempt += 1
+            status: int | None = None
+            retry_after: float | None = None
+            try:
+                connection.request(
+                    request.method, request.path, body=request.body, headers=self._headers
+                )
+                response = connection.getresponse()
+                response_body = response.read()
+                status = response.status
+                retry_after = _retry_after_seconds(response.getheader("Retry-After"))
+                if response.will_close:
+                    self._pool.discard(connection)
+                    connection = self._pool.acquire()
+                # Deleting an edge the server no longer has is what we wanted anyway.
+                if 200 <= status < 300 or (request.method == "DELETE" and status == 404):
+                    result = PublishResult(
+                        index=request.position,
+                        status=status,
+                        attempts=attempt,
+                        edge=request.edge,
+                        method=request.method,
+                    )
+                    return result, connection
+                error = f"HTTP {status}: {response_body[:200].decode('utf-8', 'replace')}"
+                retryable = status in RETRYABLE_STATUSES
+            except (OSError, http.client.HTTPException) as exc:
+                self._pool.discard(connection)
+                connection = self._pool.acquire()
+                error = f"{type(exc).__name__}: {exc}"
+                retryable = True
+
+            if not retryable or attempt > self._max_retries:
+                result = PublishResult(
+                    index=request.position,
+                    status=status,
+                    attempts=attempt,
+                    error=error,
+                    edge=request.edge,
+                    method=request.method,
+                )
+                return result, connection
+            delay = self._backoff_seconds * 2 ** (attempt - 1)
+            if retry_after is not None:
+                delay = retry_after
+            self._sleep(min(self._max_backoff_seconds, delay))
+
+
+def _retry_after_seconds(value: str | None) -> float | None:
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def publish_openmetadata_lineage(
+    payloads: Sequence[Mapping[str, Any]], base_url: str, **options: Any
+) -> PublishReport:
+    """Publish payloads with a one-off ``OpenMetadataPublisher``; see its options."""
+    with OpenMetadataPublisher(base_url, **options) as publisher:
+        return publisher.publish(payloads)
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any, Literal
+
+import polars as pl
+
+from polars_lineage.compact import CompactLineage
+from polars_lineage.config import MappingConfig
+from polars_lineage.extractor.expr_parser import parse_expression, pass_through_column
+from polars_lineage.ir import DatasetRef
+
+OperationKind = Literal["source", "project", "extend", "rename", "passthrough", "unsupported"]
+
+_PASSTHROUGH_METHODS = frozenset({"filter", "sort", "drop"})
+_NESTED_DYN_LITERAL_PATTERN = re.compile(r"dyn (?:int|float): ")
+
+
+@dataclass(frozen=True, slots=True)
+class RecordedExpression:
+    output_name: str
+    root_names: tuple[str, ...]
+    text: str
+
+
+@dataclass(frozen=True, slots=True)
+class RecordedOperation:
+    """One lineage-relevant call in a ``LazyFrame`` chain, linked to its input.
+
+    ``project`` replaces the visible columns (``select``, ``group_by().agg``),
+    ``extend`` adds or overwrites them (``with_columns``), and ``unsupported``
+    marks a call the log cannot model, forcing the explain-plan fallback.
+    """
+
+    kind: OperationKind
+    parent: RecordedOperation | None = None
+    expressions: tuple[RecordedExpression, ...] = ()
+    renames: tuple[tuple[str, str], ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class _ColumnDerivation:
+    sources: frozenset[str]
+    function: str
+    confidence: Literal["exact", "inferred", "unknown"]
+
+
+SOURCE_OPERATION = RecordedOperation(kind="source")
+
+
+def _flatten_inputs(values: Iterable[Any]) -> Iterable[Any]:
+    for value in values:
+        if isinstance(value, (list, tuple)):
+            yield from _flatten_inputs(value)
+        else:
+            yield value
+
+
+def _record_expression(value: Any, name: str | None = None) -> RecordedExpression | None:
+    if isinstance(value, str):
+        value = pl.col(value)
+    if not isinstance(value, pl.Expr):
+        return None
+    if name is not None:
+        value = value.alias(name)
+    meta = value.meta
+    try:
+        if meta.has_multiple_outputs() or meta.is_regex_projection():
+            return None
+        output_name = meta.output_name()
+        root_names = tuple(meta.root_names())
+        text = str(meta.undo_aliases())
+    except pl.exceptions.PolarsError:
+        return None
+    if not text.startswith("dyn "):
+        # explain output prints nested dynamic literals bare, e.g. ``(col("a")) * (2)``.
+        text = _NESTED_DYN_LITERAL_PATTERN.sub("", text)
+    return RecordedExpression(output_name=output_name, root_names=root_names, text=text)
+
+
+def record_expressions(
+    args: Iterable[Any], named: Mapping[str, Any]
+) -> tuple[RecordedExpression, ...] | None:
+    """Capture expression arguments, or ``None`` when any of them cannot be modeled."""
+    recorded: list[RecordedExpression] = []
+    for value in _flatten_inputs(args):
+        expression = _record_expression(value)
+        if expression is None:
+            return None
+        recorded.append(expression)
+    for name, value in named.items():
+        expression = _record_expression(value, name)
+        if expression is None:
+            return None
+        recorded.append(expression)
+    return tuple(recorded)
+
+
+def record_operation(
+    method_name: str,
+    parent: RecordedOperation,
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> RecordedOperation:
+    if parent.kind == "unsupported":
+        return parent
+    if method_name in _PASSTHROUGH_METHODS:
+        return RecordedOperation(kind="passthrough", parent=parent)
+    if method_name in {"select", "with_columns"}:
+        expressions = record_expressions(args, kwargs)
+        if expressions is not None:
+            kind: OperationKind = "project" if method_name == "select" else "extend"
+            return RecordedOperation(kind=kind, parent=parent, expressions=expressions)
+    if method_name == "rename" and len(args) == 1 and not kwargs and isinstance(args[0], dict):
+        return RecordedOperation(kind="rename", parent=parent, renames=tuple(args[0].items()))
+    return RecordedOperation(kind="unsupported", parent=parent)
+
+
+def record_aggregation(
+    group_by: RecordedOperation | None,
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> RecordedOperation | None:
+    """Fold ``group_by`` keys and ``agg`` expressions into one ``project`` operation.
+
+    ``group_by`` is recorded as a ``project`` of its keys; the aggregation appends
+    to it, since the output schema is exactly keys followed by aggregates.
+    """
+    if group_by is None:
+        return None
+    if group_by.kind != "project":
+        return RecordedOperation(kind="unsupported", parent=group_by.parent)
+    aggregations = record_expressions(args, kwargs)
+    if aggregations is None:
+        return RecordedOperation(kind="unsupported", parent=group_by.parent)
+    return RecordedOperation(
+        kind="project",
+        parent=group_by.parent,
+        expressions=group_by.expressions + aggregations,
+    )
+
+
+def record_group_by(
+    parent: RecordedOperation, args: tuple[Any, ...], kwargs: dict[str, Any]
+) -> RecordedOperation:
+    if parent.kind == "unsupported":
+        return parent
+    named = {key: value for key, value in kwargs.items() if key != "maintain_order"}
+    keys = record_expressions(args, named)
+    if keys is None:
+        return RecordedOperation(kind="unsupported", parent=parent)
+    return RecordedOperation(kind="project", parent=parent, expressions=keys)
+
+
+def _operation_chain(operation: RecordedOperation) -> list[RecordedOperation] | None:
+    chain: list[RecordedOperation] = []
+    current: RecordedOperation | None = operation
+    while current is not None:
+        if current.kind == "unsupported":
+            return None
+        chain.append(current)
+        current = current.parent
+    chain.reverse()
+    return chain
+
+
+def _derive(
+    expression: RecordedExpression, columns: dict[str, _ColumnDerivation]
+) -> _ColumnDerivation:
+    passed = pass_through_column(expression.text)
+    if passed is not None and passed in columns:
+        return columns[passed]
+    parsed = parse_expression(expression.text)
+    sources: set[str] = set()
+    for root_name in expression.root_names:
+        upstream = columns.get(root_name)
+        sources.update((root_name,) if upstream is None else upstream.sources)
+    return _ColumnDerivation(
+        sources=frozenset(sources), function=parsed.function, confidence=parsed.confidence
+    )
+
+
+def build_recorded_lineage(
+    operation: RecordedOperation, mapping: MappingConfig, output_columns: Iterable[str]
+) -> CompactLineage | None:
+    """Replay an operation log into resolved lineage for a single-source mapping.
+
+    Columns never touched by a recorded expression pass through from the source.
+    Returns ``None`` when the log contains an operation it cannot model.
+    """
+    chain = _operation_chain(operation)
+    if chain is None or len(mapping.sources) != 1:
+        return None
+
+    columns: dict[str, _ColumnDerivation] = {}
+    for step in chain:
+        if step.kind == "project":
+            columns = {
+                expression.output_name: _derive(expression, columns)
+                for expression in step.expressions
+            }
+        elif step.kind == "extend":
+            columns.update(
+                {
+                    expression.output_name: _derive(expression, columns)
+                    for expression in step.expressions
+                }
+            )
+        elif step.kind == "rename":
+            renamed = dict(columns)
+            for existing, _new in step.renames:
+                renamed.pop(existing, None)
+            for existing, new in step.renames:
+                renamed[new] = columns.get(existing) or _derive(
+                    RecordedExpression(new, (existing,), f'col("{existing}")'), columns
+                )
+            columns = renamed
+
+    lineage = CompactLineage()
+    interner = lineage.columns
+    source_id = interner.dataset_id(DatasetRef.from_fqn(next(iter(mapping.sources.values()))))
+    destination_id = interner.dataset_id(DatasetRef.from_fqn(mapping.destination_table))
+    for column_name in sorted(output_columns):
+        derivation = columns.get(column_name)
+        if derivation is None:
+            derivation = _ColumnDerivation(
+                sources=frozenset((column_name,)),
+                function=f'col("{column_name}")',
+                confidence="inferred",
+            )
+        lineage.add_edge(
+            interner.column_id(destination_id, column_name),
+            tuple(interner.column_id(source_id, source) for source in sorted(derivation.sources)),
+            derivation.function,
+            derivation.confidence,
+        )
+    return lineage
@@ -1,51 +1,127 @@
 from __future__ import annotations
 
-from polars_lineage.ir import ColumnLineage, ColumnRef
+from collections.abc import Callable, Iterable
 
+from polars_lineage.compact import CompactLineage
+from polars_lineage.ir import ColumnLineage
 
-def _key(column: ColumnRef) -> str:
-    return f"{column.dataset.fqn}.{column.column}"
+_Leaves = tuple[int, ...]
 
 
-def resolve_transitive_lineage(lineage: list[ColumnLineage]) -> list[ColumnLineage]:
-    lineage_by_target = {_key(item.to_column): item for item in lineage}
-
-    def resolve_sources(column: ColumnRef, seen: set[str]) -> tuple[ColumnRef, ...]:
-        column_key = _key(column)
-        if column_key in seen:
-            return (column,)
-        current = lineage_by_target.get(column_key)
-        if current is None:
-            return (column,)
-        if not current.from_columns:
-            return ()
-
-        next_seen = seen | {column_key}
-        resolved: set[tuple[str, str]] = set()
-        flattened: list[ColumnRef] = []
-        for source in current.from_columns:
-            for leaf in resolve_sources(source, next_seen):
-                if _key(leaf) == column_key:
-                    leaf = source
-                dedupe_key = (leaf.dataset.fqn, leaf.column)
-                if dedupe_key in resolved:
-                    continue
-                resolved.add(dedupe_key)
-                flattened.append(leaf)
-        return tuple(
-            sorted(
-                flattened,
-                key=lambda item: (item.dataset.fqn, item.column),
+def _merge_leaves(
+    groups: Iterable[Iterable[int]], sort_key: Callable[[int], tuple[str, str]]
+) -> _Leaves:
+    merged: set[int] = set()
+    for group in groups:
+        merged.update(group)
+    return tuple(sorted(merged, key=sort_key))
+
+
+def _strongly_connected_components(graph: dict[int, list[int]]) -> list[list[int]]:
+    """Iterative Tarjan; components come out sinks first, i.e. sources before consumers."""
+    index_of: dict[int, int] = {}
+    lowlink: dict[int, int] = {}
+    on_stack: set[int] = set()
+    stack: list[int] = []
+    components: list[list[int]] = []
+
+    for root in graph:
+        if root in index_of:
+            continue
+        work: list[tuple[int, int]] = [(root, 0)]
+        while work:
+            node, edge_index = work.pop()
+            if edge_index == 0:
+                index_of[node] = lowlink[node] = len(index_of)
+                stack.append(node)
+                on_stack.add(node)
+            edges = graph[node]
+            while edge_index < len(edges):
+                child = edges[edge_index]
+                edge_index += 1
+                if child not in index_of:
+                    work.append((node, edge_index))
+                    work.append((child, 0))
+                    break
+                if child in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[child])
+            else:
+                if lowlink[node] == index_of[node]:
+                    component: list[int] = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+    return components
+
+
+def resolve_compact_lineage(lineage: CompactLineage) -> CompactLineage:
+    """Replace each edge's sources with the leaf columns they ultimately derive from.
+
+    Targets are grouped into strongly connected components and resolved in
+    topological order, so every intermediate's leaf set is computed once and
+    reused. Only columns inside a cycle fall back to a path-aware walk, which
+    stops at a column already on the current path.
+    """
+    sort_key = lineage.columns.sort_key
+    edge_by_target = {edge.target: edge for edge in lineage.edges}
+    graph = {
+        target: [source for source in edge.sources if source in edge_by_target]
+        for target, edge in edge_by_target.items()
+    }
+    resolved: dict[int, _Leaves] = {}
+
+    def leaves_of(source: int) -> _Leaves:
+        if source not in edge_by_target:
+            return (source,)
+        return resolved[source]
+
+    for component in _strongly_connected_components(graph):
+        if len(component) == 1 and component[0] not in graph[component[0]]:
+            target = component[0]
+            resolved[target] = _merge_leaves(
+                (leaves_of(source) for source in edge_by_target[target].sources), sort_key
             )
-        )
+            continue
+
+        members = set(component)
+
+        def resolve_in_cycle(column: int, seen: frozenset[int]) -> _Leaves:
+            if column in seen:
+                return (column,)
+            if column not in members:
+                return leaves_of(column)
+            current = edge_by_target[column]
+            if not current.sources:
+                return ()
+            next_seen = seen | {column}
+            return _merge_leaves(
+                (
+                    [
+                        source if leaf == column else leaf
+                        for leaf in resolve_in_cycle(source, next_seen)
+                    ]
+                    for source in current.sources
+                ),
+                sort_key,
+            )
+
+        for target in component:
+            resolved[target] = resolve_in_cycle(target, frozenset())
 
-    resolved_lineage: list[ColumnLineage] = []
-    for item in lineage:
-        resolved_lineage.append(
-            item.model_copy(update={"from_columns": resolve_sources(item.to_column, set())})
+    resolved_lineage = CompactLineage(columns=lineage.columns)
+    for edge in sorted(lineage.edges, key=lambda item: sort_key(item.target)):
+        resolved_lineage.add_edge(
+            edge.target, resolved[edge.target], edge.function, edge.confidence
         )
+    return resolved_lineage
 
-    return sorted(
-        resolved_lineage,
-        key=lambda item: (item.to_column.dataset.fqn, item.to_column.column),
-    )
+
+def resolve_transitive_lineage(lineage: list[ColumnLineage]) -> list[ColumnLineage]:
+    return resolve_compact_lineage(CompactLineage.from_lineage(lineage)).to_lineage()
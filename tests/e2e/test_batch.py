@@ -0,0 +1,56 @@
+import pytest
+
+from polars_lineage.config import MappingConfig
+from polars_lineage.pipeline import (
+    BatchItemResult,
+    extract_lineage_batch,
+    extract_lineage_payloads_from_plan,
+)
+
+MAPPING = MappingConfig(
+    sources={"orders": "svc.db.raw.orders"},
+    destination_table="svc.db.curated.metrics",
+)
+
+
+def _plan(index: int) -> str:
+    return "\n".join(
+        [
+            "0 │ │ SELECT │",
+            f'1 │ │ expression: [(col("a")) + (dyn int: {index})].alias("x{index}") '
+            'FROM: DF ["a", "b"] PROJECT */2 COLUMNS',
+        ]
+    )
+
+
+def test_batch_captures_item_errors_without_stopping() -> None:
+    items = [(_plan(0), MAPPING), ("not a plan", MAPPING), (_plan(2), MAPPING)]
+
+    results = list(extract_lineage_batch(items, workers=1, chunksize=2))
+
+    assert results == [
+        BatchItemResult(index=0, output=extract_lineage_payloads_from_plan(_plan(0), MAPPING)),
+        BatchItemResult(index=1, error="ValueError: no lineage entries were extracted"),
+        BatchItemResult(index=2, output=extract_lineage_payloads_from_plan(_plan(2), MAPPING)),
+    ]
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_batch_runs_on_a_process_pool(ordered: bool) -> None:
+    items = [(_plan(index), MAPPING) for index in range(12)]
+
+    results = list(extract_lineage_batch(items, workers=2, output_format="json", ordered=ordered))
+
+    indexes = [result.index for result in results]
+    assert (indexes if ordered else sorted(indexes)) == list(range(12))
+    assert [result.error for result in results] == [None] * 12
+    by_index = {result.index: result.output for result in results}
+    assert (
+        by_index[7]
+        == extract_lineage_batch([items[7]], workers=1, output_format="json").__next__().output
+    )
+
+
+def test_batch_rejects_invalid_worker_count() -> None:
+    with pytest.raises(ValueError, match="workers"):
+        extract_lineage_batch([], workers=0)
@@ -0,0 +1,114 @@
+import polars as pl
+import pytest
+
+from polars_lineage.cache import (
+    LineageCache,
+    clear_lineage_cache,
+    configure_lineage_cache,
+    lineage_cache_stats,
+    plan_fingerprint,
+)
+from polars_lineage.config import MappingConfig
+from polars_lineage.ir import ColumnLineage, ColumnRef, DatasetRef
+from polars_lineage.pipeline import extract_lineage_ir_from_lazyframe, extract_lineage_ir_from_plan
+
+PLAN = """
+0 │ │ SELECT │
+1 │ │ expression: col("a").alias("x") FROM: DF ["a", "b"]
+"""
+
+
+def _mapping(destination_table: str = "svc.db.curated.metrics") -> MappingConfig:
+    return MappingConfig(
+        sources={"orders": "svc.db.raw.orders"},
+        destination_table=destination_table,
+    )
+
+
+def _lineage(column: str) -> list[ColumnLineage]:
+    dataset = DatasetRef(service="svc", database="db", schema="curated", table="metrics")
+    return [
+        ColumnLineage(
+            from_columns=(),
+            to_column=ColumnRef(dataset=dataset, column=column),
+            function="dyn int: 1",
+            confidence="exact",
+        )
+    ]
+
+
+@pytest.fixture(autouse=True)
+def _reset_default_cache():
+    clear_lineage_cache()
+    yield
+    configure_lineage_cache(256)
+    clear_lineage_cache()
+
+
+def test_plan_fingerprint_depends_on_plan_and_mapping() -> None:
+    base = plan_fingerprint(PLAN, _mapping())
+
+    assert base == plan_fingerprint(PLAN, _mapping())
+    assert base != plan_fingerprint(PLAN + " ", _mapping())
+    assert base != plan_fingerprint(PLAN, _mapping("svc.db.curated.other"))
+    assert base != plan_fingerprint(PLAN, _mapping(), "serialized")
+
+
+def test_lineage_cache_evicts_least_recently_used_entry() -> None:
+    cache = LineageCache(maxsize=2)
+    cache.put("a", _lineage("a"))
+    cache.put("b", _lineage("b"))
+    assert cache.get("a") is not None
+
+    cache.put("c", _lineage("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (3, 1, 1, 2)
+
+
+def test_lineage_cache_with_zero_size_stores_nothing() -> None:
+    cache = LineageCache(maxsize=0)
+    cache.put("a", _lineage("a"))
+
+    assert cache.get("a") is None
+    assert cache.stats().size == 0
+
+
+def test_lineage_cache_rejects_negative_size() -> None:
+    with pytest.raises(ValueError, match="maxsize"):
+        LineageCache(maxsize=-1)
+
+
+def test_extract_lineage_ir_from_plan_reuses_cached_result() -> None:
+    first = extract_lineage_ir_from_plan(PLAN, _mapping())
+    second = extract_lineage_ir_from_plan(PLAN, _mapping())
+
+    assert second == first
+    stats = lineage_cache_stats()
+    assert (stats.hits, stats.misses) == (1, 1)
+
+
+def test_configure_lineage_cache_shrinks_default_cache() -> None:
+    extract_lineage_ir_from_plan(PLAN, _mapping())
+    extract_lineage_ir_from_plan(PLAN, _mapping("svc.db.curated.other"))
+
+    configure_lineage_cache(1)
+
+    stats = lineage_cache_stats()
+    assert (stats.size, stats.maxsize, stats.evictions) == (1, 1, 1)
+
+
+@pytest.mark.parametrize("backend", ["tree", "serialized"])
+def test_extract_lineage_ir_from_lazyframe_reuses_cached_result(backend) -> None:
+    def build() -> pl.LazyFrame:
+        return pl.LazyFrame({"a": [1], "b": [2]}).select(pl.col("a").alias("x"), pl.col("b"))
+
+    first = extract_lineage_ir_from_lazyframe(build(), _mapping(), backend=backend)
+    second = extract_lineage_ir_from_lazyframe(build(), _mapping(), backend=backend)
+
+    assert second == first
+    stats = lineage_cache_stats()
+    assert (stats.hits, stats.misses) == (1, 1)
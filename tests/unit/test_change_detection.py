@@ -0,0 +1,75 @@
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from polars_lineage.change_detection import PublishedLineageState, content_hash
+from polars_lineage.exporter.models import LineageColumn, LineageDocument, LineageEdge
+
+
+def _payload(source: str, destination: str = "svc.db.curated.orders") -> dict[str, Any]:
+    return {
+        "edge": {
+            "fromEntity": {"type": "table", "fullyQualifiedName": source},
+            "toEntity": {"type": "table", "fullyQualifiedName": destination},
+            "lineageDetails": {"source": "PipelineLineage", "columnsLineage": []},
+        }
+    }
+
+
+def _document(function: str) -> LineageDocument:
+    column = LineageColumn(
+        to_column="amount", from_columns=["amount"], function=function, confidence="exact"
+    )
+    edge = LineageEdge(
+        source_table="svc.db.raw.orders",
+        destination_table="svc.db.curated.orders",
+        columns=[column],
+    )
+    return LineageDocument(destination_table="svc.db.curated.orders", edges=[edge])
+
+
+def test_content_hash_is_independent_of_key_order() -> None:
+    assert content_hash({"a": 1, "b": [1, 2]}) == content_hash({"b": [1, 2], "a": 1})
+    assert content_hash({"a": 1}) != content_hash({"a": 2})
+
+
+def test_document_and_edge_hashes_follow_content() -> None:
+    document = _document('col("amount")')
+
+    assert document.content_hash == _document('col("amount")').content_hash
+    assert document.content_hash != _document('col("amount") * 2').content_hash
+    assert document.edges[0].content_hash == content_hash(document.edges[0].model_dump())
+    assert "content_hash" not in document.model_dump()
+
+
+def test_state_diff_scopes_removals_to_diffed_destinations(tmp_path: Path) -> None:
+    state_path = tmp_path / "state.json"
+    state = PublishedLineageState(state_path)
+    for payload in (_payload("s.d.raw.a"), _payload("s.d.raw.b"), _payload("s.d.raw.c", "s.d.x.y")):
+        changes = state.diff([payload])
+        key = next(iter(changes.hashes))
+        state.mark_published(key, changes.hashes[key])
+    state.save()
+
+    reloaded = PublishedLineageState(state_path)
+    changes = reloaded.diff([_payload("s.d.raw.a"), _payload("s.d.raw.new")])
+
+    assert [payload["edge"]["fromEntity"]["fullyQualifiedName"] for payload in changes.added] == [
+        "s.d.raw.new"
+    ]
+    assert changes.changed == () and changes.unchanged == 1
+    assert changes.removed == (("s.d.raw.b", "svc.db.curated.orders"),)
+    assert reloaded.diff([], destination_tables=["s.d.x.y"]).removed == (("s.d.raw.c", "s.d.x.y"),)
+    assert json.loads(state_path.read_text())["version"] == 1
+
+
+def test_state_rejects_duplicate_edges_and_unknown_versions(tmp_path: Path) -> None:
+    state = PublishedLineageState(tmp_path / "state.json")
+    with pytest.raises(ValueError, match="duplicate lineage edge"):
+        state.diff([_payload("s.d.raw.a"), _payload("s.d.raw.a")])
+
+    (tmp_path / "old.json").write_text('{"version": 0, "destinations": {}}')
+    with pytest.raises(ValueError, match="unsupported lineage state version"):
+        PublishedLineageState(tmp_path / "old.json")
@@ -0,0 +1,61 @@
+import pytest
+
+from polars_lineage.compact import CompactLineage
+from polars_lineage.ir import ColumnLineage, ColumnRef, DatasetRef
+
+ORDERS = DatasetRef(service="svc", database="db", schema="raw", table="orders")
+METRICS = DatasetRef(service="svc", database="db", schema="curated", table="metrics")
+
+
+def test_compact_lineage_round_trips_and_interns_columns() -> None:
+    a = ColumnRef(dataset=ORDERS, column="a")
+    b = ColumnRef(dataset=ORDERS, column="b")
+    lineage = [
+        ColumnLineage(
+            from_columns=(a, b),
+            to_column=ColumnRef(dataset=METRICS, column="x"),
+            function="add",
+            confidence="exact",
+        ),
+        ColumnLineage(
+            from_columns=(b,),
+            to_column=ColumnRef(dataset=METRICS, column="y"),
+            function="identity",
+            confidence="inferred",
+        ),
+    ]
+
+    compact = CompactLineage.from_lineage(lineage)
+
+    assert compact.columns.datasets == [METRICS, ORDERS]
+    assert compact.edges[0].sources[1] == compact.edges[1].sources[0]
+    assert compact.to_lineage() == lineage
+
+
+def test_compact_lineage_sorts_sources_by_dataset_and_column() -> None:
+    compact = CompactLineage()
+    columns = compact.columns
+    metrics_id = columns.dataset_id(METRICS)
+    orders_id = columns.dataset_id(ORDERS)
+    compact.add_edge(
+        columns.column_id(metrics_id, "x"),
+        (columns.column_id(orders_id, "b"), columns.column_id(metrics_id, "z")),
+        "f",
+        "exact",
+    )
+
+    (edge,) = compact.to_lineage()
+
+    assert [(ref.dataset.table, ref.column) for ref in edge.from_columns] == [
+        ("metrics", "z"),
+        ("orders", "b"),
+    ]
+
+
+def test_compact_lineage_rejects_blank_function_text() -> None:
+    compact = CompactLineage()
+    target = compact.columns.column_id(compact.columns.dataset_id(METRICS), "x")
+    compact.add_edge(target, (), "  ", "exact")
+
+    with pytest.raises(ValueError, match="function text"):
+        compact.to_lineage()
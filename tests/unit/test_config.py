@@ -1,3 +1,4 @@
+import pickle
 from pathlib import Path
 
 import pytest
@@ -15,6 +16,18 @@ def test_mapping_config_accepts_valid_fqns() -> None:
     assert config.sources["orders_csv"] == "svc.db.raw.orders"
 
 
+def test_mapping_config_sources_are_read_only_and_picklable() -> None:
+    config = MappingConfig(
+        sources={"orders_csv": "svc.db.raw.orders"},
+        destination_table="svc.db.curated.order_metrics",
+    )
+
+    with pytest.raises(TypeError, match="read-only"):
+        config.sources["orders_csv"] = "svc.db.raw.other"
+    assert pickle.loads(pickle.dumps(config)) == config
+    assert config.model_dump()["sources"] == {"orders_csv": "svc.db.raw.orders"}
+
+
 def test_mapping_config_rejects_invalid_source_fqn() -> None:
     with pytest.raises(ValidationError):
         MappingConfig(
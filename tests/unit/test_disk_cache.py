@@ -0,0 +1,127 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from polars_lineage import pipeline
+from polars_lineage.cache import clear_lineage_cache, configure_disk_cache
+from polars_lineage.config import MappingConfig
+from polars_lineage.disk_cache import SQLiteLineageCache
+from polars_lineage.ir import ColumnLineage, ColumnRef, DatasetRef
+from polars_lineage.pipeline import extract_lineage_ir_from_plan
+
+PLAN = """
+0 │ │ SELECT │
+1 │ │ expression: col("a").alias("x") FROM: DF ["a", "b"]
+"""
+MAPPING = MappingConfig(
+    sources={"orders": "svc.db.raw.orders"},
+    destination_table="svc.db.curated.metrics",
+)
+
+
+def _lineage(column: str) -> list[ColumnLineage]:
+    source = DatasetRef(service="svc", database="db", schema="raw", table="orders")
+    destination = DatasetRef(service="svc", database="db", schema="curated", table="metrics")
+    return [
+        ColumnLineage(
+            from_columns=(ColumnRef(dataset=source, column="a"),),
+            to_column=ColumnRef(dataset=destination, column=column),
+            function='col("a")',
+            confidence="exact",
+        )
+    ]
+
+
+@pytest.fixture(autouse=True)
+def _reset_caches():
+    clear_lineage_cache()
+    yield
+    configure_disk_cache(None)
+    clear_lineage_cache()
+
+
+def test_disk_cache_round_trips_lineage_across_instances(tmp_path) -> None:
+    path = tmp_path / "lineage.sqlite"
+    SQLiteLineageCache(path).put("plan", "mapping", _lineage("x"))
+
+    reader = SQLiteLineageCache(path)
+
+    assert reader.get("plan", "mapping") == _lineage("x")
+    assert reader.get("plan", "other") is None
+    stats = reader.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+
+
+def test_disk_cache_entries_are_scoped_to_package_version(tmp_path) -> None:
+    path = tmp_path / "lineage.sqlite"
+    SQLiteLineageCache(path, version="1.0.0").put("plan", "mapping", _lineage("x"))
+
+    assert SQLiteLineageCache(path, version="1.0.1").get("plan", "mapping") is None
+    assert SQLiteLineageCache(path, version="1.0.0").get("plan", "mapping") is not None
+
+
+def test_disk_cache_evicts_least_recently_read_entries(tmp_path) -> None:
+    probe = SQLiteLineageCache(tmp_path / "probe.sqlite")
+    probe.put("a", "m", _lineage("a"))
+    entry_size = probe.stats().size_bytes
+
+    cache = SQLiteLineageCache(tmp_path / "lineage.sqlite", max_bytes=entry_size * 5 // 2)
+    cache.put("a", "m", _lineage("a"))
+    cache.put("b", "m", _lineage("b"))
+    assert cache.get("a", "m") is not None
+
+    cache.put("c", "m", _lineage("c"))
+
+    assert cache.get("b", "m") is None
+    assert cache.get("a", "m") is not None
+    assert cache.get("c", "m") is not None
+    stats = cache.stats()
+    assert (stats.evictions, stats.entries) == (1, 2)
+
+
+def test_disk_cache_treats_corrupt_payload_as_miss(tmp_path) -> None:
+    path = tmp_path / "lineage.sqlite"
+    cache = SQLiteLineageCache(path)
+    cache.put("plan", "mapping", _lineage("x"))
+    with sqlite3.connect(path) as connection:
+        connection.execute("UPDATE lineage_cache SET payload = x'00'")
+
+    assert cache.get("plan", "mapping") is None
+    assert cache.stats().errors == 1
+
+
+def test_disk_cache_rejects_non_positive_size(tmp_path) -> None:
+    with pytest.raises(ValueError, match="max_bytes"):
+        SQLiteLineageCache(tmp_path / "lineage.sqlite", max_bytes=0)
+
+
+def test_disk_cache_supports_concurrent_writers(tmp_path) -> None:
+    path = tmp_path / "lineage.sqlite"
+    SQLiteLineageCache(path)
+
+    def write(index: int) -> int:
+        cache = SQLiteLineageCache(path)
+        for offset in range(10):
+            cache.put(f"plan-{index}-{offset}", "mapping", _lineage(f"c{offset}"))
+        return cache.stats().errors
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        errors = sum(executor.map(write, range(8)))
+
+    assert errors == 0
+    assert SQLiteLineageCache(path).stats().entries == 80
+
+
+def test_cold_process_skips_extraction_on_disk_hit(tmp_path, monkeypatch) -> None:
+    configure_disk_cache(tmp_path / "lineage.sqlite")
+    first = extract_lineage_ir_from_plan(PLAN, MAPPING)
+    clear_lineage_cache()
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("extraction should be served from the disk cache")
+
+    monkeypatch.setattr(pipeline, "extract_compact_plan_lineage", fail)
+    monkeypatch.setattr(pipeline, "resolve_compact_lineage", fail)
+
+    assert extract_lineage_ir_from_plan(PLAN, MAPPING) == first
@@ -1,9 +1,10 @@
 import pytest
 
 from polars_lineage.config import MappingConfig
+from polars_lineage.exporter import registry
 from polars_lineage.exporter.models import LineageDocument
 from polars_lineage.exporter.openmetadata import export_openmetadata_requests
-from polars_lineage.exporter.registry import export_lineage
+from polars_lineage.exporter.registry import export_lineage, export_lineage_many
 from polars_lineage.ir import ColumnLineage, ColumnRef, DatasetRef
 
 
@@ -68,3 +69,28 @@ def test_exporter_registry_rejects_unknown_format(
 
     with pytest.raises(ValueError, match="unsupported output format"):
         export_lineage(lineage, mapping, output_format="openlineage")  # type: ignore[arg-type]
+
+
+def test_export_lineage_many_matches_single_format_exports(
+    sample_lineage_and_mapping: tuple[list[ColumnLineage], MappingConfig],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    lineage, mapping = sample_lineage_and_mapping
+    expected = {
+        output_format: export_lineage(lineage, mapping, output_format=output_format)
+        for output_format in ("openmetadata", "json", "markdown")
+    }
+    calls: list[int] = []
+    original_group_lineage = registry.group_lineage
+
+    def counting_group_lineage(items: list[ColumnLineage]):
+        calls.append(len(items))
+        return original_group_lineage(items)
+
+    monkeypatch.setattr(registry, "group_lineage", counting_group_lineage)
+
+    rendered = export_lineage_many(lineage, mapping, ["markdown", "json", "openmetadata", "json"])
+
+    assert list(rendered) == ["markdown", "json", "openmetadata"]
+    assert rendered == expected
+    assert calls == [1]
@@ -1,4 +1,17 @@
-from polars_lineage.extractor.expr_parser import parse_expression
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from polars_lineage._stats import CacheStats
+from polars_lineage.extractor.expr_parser import (
+    CallNode,
+    ColumnNode,
+    ExpressionCache,
+    LiteralNode,
+    NameNode,
+    parse_expression,
+    parse_expression_tree,
+)
 
 
 def test_parse_expression_handles_direct_column() -> None:
@@ -43,3 +56,86 @@ def test_parse_expression_handles_when_then_otherwise() -> None:
 
     assert parsed.columns == ("a", "b", "c")
     assert parsed.confidence == "exact"
+
+
+def test_parse_expression_tree_builds_method_chain() -> None:
+    tree = parse_expression_tree('col("a").cast(Int64).fill_null(dyn int: -1)')
+
+    assert tree == CallNode(
+        name="fill_null",
+        receiver=CallNode(name="cast", receiver=ColumnNode("a"), args=(NameNode("Int64"),)),
+        args=(LiteralNode("dyn int: -1"),),
+    )
+
+
+def test_parse_expression_tree_skips_named_arguments() -> None:
+    tree = parse_expression_tree('col("a").round(decimals=2)')
+
+    assert tree == CallNode(name="round", receiver=ColumnNode("a"), args=(LiteralNode("2"),))
+
+
+def test_parse_expression_tree_rejects_unbalanced_text() -> None:
+    with pytest.raises(ValueError, match="expected"):
+        parse_expression_tree('(col("a") + col("b")')
+
+
+def test_parse_expression_ignores_trailing_plan_text() -> None:
+    parsed = parse_expression('col("b") PROJECT */2 COLUMNS')
+
+    assert parsed.columns == ("b",)
+    assert parsed.confidence == "exact"
+
+
+@pytest.mark.parametrize(
+    "text",
+    ['col("d") WITH_COLUMNS DF ["a"]', 'col("d") FILTER predicate: [(col("b")) > (1)]'],
+)
+def test_parse_expression_ignores_trailing_plan_keywords(text: str) -> None:
+    assert parse_expression(text).confidence == "exact"
+
+
+def test_parse_expression_downgrades_partially_parsed_text() -> None:
+    parsed = parse_expression('col("a") col("b")')
+
+    assert parsed.columns == ("a", "b")
+    assert parsed.confidence == "inferred"
+
+
+def test_parse_expression_treats_bare_names_as_unknown() -> None:
+    parsed = parse_expression("Int64")
+
+    assert parsed.columns == ()
+    assert parsed.confidence == "unknown"
+
+
+def test_parse_expression_scopes_unknown_calls_to_their_node() -> None:
+    parsed = parse_expression('[(col("a").str.to_uppercase()) + (col("b"))]')
+
+    assert parsed.columns == ("a", "b")
+    assert parsed.confidence == "inferred"
+
+
+def test_parse_expression_interns_results_by_normalized_text() -> None:
+    cache = ExpressionCache(maxsize=2)
+
+    first = cache.get('col("a").sum()')
+    second = cache.get('col("a").sum()')
+    cache.get('col("b")')
+    cache.get('col("c")')
+
+    assert first is second
+    assert cache.stats() == CacheStats(hits=1, misses=3, evictions=1, size=2, maxsize=2)
+    assert parse_expression('col("a")  +\n col("b")') is parse_expression('col("a") + col("b")')
+
+
+def test_expression_cache_is_shared_safely_across_threads() -> None:
+    cache = ExpressionCache(maxsize=8)
+    texts = [f'col("c{index % 16}").fill_null(dyn int: 0)' for index in range(2000)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(cache.get, texts))
+
+    stats = cache.stats()
+    assert stats.hits + stats.misses == len(texts)
+    assert stats.size == 8
+    assert all(result.columns == (text[5:].split('"')[0],) for result, text in zip(results, texts))
@@ -0,0 +1,112 @@
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from polars_lineage.cache import clear_lineage_cache
+from polars_lineage.config import MappingConfig
+from polars_lineage.instrumentation import (
+    InMemoryCollector,
+    get_instrumentation_hook,
+    instrumentation,
+)
+from polars_lineage.pipeline import (
+    extract_lineage_ir_from_lazyframe,
+    extract_lineage_output_from_plan,
+)
+
+PLAN = """
+0 │ │ SELECT │
+1 │ │ expression: [(col("a")) + (col("b"))].alias("x") FROM: DF ["a", "b"]
+"""
+MAPPING = MappingConfig(
+    sources={"orders": "svc.db.raw.orders"},
+    destination_table="svc.db.curated.metrics",
+)
+
+
+def test_collector_records_stages_and_counters() -> None:
+    clear_lineage_cache()
+    collector = InMemoryCollector()
+
+    with instrumentation(collector):
+        extract_lineage_output_from_plan(PLAN, MAPPING, "json")
+        extract_lineage_output_from_plan(PLAN, MAPPING, "json")
+
+    assert get_instrumentation_hook() is None
+    stages = collector.stages()
+    assert set(stages) == {
+        "column_texts",
+        "export",
+        "parse_datasets",
+        "parse_expression",
+        "resolve",
+        "validate",
+    }
+    assert stages["export"].count == 2
+    assert stages["resolve"].count == 1
+    assert collector.counters() == {
+        "cache_hits": 1,
+        "cache_misses": 1,
+        "edges": 1,
+        "expressions": 1,
+        "plan_bytes": 2 * len(PLAN.encode("utf-8")),
+        "plan_lines": 2 * (PLAN.count("\n") + 1),
+    }
+
+
+def test_collector_times_plan_rendering_for_lazyframes(tmp_path: Path) -> None:
+    clear_lineage_cache()
+    collector = InMemoryCollector()
+    pl.DataFrame({"a": [1], "b": [2]}).write_parquet(tmp_path / "orders.parquet")
+    lazyframe = pl.scan_parquet(tmp_path / "orders.parquet").select((pl.col("a") * 2).alias("x"))
+
+    with instrumentation(collector):
+        extract_lineage_ir_from_lazyframe(lazyframe, MAPPING, backend="serialized")
+
+    assert "serialize" in collector.stages()
+    assert collector.counters()["plan_bytes"] > 0
+
+
+@pytest.mark.parametrize("backend", ["tree", "serialized"])
+def test_collector_times_scoped_plan_resolution_separately(backend: str) -> None:
+    clear_lineage_cache()
+    collector = InMemoryCollector()
+    mapping = MappingConfig(
+        sources={"left": "svc.db.raw.orders", "right": "svc.db.raw.accounts"},
+        destination_table="svc.db.curated.metrics",
+    )
+    lazyframe = (
+        pl.LazyFrame({"id": [1], "a": [2]})
+        .join(pl.LazyFrame({"id": [1], "b": [3]}), on="id")
+        .select((pl.col("a") + pl.col("b")).alias("x"))
+    )
+
+    with instrumentation(collector):
+        extract_lineage_ir_from_lazyframe(lazyframe, mapping, backend=backend)
+
+    stages = collector.stages()
+    assert stages["plan_graph"].count == stages["resolve_plan"].count == 1
+    assert "parse_expression" not in stages
+
+
+def test_collector_renders_prometheus_text() -> None:
+    collector = InMemoryCollector()
+    collector.observe_stage("resolve", 0.5)
+    collector.observe_stage("resolve", 0.25)
+    collector.increment("edges", 3)
+
+    assert collector.to_prometheus() == (
+        "# HELP polars_lineage_stage_seconds Wall time spent in each extraction stage.\n"
+        "# TYPE polars_lineage_stage_seconds summary\n"
+        'polars_lineage_stage_seconds_sum{stage="resolve"} 0.75\n'
+        'polars_lineage_stage_seconds_count{stage="resolve"} 2\n'
+        "# HELP polars_lineage_stage_seconds_max Slowest single run of each extraction stage.\n"
+        "# TYPE polars_lineage_stage_seconds_max gauge\n"
+        'polars_lineage_stage_seconds_max{stage="resolve"} 0.5\n'
+        "# HELP polars_lineage_edges_total Resolved lineage edges returned.\n"
+        "# TYPE polars_lineage_edges_total counter\n"
+        "polars_lineage_edges_total 3\n"
+    )
+    collector.reset()
+    assert collector.to_prometheus() == ""
@@ -4,7 +4,10 @@ import pytest
 import polars_lineage
 from polars_lineage.config import MappingConfig
 from polars_lineage.exporter.models import LineageDocument
+from polars_lineage.instrumentation import InMemoryCollector, instrumentation
 from polars_lineage.lineage_namespace import _merge_mapping_for_method
+from polars_lineage.metadata_store import get_mapping
+from polars_lineage.pipeline import extract_lineage_ir_from_lazyframe
 
 _ = polars_lineage.__version__
 
@@ -111,7 +114,7 @@ def test_join_requires_metadata_on_both_sides() -> None:
         _ = left.join(right, on="id", how="inner")
 
 
-def test_join_rejects_multi_join_mapping() -> None:
+def _three_sources() -> tuple[pl.LazyFrame, pl.LazyFrame, pl.LazyFrame]:
     left = _lineage(pl.DataFrame({"id": [1], "a": [10]}).lazy()).add_source(
         name="left",
         uri="postgres://warehouse/svc.db.raw.left",
@@ -120,33 +123,63 @@ def test_join_rejects_multi_join_mapping() -> None:
         name="middle",
         uri="postgres://warehouse/svc.db.raw.middle",
     )
-    right = _lineage(pl.DataFrame({"id": [1], "c": [30]}).lazy()).add_source(
+    right = _lineage(pl.DataFrame({"id": [1], "a": [30]}).lazy()).add_source(
         name="right",
         uri="postgres://warehouse/svc.db.raw.right",
     )
+    return left, middle, right
 
-    with pytest.raises(ValueError):
-        _ = left.join(middle, on="id", how="inner").join(right, on="id", how="inner")
 
+def test_chained_joins_name_sources_by_join_path() -> None:
+    left, middle, right = _three_sources()
 
-def test_join_rejects_prejoined_right_operand() -> None:
-    left = _lineage(pl.DataFrame({"id": [1], "a": [10]}).lazy()).add_source(
-        name="left",
-        uri="postgres://warehouse/svc.db.raw.left",
-    )
-    middle = _lineage(pl.DataFrame({"id": [1], "b": [20]}).lazy()).add_source(
-        name="middle",
-        uri="postgres://warehouse/svc.db.raw.middle",
-    )
-    right = _lineage(pl.DataFrame({"id": [1], "c": [30]}).lazy()).add_source(
-        name="right",
-        uri="postgres://warehouse/svc.db.raw.right",
+    joined = (
+        left.join(middle, on="id", how="inner")
+        .join(right, on="id", how="left")
+        .select((pl.col("a") + pl.col("b") + pl.col("a_right")).alias("total"))
     )
 
+    assert get_mapping(joined).sources == {
+        "left.left": "svc.db.raw.left",
+        "left.right": "svc.db.raw.middle",
+        "right": "svc.db.raw.right",
+    }
+    payloads = _lineage(joined).extract()
+    assert set(_columns_lineage(payloads)) == {"total"}
+    assert sorted(item["edge"]["fromEntity"]["fullyQualifiedName"] for item in payloads) == [
+        "svc.db.raw.left",
+        "svc.db.raw.middle",
+        "svc.db.raw.right",
+    ]
+
+
+def test_join_accepts_prejoined_right_operand() -> None:
+    left, middle, right = _three_sources()
+
     prejoined = middle.join(right, on="id", how="inner")
+    joined = left.join(prejoined, on="id", how="inner").select(
+        pl.col("a_right").alias("from_right"), pl.col("b")
+    )
 
-    with pytest.raises(ValueError):
-        _ = left.join(prejoined, on="id", how="inner")
+    assert set(get_mapping(joined).sources) == {"left", "right.left", "right.right"}
+    by_source = {
+        item["edge"]["fromEntity"]["fullyQualifiedName"]: [
+            column["toColumn"] for column in item["edge"]["lineageDetails"]["columnsLineage"]
+        ]
+        for item in _lineage(joined).extract()
+    }
+    assert by_source == {"svc.db.raw.middle": ["b"], "svc.db.raw.right": ["from_right"]}
+
+
+def test_join_rejects_operand_merged_from_several_sources() -> None:
+    _, _, right = _three_sources()
+    base = MappingConfig(
+        sources={"orders": "svc.db.raw.orders", "accounts": "svc.db.raw.accounts"},
+        destination_table="svc.db.curated.metrics",
+    )
+
+    with pytest.raises(ValueError, match="single source or an earlier join"):
+        _merge_mapping_for_method("join", base, [get_mapping(right)])
 
 
 def test_non_join_merge_rejects_conflicting_source_aliases() -> None:
@@ -161,3 +194,290 @@ def test_non_join_merge_rejects_conflicting_source_aliases() -> None:
 
     with pytest.raises(ValueError, match="conflicting source alias mapping"):
         _merge_mapping_for_method("with_columns", base, [other])
+
+
+def test_merge_shares_unchanged_mappings_and_interns_new_ones() -> None:
+    base = MappingConfig(
+        sources={"orders": "svc.db.raw.orders"}, destination_table="svc.db.curated.metrics"
+    )
+    same = MappingConfig(sources={"orders": "svc.db.raw.orders"}, destination_table="a.b.c.d")
+    extra = MappingConfig(sources={"accounts": "svc.db.raw.accounts"}, destination_table="a.b.c.d")
+
+    assert _merge_mapping_for_method("filter", base, []) is base
+    assert _merge_mapping_for_method("with_columns", base, [same]) is base
+    merged = _merge_mapping_for_method("with_columns", base, [extra])
+    assert merged is not None and merged is not base
+    assert merged.sources == {"orders": "svc.db.raw.orders", "accounts": "svc.db.raw.accounts"}
+    assert merged.destination_table == "svc.db.curated.metrics"
+    assert _merge_mapping_for_method("with_columns", base, [extra]) is merged
+    assert _merge_mapping_for_method("join", base, [extra]) is _merge_mapping_for_method(
+        "join", base, [extra]
+    )
+    with pytest.raises(ValueError, match="frozen"):
+        setattr(base, "destination_table", "svc.db.curated.other")
+
+
+def test_chained_operations_propagate_one_mapping_instance() -> None:
+    source = _lineage(pl.DataFrame({"a": [1]}).lazy()).add_source(
+        name="orders", uri="postgres://warehouse/svc.db.raw.orders"
+    )
+    chained = source
+    for index in range(20):
+        chained = chained.filter(pl.col("a") > index).with_columns(pl.col("a").alias("b"))
+
+    assert get_mapping(chained) is get_mapping(source)
+
+
+def test_shared_mapping_sources_cannot_be_edited_in_place() -> None:
+    sources = {"orders": "svc.db.raw.orders"}
+    base = MappingConfig(sources=sources, destination_table="svc.db.curated.metrics")
+    extra = MappingConfig(sources={"accounts": "svc.db.raw.accounts"}, destination_table="a.b.c.d")
+    merged = _merge_mapping_for_method("with_columns", base, [extra])
+    assert merged is not None
+
+    for mapping in (base, merged):
+        with pytest.raises(TypeError, match="read-only"):
+            mapping.sources["orders"] = "svc.db.raw.other"
+        with pytest.raises(TypeError, match="read-only"):
+            mapping.sources.update({"late": "svc.db.raw.late"})
+    sources["orders"] = "svc.db.raw.other"
+    assert base.sources == {"orders": "svc.db.raw.orders"}
+    assert merged.sources == {"orders": "svc.db.raw.orders", "accounts": "svc.db.raw.accounts"}
+
+
+def _orders_source() -> pl.LazyFrame:
+    return _lineage(pl.DataFrame({"a": [1], "b": [2], "k": [1]}).lazy()).add_source(
+        name="orders",
+        uri="postgres://warehouse/svc.db.raw.orders",
+        destination_table="svc.db.curated.metrics",
+    )
+
+
+def _columns_lineage(payloads: list[dict]) -> dict[str, dict]:
+    return {
+        item["toColumn"]: item
+        for payload in payloads
+        for item in payload["edge"]["lineageDetails"]["columnsLineage"]
+    }
+
+
+def test_recorded_mode_extracts_without_rendering_the_plan(monkeypatch) -> None:
+    lazyframe = (
+        _orders_source()
+        .with_columns((pl.col("a") * 2).alias("d"))
+        .with_columns((pl.col("d") + pl.col("b")).alias("e"))
+        .filter(pl.col("a") > 0)
+    )
+    from_plan = _lineage(lazyframe).extract()
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("recorded mode must not render the plan")
+
+    monkeypatch.setattr(pl.LazyFrame, "explain", fail)
+    from_recording = _lineage(lazyframe).extract(mode="recorded")
+
+    assert from_recording == from_plan
+    assert _columns_lineage(from_recording)["e"]["fromColumns"] == ["a", "b"]
+
+
+def test_recorded_and_plan_modes_agree_on_selected_derived_columns() -> None:
+    lazyframe = (
+        _orders_source()
+        .with_columns((pl.col("a") + pl.col("b")).alias("e"), pl.col("a").alias("d"))
+        .select("e", "d")
+    )
+
+    from_recording = _lineage(lazyframe).extract(mode="recorded")
+
+    assert from_recording == _lineage(lazyframe).extract()
+    columns = _columns_lineage(from_recording)
+    assert columns["e"]["function"] == '[(col("a")) + (col("b"))]'
+    assert columns["d"]["function"] == 'col("a")'
+
+
+def test_recorded_mode_tracks_renames_and_aggregations() -> None:
+    lazyframe = (
+        _orders_source()
+        .with_columns((pl.col("a") + 1).alias("c"))
+        .rename({"c": "z"})
+        .group_by("k")
+        .agg(pl.col("z").sum().alias("total"))
+    )
+
+    columns = _columns_lineage(_lineage(lazyframe).extract(mode="recorded"))
+
+    assert set(columns) == {"k", "total"}
+    assert columns["total"]["fromColumns"] == ["a"]
+    assert columns["total"]["function"] == 'col("z").sum()'
+
+
+def test_recorded_mode_falls_back_to_plan_for_unmodeled_operations() -> None:
+    lazyframe = _orders_source().select(pl.all().sum())
+
+    assert _lineage(lazyframe).extract(mode="recorded") == _lineage(lazyframe).extract()
+
+
+def test_plan_and_schema_are_resolved_once_per_frame(monkeypatch) -> None:
+    calls = {"explain": 0, "collect_schema": 0}
+    original_explain = pl.LazyFrame.explain
+    original_collect_schema = pl.LazyFrame.collect_schema
+
+    def explain(self: pl.LazyFrame, *args, **kwargs):
+        calls["explain"] += 1
+        return original_explain(self, *args, **kwargs)
+
+    def collect_schema(self: pl.LazyFrame):
+        calls["collect_schema"] += 1
+        return original_collect_schema(self)
+
+    monkeypatch.setattr(pl.LazyFrame, "explain", explain)
+    monkeypatch.setattr(pl.LazyFrame, "collect_schema", collect_schema)
+    lazyframe = _lineage(pl.DataFrame({"a": [1], "b": [2]}).lazy()).add_source(
+        name="orders", uri="postgres://myserver/svc.db.raw.orders"
+    )
+    projected = lazyframe.with_columns((pl.col("a") * 2).alias("c"))
+
+    _lineage(projected).extract()
+    _lineage(projected).to_json()
+    _lineage(projected).to_markdown()
+    _lineage(projected).extract(mode="recorded")
+
+    # One schema for the source at ``add_source`` time, one for the projected frame.
+    assert calls == {"explain": 1, "collect_schema": 2}
+
+
+def test_wide_sources_resolve_columns_missing_from_the_abbreviated_plan() -> None:
+    wide = _lineage(pl.DataFrame({f"c{index}": [index] for index in range(50)}).lazy()).add_source(
+        name="wide", uri="postgres://warehouse/svc.db.raw.wide"
+    )
+    other = _lineage(pl.DataFrame({"c0": [0], "label": ["x"]}).lazy()).add_source(
+        name="other", uri="postgres://warehouse/svc.db.raw.other"
+    )
+    projected = wide.select((pl.col("c42") + pl.col("c7")).alias("total"))
+    joined = wide.join(other, on="c0").select(pl.col("c49"), pl.col("label"))
+
+    assert "..." in projected.explain(format="tree", optimized=False)
+    assert _columns_lineage(_lineage(projected).extract())["total"]["fromColumns"] == [
+        "c42",
+        "c7",
+    ]
+    assert {
+        payload["edge"]["fromEntity"]["fullyQualifiedName"]: [
+            item["toColumn"] for item in payload["edge"]["lineageDetails"]["columnsLineage"]
+        ]
+        for payload in _lineage(joined).extract()
+    } == {"svc.db.raw.other": ["label"], "svc.db.raw.wide": ["c49"]}
+
+
+def test_file_scans_register_their_own_sources(tmp_path) -> None:
+    for year, month in [(2024, 1), (2024, 2), (2025, 1)]:
+        partition = tmp_path / "sales" / f"year={year}" / f"month={month:02d}"
+        partition.mkdir(parents=True)
+        pl.DataFrame({"id": [1], "amount": [2.0]}).write_parquet(partition / "part-0.parquet")
+    pl.DataFrame({"id": [1], "name": ["x"]}).write_csv(tmp_path / "customers.csv")
+
+    sales = pl.scan_parquet(tmp_path / "sales" / "**" / "*.parquet", hive_partitioning=True)
+    joined = sales.join(pl.scan_csv(tmp_path / "customers.csv"), on="id").select(
+        pl.col("name"), (pl.col("amount") * pl.col("year")).alias("weighted")
+    )
+    tagged = _lineage(sales).add_source(name="sales", uri="s3://lake/svc.db.raw.sales")
+
+    assert {
+        payload["edge"]["fromEntity"]["fullyQualifiedName"]: [
+            (item["toColumn"], item["fromColumns"])
+            for item in payload["edge"]["lineageDetails"]["columnsLineage"]
+        ]
+        for payload in _lineage(joined).extract()
+    } == {
+        "file.external.public.customers_csv": [("name", ["name"])],
+        "file.external.public.sales": [("weighted", ["amount", "year"])],
+    }
+    assert get_mapping(joined).destination_table == "derived.lineage.public.left__right"
+    assert _columns_lineage(_lineage(tagged.select(pl.col("month"))).extract()) == {
+        "month": {"fromColumns": ["month"], "toColumn": "month", "function": 'col("month")'}
+    }
+
+
+def test_file_scans_extract_multi_output_expressions_with_the_requested_backend(
+    tmp_path,
+) -> None:
+    pl.DataFrame({"id": [1], "amount": [2.0], "qty": [3]}).write_parquet(tmp_path / "sales.parquet")
+    totals = pl.scan_parquet(tmp_path / "sales.parquet").select(
+        pl.all().sum(), pl.col("amount").name.suffix("_x")
+    )
+    expected = {"amount": ["amount"], "amount_x": ["amount"], "id": ["id"], "qty": ["qty"]}
+
+    collector = InMemoryCollector()
+    with instrumentation(collector):
+        from_tree = _columns_lineage(_lineage(totals).extract())
+    from_serialized = extract_lineage_ir_from_lazyframe(
+        totals, get_mapping(totals), backend="serialized"
+    )
+
+    assert {name: item["fromColumns"] for name, item in from_tree.items()} == expected
+    assert "explain" in collector.stages()
+    assert {
+        item.to_column.column: [ref.column for ref in item.from_columns] for item in from_serialized
+    } == expected
+
+
+def test_concat_groups_inputs_into_one_source_per_fqn() -> None:
+    days = [
+        _lineage(pl.LazyFrame({"id": [day], "amount": [1]})).add_source(
+            name="events", uri="postgres://warehouse/svc.db.raw.events"
+        )
+        for day in range(300)
+    ]
+    archive = _lineage(pl.LazyFrame({"id": [0], "amount": [1], "note": ["x"]})).add_source(
+        name="events", uri="postgres://warehouse/svc.db.raw.events_archive"
+    )
+
+    daily = pl.concat(days)
+    combined = pl.concat([*days, archive], how="diagonal").select(
+        pl.col("id"), (pl.col("amount") * 2).alias("doubled"), pl.col("note")
+    )
+
+    assert get_mapping(daily) is get_mapping(days[0])
+    assert get_mapping(combined).sources == {
+        "events": "svc.db.raw.events",
+        "events_1": "svc.db.raw.events_archive",
+    }
+    assert {
+        payload["edge"]["fromEntity"]["fullyQualifiedName"]: [
+            item["toColumn"] for item in payload["edge"]["lineageDetails"]["columnsLineage"]
+        ]
+        for payload in _lineage(combined).extract()
+    } == {
+        "svc.db.raw.events": ["doubled", "id"],
+        "svc.db.raw.events_archive": ["doubled", "id", "note"],
+    }
+
+
+def test_concat_requires_metadata_on_every_input() -> None:
+    tagged = _lineage(pl.LazyFrame({"a": [1]})).add_source(
+        name="orders", uri="postgres://warehouse/svc.db.raw.orders"
+    )
+
+    with pytest.raises(ValueError, match="every input"):
+        pl.concat([tagged, pl.LazyFrame({"a": [2]})])
+
+
+def test_extract_columns_parses_only_their_backward_slice() -> None:
+    source = _lineage(
+        pl.LazyFrame({"email": ["a@b"], **{f"c{index}": [index] for index in range(200)}})
+    ).add_source(name="users", uri="postgres://warehouse/svc.db.raw.users")
+    wide = source.with_columns(pl.col("email").str.to_lowercase().alias("normalized")).select(
+        (pl.col("normalized") + pl.lit("#")).alias("masked"),
+        *((pl.col(f"c{index}") * 2).alias(f"d{index}") for index in range(200)),
+    )
+    full = _columns_lineage(_lineage(wide).extract())
+
+    collector = InMemoryCollector()
+    with instrumentation(collector):
+        sliced = _columns_lineage(_lineage(wide).extract(columns=["masked", "d7"]))
+
+    assert sliced == {"masked": full["masked"], "d7": full["d7"]}
+    assert sliced["masked"]["fromColumns"] == ["email"]
+    assert collector.counters()["expressions"] == 3
+    with pytest.raises(ValueError, match=r"unknown destination columns: \['nope'\]"):
+        _lineage(wide).extract(columns=["nope"])
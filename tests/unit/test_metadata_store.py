@@ -0,0 +1,86 @@
+import gc
+import threading
+import weakref
+from pathlib import Path
+
+import polars as pl
+
+from polars_lineage import metadata_store
+from polars_lineage.config import MappingConfig
+from polars_lineage.pipeline import extract_lineage_ir_from_lazyframe
+
+
+def _mapping(name: str) -> MappingConfig:
+    return MappingConfig.model_validate(
+        {"sources": {name: f"svc.db.raw.{name}"}, "destination_table": "svc.db.curated.out"}
+    )
+
+
+def test_reused_id_never_sees_a_collected_frames_metadata() -> None:
+    mapping = _mapping("orders")
+    for _ in range(500):
+        stale = pl.LazyFrame({"a": [1]})
+        metadata_store.set_mapping(stale, mapping)
+        del stale
+        fresh = pl.LazyFrame({"a": [1]})
+        assert metadata_store.get_mapping(fresh) is None
+
+
+def test_late_callback_for_a_previous_frame_keeps_the_new_entry() -> None:
+    frame = pl.LazyFrame({"a": [1]})
+    metadata_store.set_mapping(frame, _mapping("orders"))
+    previous_owner = weakref.ref(pl.LazyFrame({"a": [1]}))
+
+    metadata_store._on_collected(id(frame), previous_owner)
+
+    assert metadata_store.get_mapping(frame) == _mapping("orders")
+
+
+def test_concurrent_writers_readers_and_collection() -> None:
+    errors: list[str] = []
+    start = threading.Barrier(8)
+
+    def worker(thread_index: int) -> None:
+        mapping = _mapping(f"t{thread_index}")
+        start.wait()
+        for iteration in range(200):
+            frame = pl.LazyFrame({"a": [iteration]})
+            metadata_store.set_mapping(frame, mapping)
+            if metadata_store.get_mapping(frame) is not mapping:
+                errors.append(f"thread {thread_index} read another mapping")
+            if iteration % 50 == 0:
+                gc.collect()
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    gc.collect()
+    metadata_store.set_mapping(pl.LazyFrame({"a": [0]}), _mapping("flush"))
+
+    assert errors == []
+    assert len(metadata_store._ENTRIES) < 10
+
+
+def test_source_schemas_are_stored_once_per_fqn() -> None:
+    first = metadata_store.set_source_schema("svc.db.raw.schema_test", ["a", "b"])
+
+    assert metadata_store.set_source_schema("svc.db.raw.schema_test", ("a", "b")) is first
+    assert metadata_store.get_source_schemas(["svc.db.raw.schema_test", "svc.db.raw.none"]) == {
+        "svc.db.raw.schema_test": first
+    }
+    changed = metadata_store.set_source_schema("svc.db.raw.schema_test", ["a", "c"])
+    assert changed.fingerprint != first.fingerprint
+
+
+def test_frames_keep_plan_digests_not_plan_text(tmp_path: Path) -> None:
+    pl.DataFrame({"a": list(range(1_000))}).write_parquet(tmp_path / "orders.parquet")
+    frame = pl.scan_parquet(tmp_path / "orders.parquet").select(pl.col("a") * 2)
+
+    extract_lineage_ir_from_lazyframe(frame, _mapping("orders"), backend="serialized")
+
+    digest = metadata_store.get_plan_digest(frame, "serialized")
+    entry = metadata_store._entry(frame)
+    assert digest is not None and len(digest) == 64
+    assert entry is not None and dict(entry.plan_digests) == {"serialized": digest}
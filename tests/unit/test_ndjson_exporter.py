@@ -0,0 +1,121 @@
+import io
+import json
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from polars_lineage.config import MappingConfig
+from polars_lineage.exporter import registry
+from polars_lineage.exporter.grouping import GroupedLineage, group_lineage
+from polars_lineage.exporter.json import export_lineage_document
+from polars_lineage.exporter.ndjson import write_lineage_ndjson
+from polars_lineage.exporter.registry import export_lineage
+from polars_lineage.ir import ColumnLineage, ColumnRef, DatasetRef
+from polars_lineage.pipeline import run_extraction_to_file
+
+
+def _dataset(table: str) -> DatasetRef:
+    return DatasetRef(service="svc", database="db", schema="public", table=table)
+
+
+def _lineage() -> list[ColumnLineage]:
+    orders = _dataset("orders")
+    accounts = _dataset("accounts")
+    destination = _dataset("metrics")
+    return [
+        ColumnLineage(
+            from_columns=(
+                ColumnRef(dataset=orders, column="b"),
+                ColumnRef(dataset=accounts, column="segment"),
+            ),
+            to_column=ColumnRef(dataset=destination, column="y"),
+            function='[(col("b")) + (col("segment"))]',
+            confidence="exact",
+        ),
+        ColumnLineage(
+            from_columns=(ColumnRef(dataset=orders, column="a"),),
+            to_column=ColumnRef(dataset=destination, column="x"),
+            function='col("a")',
+            confidence="inferred",
+        ),
+    ]
+
+
+def test_ndjson_streams_sorted_records_matching_the_json_document() -> None:
+    stream = io.StringIO()
+
+    written = write_lineage_ndjson(_lineage(), "svc.db.public.metrics", stream)
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert written == len(records) == 3
+    assert [(record["source_table"], record["to_column"]) for record in records] == [
+        ("svc.db.public.accounts", "y"),
+        ("svc.db.public.orders", "x"),
+        ("svc.db.public.orders", "y"),
+    ]
+    document = export_lineage_document(_lineage(), "svc.db.public.metrics")
+    expected = [
+        {"source_table": edge.source_table, "destination_table": edge.destination_table}
+        | column.model_dump(mode="json")
+        for edge in document.edges
+        for column in edge.columns
+    ]
+    assert records == expected
+
+
+def test_ndjson_rejects_foreign_destination_before_writing() -> None:
+    stream = io.StringIO()
+
+    with pytest.raises(ValueError, match="destination_table"):
+        write_lineage_ndjson(_lineage(), "svc.db.public.other", stream)
+    assert stream.getvalue() == ""
+
+
+def test_registry_and_file_output_support_ndjson(tmp_path: Path) -> None:
+    mapping = MappingConfig(
+        sources={"orders": "svc.db.raw.orders"},
+        destination_table="svc.db.curated.metrics",
+    )
+    lazyframe = pl.LazyFrame({"a": [1], "b": [2]}).select((pl.col("a") + pl.col("b")).alias("s"))
+    output_path = tmp_path / "lineage.ndjson"
+
+    run_extraction_to_file(lazyframe, mapping, output_path, output_format="ndjson")
+
+    lines = output_path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["from_columns"] for line in lines] == [["a", "b"]]
+    rendered = export_lineage(
+        _lineage(),
+        MappingConfig(
+            sources={"orders": "svc.db.public.orders"},
+            destination_table="svc.db.public.metrics",
+        ),
+        output_format="ndjson",
+    )
+    assert isinstance(rendered, str) and rendered.count("\n") == 3
+
+
+def test_export_many_renders_ndjson_from_the_shared_grouping(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    mapping = MappingConfig(
+        sources={"orders": "svc.db.public.orders"},
+        destination_table="svc.db.public.metrics",
+    )
+    expected = export_lineage(_lineage(), mapping, output_format="ndjson")
+    groupings: list[GroupedLineage] = []
+
+    def counting_group_lineage(lineage: list[ColumnLineage]) -> GroupedLineage:
+        groupings.append(group_lineage(lineage))
+        return groupings[-1]
+
+    def raw_ndjson(*_: object) -> None:
+        raise AssertionError("ndjson must render from the shared grouping")
+
+    monkeypatch.setattr(registry, "group_lineage", counting_group_lineage)
+    monkeypatch.setattr(registry, "iter_lineage_ndjson", raw_ndjson)
+
+    rendered = registry.export_lineage_many(_lineage(), mapping, ["json", "ndjson"])
+
+    assert len(groupings) == 1
+    assert rendered["ndjson"] == expected
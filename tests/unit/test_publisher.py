@@ -0,0 +1,190 @@
+import json
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from polars_lineage.change_detection import PublishedLineageState
+from polars_lineage.publisher import OpenMetadataPublisher, publish_openmetadata_lineage
+
+
+class _LineageServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _LineageHandler)
+        self.lock = threading.Lock()
+        self.requests: list[dict[str, Any]] = []
+        self.client_ports: set[int] = set()
+        self.responses: list[tuple[int, dict[str, str]]] = []
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+
+class _LineageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _LineageServer
+
+    def do_PUT(self) -> None:
+        self._handle("PUT")
+
+    def do_DELETE(self) -> None:
+        self._handle("DELETE")
+
+    def _handle(self, method: str) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else None
+        with self.server.lock:
+            self.server.client_ports.add(self.client_address[1])
+            self.server.requests.append(
+                {
+                    "method": method,
+                    "path": self.path,
+                    "authorization": self.headers.get("Authorization"),
+                    "body": json.loads(body) if body is not None else None,
+                }
+            )
+            status, headers = self.server.responses.pop(0) if self.server.responses else (200, {})
+        payload = b"{}"
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture()
+def server() -> Iterator[_LineageServer]:
+    lineage_server = _LineageServer()
+    thread = threading.Thread(
+        target=lineage_server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    yield lineage_server
+    lineage_server.shutdown()
+    lineage_server.server_close()
+
+
+def _payload(index: int) -> dict[str, Any]:
+    return {
+        "edge": {
+            "fromEntity": {"type": "table", "fullyQualifiedName": f"svc.db.raw.t{index}"},
+            "toEntity": {"type": "table", "fullyQualifiedName": "svc.db.curated.metrics"},
+            "lineageDetails": {"source": "PipelineLineage", "columnsLineage": []},
+        }
+    }
+
+
+def test_publisher_sends_batches_over_pooled_connections(server: _LineageServer) -> None:
+    payloads = [_payload(index) for index in range(12)]
+
+    report = publish_openmetadata_lineage(
+        payloads, server.url, token="secret", concurrency=2, batch_size=3
+    )
+
+    assert [result.index for result in report.results] == list(range(12))
+    assert report.published == 12 and not report.failed
+    assert sorted(
+        request["body"]["edge"]["fromEntity"]["fullyQualifiedName"] for request in server.requests
+    ) == sorted(payload["edge"]["fromEntity"]["fullyQualifiedName"] for payload in payloads)
+    assert {request["path"] for request in server.requests} == {"/api/v1/lineage"}
+    assert {request["authorization"] for request in server.requests} == {"Bearer secret"}
+    assert len(server.client_ports) <= 2
+
+
+def test_publisher_retries_with_exponential_backoff(server: _LineageServer) -> None:
+    server.responses = [(503, {}), (429, {"Retry-After": "2"}), (503, {})]
+    delays: list[float] = []
+
+    report = publish_openmetadata_lineage(
+        [_payload(0)], server.url, backoff_seconds=0.5, sleep=delays.append
+    )
+
+    assert report.results[0].ok
+    assert report.results[0].attempts == 4
+    assert delays == [0.5, 2.0, 2.0]
+
+
+def test_publisher_honours_a_zero_retry_after(server: _LineageServer) -> None:
+    server.responses = [(429, {"Retry-After": "0"})]
+    delays: list[float] = []
+
+    report = publish_openmetadata_lineage(
+        [_payload(0)], server.url, backoff_seconds=0.5, sleep=delays.append
+    )
+
+    assert report.results[0].ok
+    assert delays == [0.0]
+
+
+def test_publisher_reports_failures_without_stopping(server: _LineageServer) -> None:
+    server.responses = [(400, {}), (503, {}), (503, {})]
+    publisher = OpenMetadataPublisher(
+        server.url, concurrency=1, max_retries=1, sleep=lambda _seconds: None
+    )
+
+    with publisher:
+        report = publisher.publish([_payload(0), _payload(1), _payload(2)])
+
+    assert [(result.status, result.attempts) for result in report.results] == [
+        (400, 1),
+        (503, 2),
+        (200, 1),
+    ]
+    assert [result.index for result in report.failed] == [0, 1]
+    assert report.failed[0].error is not None and report.failed[0].error.startswith("HTTP 400")
+
+
+def test_publisher_dry_run_sends_nothing(server: _LineageServer) -> None:
+    report = publish_openmetadata_lineage([_payload(0), _payload(1)], server.url, dry_run=True)
+
+    assert report.dry_run and report.published == 0
+    assert [result.attempts for result in report.results] == [0, 0]
+    assert server.requests == []
+    with pytest.raises(ValueError, match="addLineage"):
+        publish_openmetadata_lineage([{"edge": {}}], server.url, dry_run=True)
+
+
+def test_publish_changes_sends_only_added_changed_and_removed_edges(
+    server: _LineageServer, tmp_path: Path
+) -> None:
+    state_path = tmp_path / "lineage-state.json"
+    with OpenMetadataPublisher(server.url) as publisher:
+        first = publisher.publish_changes(
+            [_payload(0), _payload(1), _payload(2)], PublishedLineageState(state_path)
+        )
+        unchanged = publisher.publish_changes(
+            [_payload(0), _payload(1), _payload(2)], PublishedLineageState(state_path)
+        )
+        changed = _payload(1)
+        changed["edge"]["lineageDetails"]["columnsLineage"] = [
+            {"fromColumns": ["svc.db.raw.t1.id"], "toColumn": "svc.db.curated.metrics.id"}
+        ]
+        server.responses = [(200, {}), (200, {}), (404, {})]
+        delta = publisher.publish_changes(
+            [_payload(0), changed, _payload(3)], PublishedLineageState(state_path)
+        )
+
+    assert first.published == 3 and unchanged.results == ()
+    assert [(result.method, result.edge) for result in delta.results] == [
+        ("PUT", ("svc.db.raw.t3", "svc.db.curated.metrics")),
+        ("PUT", ("svc.db.raw.t1", "svc.db.curated.metrics")),
+        ("DELETE", ("svc.db.raw.t2", "svc.db.curated.metrics")),
+    ]
+    assert delta.published == 3
+    assert server.requests[-1]["path"] == (
+        "/api/v1/lineage/table/name/svc.db.raw.t2/table/name/svc.db.curated.metrics"
+    )
+    state = PublishedLineageState(state_path)
+    assert state.published_hash(("svc.db.raw.t2", "svc.db.curated.metrics")) is None
+    assert state.diff([_payload(0), changed, _payload(3)]).is_empty
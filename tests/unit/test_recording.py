@@ -0,0 +1,62 @@
+from collections.abc import Iterator
+
+import polars as pl
+import pytest
+
+import polars_lineage
+from polars_lineage import lineage_namespace
+from polars_lineage.metadata_store import get_mapping
+
+
+@pytest.fixture(autouse=True)
+def restore_recording_switch() -> Iterator[None]:
+    previous = lineage_namespace._RECORDING_SWITCH
+    yield
+    with lineage_namespace._RECORDING_LOCK:
+        lineage_namespace._RECORDING_SWITCH = previous
+        lineage_namespace._sync_wrappers_locked()
+
+
+def _source() -> pl.LazyFrame:
+    return getattr(pl.LazyFrame({"a": [1]}), "lineage").add_source(
+        name="orders", uri="postgres://warehouse/svc.db.raw.orders"
+    )
+
+
+def test_disable_recording_restores_original_methods() -> None:
+    source = _source()
+    assert polars_lineage.is_recording()
+
+    polars_lineage.disable_recording()
+
+    assert not polars_lineage.is_recording()
+    assert pl.LazyFrame.select.__qualname__ == "LazyFrame.select"
+    assert get_mapping(source.select("a")) is None
+    assert get_mapping(source) is not None
+
+
+def test_recording_scope_installs_wrappers_only_inside_the_block() -> None:
+    source = _source()
+    polars_lineage.disable_recording()
+
+    with polars_lineage.recording():
+        assert polars_lineage.is_recording()
+        inside = source.select("a")
+        with polars_lineage.recording():
+            pass
+        assert polars_lineage.is_recording()
+
+    assert not polars_lineage.is_recording()
+    assert get_mapping(inside) is get_mapping(source)
+    assert getattr(inside, "lineage").extract()[0]["edge"]["toEntity"]
+
+
+def test_wrappers_skip_argument_traversal_without_metadata(monkeypatch) -> None:
+    _source()
+    calls: list[object] = []
+    monkeypatch.setattr(lineage_namespace, "has_mappings", lambda: False)
+    monkeypatch.setattr(lineage_namespace, "_extract_mappings", calls.append)
+
+    pl.LazyFrame({"a": [1]}).select("a").filter(pl.col("a") > 0)
+
+    assert calls == []
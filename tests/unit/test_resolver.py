@@ -50,3 +50,40 @@ def test_resolver_keeps_literal_columns_without_sources() -> None:
 
     resolved = resolve_transitive_lineage(literal_lineage)
     assert resolved[0].from_columns == ()
+
+
+def test_resolver_handles_deep_diamond_chains() -> None:
+    dataset = _dataset("orders")
+    a = ColumnRef(dataset=dataset, column="a")
+    b = ColumnRef(dataset=dataset, column="b")
+    derived = [ColumnRef(dataset=dataset, column=f"d{index}") for index in range(5_000)]
+    lineage = [
+        ColumnLineage(
+            from_columns=(a if index % 2 else b, *derived[max(0, index - 2) : index]),
+            to_column=target,
+            function="f",
+            confidence="exact",
+        )
+        for index, target in enumerate(derived)
+    ]
+
+    resolved = resolve_transitive_lineage(lineage)
+
+    by_column = {item.to_column.column: item for item in resolved}
+    assert [item.column for item in by_column["d0"].from_columns] == ["b"]
+    assert [item.column for item in by_column["d4999"].from_columns] == ["a", "b"]
+
+
+def test_resolver_keeps_self_referencing_source() -> None:
+    dataset = _dataset("orders")
+    a = ColumnRef(dataset=dataset, column="a")
+    b = ColumnRef(dataset=dataset, column="b")
+
+    lineage = [
+        ColumnLineage(from_columns=(a, b), to_column=a, function="f", confidence="exact"),
+        ColumnLineage(from_columns=(a,), to_column=b, function="g", confidence="exact"),
+    ]
+
+    resolved = resolve_transitive_lineage(lineage)
+    assert [item.column for item in resolved[0].from_columns] == ["a", "b"]
+    assert [item.column for item in resolved[1].from_columns] == ["a"]
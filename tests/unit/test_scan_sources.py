@@ -0,0 +1,43 @@
+import polars as pl
+
+from polars_lineage.extractor.scan_sources import partition_root
+from polars_lineage.extractor.serialized_plan import (
+    detect_scan_sources,
+    serialize_lazyframe_plan,
+)
+
+
+def test_partition_root_collapses_hive_globs_and_file_lists() -> None:
+    hive_files = [
+        f"/lake/sales/year={year}/month={month:02d}/part-{part}.parquet"
+        for year in range(2000, 2025)
+        for month in range(1, 13)
+        for part in range(10)
+    ]
+
+    assert partition_root(hive_files) == "/lake/sales"
+    assert partition_root(["s3://bucket/events/**/*.parquet"]) == "s3://bucket/events"
+    assert partition_root(["/lake/logs/a.csv", "/lake/logs/b.csv"]) == "/lake/logs"
+    assert partition_root(["/lake/customers.csv"]) == "/lake/customers.csv"
+
+
+def test_detect_scan_sources_names_datasets_by_join_path(tmp_path) -> None:
+    for year in (2024, 2025):
+        partition = tmp_path / "sales" / f"year={year}"
+        partition.mkdir(parents=True)
+        pl.DataFrame({"id": [1], "amount": [2.0]}).write_parquet(partition / "part-0.parquet")
+    pl.DataFrame({"id": [1], "name": ["x"]}).write_csv(tmp_path / "customers.csv")
+    sales = pl.scan_parquet(
+        [tmp_path / "sales" / f"year={year}" / "part-0.parquet" for year in (2024, 2025)],
+        hive_partitioning=True,
+    )
+
+    joined = sales.join(pl.scan_csv(tmp_path / "customers.csv"), on="id")
+    scans = detect_scan_sources(serialize_lazyframe_plan(joined))
+
+    assert [(scan.alias, scan.name, scan.format, scan.columns) for scan in scans] == [
+        ("left", "sales", "parquet", ("id", "amount", "year")),
+        ("right", "customers", "csv", ("id", "name")),
+    ]
+    assert scans[0].uri == f"file://{tmp_path}/sales"
+    assert detect_scan_sources(serialize_lazyframe_plan(pl.LazyFrame({"a": [1]}))) == []
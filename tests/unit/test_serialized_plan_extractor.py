@@ -0,0 +1,416 @@
+import json
+import warnings
+
+import polars as pl
+import pytest
+
+import polars_lineage  # noqa: F401 - registers ``LazyFrame.lineage``
+from polars_lineage.config import MappingConfig
+from polars_lineage.extractor.serialized_plan import (
+    _loads_iterative,
+    extract_serialized_plan_lineage,
+    serialize_lazyframe_plan,
+)
+from polars_lineage.ir import ColumnLineage
+from polars_lineage.metadata_store import get_mapping
+from polars_lineage.pipeline import extract_lineage_ir_from_lazyframe
+
+SINGLE_SOURCE_MAPPING = MappingConfig(
+    sources={"orders": "svc.db.raw.orders"},
+    destination_table="svc.db.curated.metrics",
+)
+JOIN_MAPPING = MappingConfig(
+    sources={"left": "svc.db.raw.left_table", "right": "svc.db.raw.right_table"},
+    destination_table="svc.db.curated.joined",
+)
+
+
+def test_serialized_select_plan_lineage() -> None:
+    lazyframe = pl.LazyFrame({"a": [1], "b": [2]}).select(
+        pl.col("a").alias("x"),
+        (pl.col("a") + pl.col("b")).alias("sum"),
+        pl.lit(1).alias("one"),
+    )
+
+    lineage = extract_serialized_plan_lineage(
+        serialize_lazyframe_plan(lazyframe), SINGLE_SOURCE_MAPPING
+    )
+
+    by_to = {item.to_column.column: item for item in lineage}
+    assert set(by_to) == {"one", "sum", "x"}
+    assert [ref.column for ref in by_to["x"].from_columns] == ["a"]
+    assert [ref.column for ref in by_to["sum"].from_columns] == ["a", "b"]
+    assert by_to["sum"].function == '[(col("a")) + (col("b"))]'
+    assert by_to["one"].from_columns == ()
+    assert by_to["one"].function == "dyn int: 1"
+
+
+def test_serialized_join_plan_uses_left_and_right_provenance() -> None:
+    left = pl.LazyFrame({"id": [1], "a": [10]})
+    right = pl.LazyFrame({"id": [1], "b": [20]})
+    lazyframe = left.join(right, on="id", how="left").with_columns(
+        (pl.col("a") + pl.col("b").fill_null(0)).alias("total"),
+        pl.col("id").alias("joined_id"),
+    )
+
+    lineage = extract_serialized_plan_lineage(serialize_lazyframe_plan(lazyframe), JOIN_MAPPING)
+
+    by_to = {item.to_column.column: item for item in lineage}
+    assert {ref.dataset.table for ref in by_to["total"].from_columns} == {
+        "left_table",
+        "right_table",
+    }
+    assert by_to["joined_id"].from_columns[0].dataset.table == "left_table"
+
+
+def test_serialized_aggregate_plan_lineage() -> None:
+    lazyframe = (
+        pl.LazyFrame({"k": [1], "v": [2], "w": [3]})
+        .group_by("k")
+        .agg(
+            pl.col("v").sum().alias("sum_v"),
+            pl.col("w").mean().alias("avg_w"),
+            pl.len().alias("cnt"),
+        )
+    )
+
+    lineage = extract_serialized_plan_lineage(
+        serialize_lazyframe_plan(lazyframe), SINGLE_SOURCE_MAPPING
+    )
+
+    by_to = {item.to_column.column: item for item in lineage}
+    assert set(by_to) == {"avg_w", "cnt", "k", "sum_v"}
+    assert by_to["sum_v"].function == 'col("v").sum()'
+    assert by_to["cnt"].from_columns == ()
+    assert [item.column for item in by_to["k"].from_columns] == ["k"]
+
+
+def test_serialized_plan_tracks_renames() -> None:
+    lazyframe = pl.LazyFrame({"id": [1], "a": [2]}).rename({"a": "z"})
+
+    lineage = extract_serialized_plan_lineage(
+        serialize_lazyframe_plan(lazyframe), SINGLE_SOURCE_MAPPING
+    )
+
+    assert [(item.to_column.column, item.from_columns[0].column) for item in lineage] == [
+        ("z", "a")
+    ]
+
+
+def test_serialized_plan_handles_chains_deeper_than_the_json_recursion_limit() -> None:
+    lazyframe = pl.LazyFrame({"a": [1], "b": [2]})
+    for level in range(1_000):
+        lazyframe = lazyframe.with_columns((pl.col("a") + pl.col("b")).alias(f"d{level}"))
+
+    lineage = extract_serialized_plan_lineage(
+        serialize_lazyframe_plan(lazyframe), SINGLE_SOURCE_MAPPING
+    )
+
+    assert len(lineage) == 1_000
+
+
+def test_iterative_loader_matches_json_loads() -> None:
+    text = '{"a": [1, -2.5, "x\\"y", true, false, null, {"b": {}}], "c": []}'
+
+    assert _loads_iterative(text) == json.loads(text)
+
+
+def _lineage_by_output(lineage: list[ColumnLineage]) -> dict[str, list[str]]:
+    return {item.to_column.column: [ref.column for ref in item.from_columns] for item in lineage}
+
+
+def test_serialized_plan_expands_selectors_against_the_input_schema() -> None:
+    lazyframe = pl.LazyFrame({"a": [1], "b": [2], "s": ["x"]}).select(
+        pl.col("a", "b") + 1,
+        pl.col(pl.String).name.to_uppercase(),
+        pl.nth(1).alias("second"),
+        pl.sum_horizontal(pl.all().exclude("s")).alias("total"),
+    )
+
+    lineage = extract_serialized_plan_lineage(
+        serialize_lazyframe_plan(lazyframe), SINGLE_SOURCE_MAPPING
+    )
+
+    assert _lineage_by_output(lineage) == {
+        "a": ["a"],
+        "b": ["b"],
+        "S": ["s"],
+        "second": ["b"],
+        "total": ["a", "b"],
+    }
+    by_to = {item.to_column.column: item for item in lineage}
+    assert by_to["b"].function == '[(col("b")) + (1)]'
+
+
+def test_serialized_plan_expands_wildcards_and_name_suffixes_in_aggregations() -> None:
+    lazyframe = (
+        pl.LazyFrame({"k": ["x"], "v": [1], "w": [2.0]})
+        .group_by("k")
+        .agg(pl.all().sum().name.suffix("_sum"), pl.col("v").name.prefix("first_").first())
+    )
+
+    lineage = extract_serialized_plan_lineage(
+        serialize_lazyframe_plan(lazyframe), SINGLE_SOURCE_MAPPING
+    )
+
+    assert _lineage_by_output(lineage) == {
+        "first_v": ["v"],
+        "k": ["k"],
+        "v_sum": ["v"],
+        "w_sum": ["w"],
+    }
+
+
+@pytest.mark.parametrize("backend", ["tree", "serialized"])
+def test_pipeline_backends_agree_on_multi_output_expressions(backend: str) -> None:
+    lazyframe = pl.LazyFrame({"a": [1], "b": [2]}).select(
+        pl.all().sum(), pl.col("a").name.suffix("_x")
+    )
+
+    lineage = extract_lineage_ir_from_lazyframe(lazyframe, SINGLE_SOURCE_MAPPING, backend=backend)
+
+    assert _lineage_by_output(lineage) == {"a": ["a"], "a_x": ["a"], "b": ["b"]}
+
+
+def test_serialized_backend_falls_back_to_tree_for_unserializable_plans() -> None:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        lazyframe = pl.LazyFrame({"a": [1], "b": [2]}).select(
+            pl.col("a").map_elements(lambda value: value + 1, return_dtype=pl.Int64).alias("u"),
+            pl.col("b"),
+        )
+
+    lineage = extract_lineage_ir_from_lazyframe(
+        lazyframe, SINGLE_SOURCE_MAPPING, backend="serialized"
+    )
+
+    assert _lineage_by_output(lineage) == {"b": ["b"], "u": ["a"]}
+
+
+def test_serialized_backend_leaves_in_memory_frames_to_tree(monkeypatch) -> None:
+    lazyframe = pl.DataFrame({"a": [1], "b": [2]}).lazy().select((pl.col("a") * 2).alias("x"))
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("in-memory frames must not be serialized")
+
+    monkeypatch.setattr(pl.LazyFrame, "serialize", fail)
+    lineage = extract_lineage_ir_from_lazyframe(
+        lazyframe, SINGLE_SOURCE_MAPPING, backend="serialized"
+    )
+
+    assert _lineage_by_output(lineage) == {"x": ["a"]}
+
+
+def test_serialized_backend_reads_file_scans_without_registered_schemas(tmp_path) -> None:
+    pl.DataFrame({"a": [1], "b": [2]}).write_parquet(tmp_path / "orders.parquet")
+    lazyframe = pl.scan_parquet(tmp_path / "orders.parquet").select(
+        (pl.col("a") + pl.col("b")).alias("x")
+    )
+
+    mapping = MappingConfig(
+        sources={"orders": "svc.db.raw.unregistered_orders"},
+        destination_table="svc.db.curated.metrics",
+    )
+
+    lineage = extract_lineage_ir_from_lazyframe(lazyframe, mapping, backend="serialized")
+
+    assert _lineage_by_output(lineage) == {"x": ["a", "b"]}
+
+
+def test_pipeline_backends_agree_on_simple_projection() -> None:
+    lazyframe = pl.LazyFrame({"a": [1], "b": [2]}).select(
+        pl.col("a").alias("x"), (pl.col("a") + pl.col("b")).alias("sum")
+    )
+
+    from_tree = extract_lineage_ir_from_lazyframe(lazyframe, SINGLE_SOURCE_MAPPING, backend="tree")
+    from_serialized = extract_lineage_ir_from_lazyframe(
+        lazyframe, SINGLE_SOURCE_MAPPING, backend="serialized"
+    )
+
+    assert from_serialized == from_tree
+
+
+def test_pipeline_backends_agree_on_star_schema_joins() -> None:
+    fact = pl.LazyFrame({"id": [1], "d1": [1], "d2": [1], "d3": [1], "amount": [5]})
+    dimensions = [pl.LazyFrame({f"d{index}": [1], "label": ["x"]}) for index in (1, 2, 3)]
+    lazyframe = fact
+    for index, dimension in enumerate(dimensions, start=1):
+        lazyframe = lazyframe.join(dimension, on=f"d{index}", how="left").rename(
+            {"label": f"label_{index}"}
+        )
+    lazyframe = lazyframe.group_by("label_1").agg(
+        pl.col("amount").sum().alias("total"), pl.col("label_3").max()
+    )
+    mapping = MappingConfig(
+        sources={
+            "left.left.left": "svc.db.raw.fact",
+            "left.left.right": "svc.db.raw.dim_1",
+            "left.right": "svc.db.raw.dim_2",
+            "right": "svc.db.raw.dim_3",
+        },
+        destination_table="svc.db.curated.report",
+    )
+
+    from_tree = extract_lineage_ir_from_lazyframe(lazyframe, mapping, backend="tree")
+    from_serialized = extract_lineage_ir_from_lazyframe(lazyframe, mapping, backend="serialized")
+
+    assert from_serialized == from_tree
+    by_to = {item.to_column.column: item for item in from_tree}
+    assert set(by_to) == {"label_1", "label_3", "total"}
+    assert [(ref.dataset.table, ref.column) for ref in by_to["label_1"].from_columns] == [
+        ("dim_1", "label")
+    ]
+    assert [(ref.dataset.table, ref.column) for ref in by_to["label_3"].from_columns] == [
+        ("dim_3", "label")
+    ]
+    assert [(ref.dataset.table, ref.column) for ref in by_to["total"].from_columns] == [
+        ("fact", "amount")
+    ]
+
+
+def test_pipeline_backends_agree_on_unions_of_identical_inputs() -> None:
+    days = [pl.LazyFrame({"id": [day], "amount": [1]}) for day in range(50)]
+    extra = pl.LazyFrame({"id": [0], "amount": [1], "note": ["x"]})
+    lazyframe = pl.concat([*days, extra], how="diagonal").select(
+        pl.col("id"), (pl.col("amount") * 2).alias("doubled"), pl.col("note")
+    )
+    mapping = MappingConfig(
+        sources={"days": "svc.db.raw.days", "extra": "svc.db.raw.extra"},
+        destination_table="svc.db.curated.events",
+    )
+
+    from_tree = extract_lineage_ir_from_lazyframe(lazyframe, mapping, backend="tree")
+    from_serialized = extract_lineage_ir_from_lazyframe(lazyframe, mapping, backend="serialized")
+
+    assert from_serialized == from_tree
+    assert {
+        item.to_column.column: sorted((ref.dataset.table, ref.column) for ref in item.from_columns)
+        for item in from_tree
+    } == {
+        "doubled": [("days", "amount"), ("extra", "amount")],
+        "id": [("days", "id"), ("extra", "id")],
+        "note": [("days", "note"), ("extra", "note")],
+    }
+
+
+def test_backends_slice_multi_join_plans_to_requested_columns() -> None:
+    orders = pl.LazyFrame({"id": [1], "account_id": [1], "amount": [5]})
+    accounts = pl.LazyFrame({"account_id": [1], "region_id": [1], "email": ["a@b"]})
+    regions = pl.LazyFrame({"region_id": [1], "name": ["eu"]})
+    lazyframe = (
+        orders.join(accounts, on="account_id")
+        .with_columns(pl.col("email").str.to_uppercase().alias("contact"))
+        .join(regions, on="region_id")
+        .select(pl.col("contact"), (pl.col("amount") * 2).alias("doubled"), pl.col("name"))
+    )
+    mapping = MappingConfig(
+        sources={
+            "left.left": "svc.db.raw.orders",
+            "left.right": "svc.db.raw.accounts",
+            "right": "svc.db.raw.regions",
+        },
+        destination_table="svc.db.curated.report",
+    )
+    for backend in ("tree", "serialized"):
+        full = extract_lineage_ir_from_lazyframe(lazyframe, mapping, backend=backend)
+        sliced = extract_lineage_ir_from_lazyframe(
+            lazyframe, mapping, backend=backend, columns=["contact"]
+        )
+        assert sliced == [item for item in full if item.to_column.column == "contact"]
+        assert [(ref.dataset.table, ref.column) for ref in sliced[0].from_columns] == [
+            ("accounts", "email")
+        ]
+
+
+def test_serialized_chained_joins_follow_custom_suffixes() -> None:
+    left = pl.LazyFrame({"id": [1], "v": [1]})
+    middle = pl.LazyFrame({"id": [1], "v": [2]})
+    right = pl.LazyFrame({"id": [1], "v": [3]})
+    lazyframe = (
+        left.join(middle, on="id", suffix="_middle")
+        .join(right, on="id", how="full", suffix="_r")
+        .select(pl.col("v_middle"), pl.col("v_r"), pl.col("id_r"))
+    )
+    mapping = MappingConfig(
+        sources={
+            "left.left": "svc.db.raw.a",
+            "left.right": "svc.db.raw.b",
+            "right": "svc.db.raw.c",
+        },
+        destination_table="svc.db.curated.joined",
+    )
+
+    lineage = extract_serialized_plan_lineage(serialize_lazyframe_plan(lazyframe), mapping)
+
+    assert {
+        item.to_column.column: [(ref.dataset.table, ref.column) for ref in item.from_columns]
+        for item in lineage
+    } == {"id_r": [("c", "id")], "v_middle": [("b", "v")], "v_r": [("c", "v")]}
+
+
+@pytest.mark.parametrize("coalesce", [True, False])
+def test_backends_scope_overlapping_names_of_a_single_join(coalesce: bool) -> None:
+    fact = pl.LazyFrame({"id": [1], "amount": [5]})
+    dimension = pl.LazyFrame({"id": [1], "amount": [7]})
+    lazyframe = fact.join(dimension, on="id", how="full", coalesce=coalesce).select(
+        "amount", "amount_right", *(() if coalesce else ("id_right",))
+    )
+    mapping = MappingConfig(
+        sources={"left": "svc.db.raw.fact", "right": "svc.db.raw.dim"},
+        destination_table="svc.db.curated.joined",
+    )
+    expected = {"amount": [("fact", "amount")], "amount_right": [("dim", "amount")]}
+    if not coalesce:
+        expected["id_right"] = [("dim", "id")]
+
+    for backend in ("tree", "serialized"):
+        lineage = extract_lineage_ir_from_lazyframe(lazyframe, mapping, backend=backend)
+        assert {
+            item.to_column.column: [(ref.dataset.table, ref.column) for ref in item.from_columns]
+            for item in lineage
+        } == expected
+
+
+def test_backends_keep_the_derivation_of_columns_selected_after_a_join() -> None:
+    orders = pl.LazyFrame({"id": [1], "a": [5]})
+    accounts = pl.LazyFrame({"id": [1], "b": [7]})
+    lazyframe = (
+        orders.join(accounts, on="id")
+        .with_columns((pl.col("a") + pl.col("b")).alias("t"))
+        .select("t", pl.col("t").alias("u"))
+    )
+    mapping = MappingConfig(
+        sources={"left": "svc.db.raw.orders", "right": "svc.db.raw.accounts"},
+        destination_table="svc.db.curated.metrics",
+    )
+
+    for backend in ("tree", "serialized"):
+        lineage = extract_lineage_ir_from_lazyframe(lazyframe, mapping, backend=backend)
+        assert sorted(
+            (item.to_column.column, item.function, item.confidence, len(item.from_columns))
+            for item in lineage
+        ) == [
+            ("t", '[(col("a")) + (col("b"))]', "exact", 2),
+            ("u", '[(col("a")) + (col("b"))]', "exact", 2),
+        ]
+
+
+def test_backends_resolve_self_join_suffixes_to_the_source() -> None:
+    events = pl.LazyFrame({"id": [1], "amount": [5]}).lineage.add_source(
+        name="events", uri="postgres://warehouse/svc.db.raw.events"
+    )
+    lazyframe = events.join(events, on="id").select(
+        pl.col("amount"), (pl.col("amount_right") * 2).alias("doubled")
+    )
+    mapping = get_mapping(lazyframe)
+    assert mapping is not None
+
+    for backend in ("tree", "serialized"):
+        lineage = extract_lineage_ir_from_lazyframe(lazyframe, mapping, backend=backend)
+        assert {
+            item.to_column.column: [(ref.dataset.fqn, ref.column) for ref in item.from_columns]
+            for item in lineage
+        } == {
+            "amount": [("svc.db.raw.events", "amount")],
+            "doubled": [("svc.db.raw.events", "amount")],
+        }